@@ -29,6 +29,11 @@ class OceanConfig(BaseSettings):
         description="When set to True, passes details of internal errors via the API. Always set to False in production environment.",
     )
 
+    EXPOSE_CACHE_METRICS: bool = Field(
+        default=False,
+        description="When set to True, the cache metrics endpoint also reports the caches of all sessions and the number of sessions. Otherwise, only the requesting session's caches are reported.",
+    )
+
     CACHED_TASK_TIMEOUT: float = Field(
         default=0.5,
         description="Number of seconds to wait for a supposedly cached task to be finished to then return a non-task object",
@@ -39,6 +44,51 @@ class OceanConfig(BaseSettings):
         description="Path to the data directory, relative to `main.py`",
     )
 
+    ARTIFACT_CACHE: bool = Field(
+        default=True,
+        description="When set to True, derived OCEL data (e.g., attribute info, object relations) is stored at `DATA_DIR/cache/artifacts` and reused when the same OCEL file is opened again.",
+    )
+
+    ARTIFACT_CACHE_BYTES: int = Field(
+        default=16 * 1024**3,
+        description="Maximum disk usage (in bytes) of the artifact cache. When exceeded, the stored data of the least recently opened OCEL files is removed first.",
+    )
+
+    MMAP_SNAPSHOTS: bool = Field(
+        default=True,
+        description="When set to True, numeric columns and integer codes of OCELs read from binary snapshots are memory-mapped read-only, such that multiple worker processes share the same physical memory.",
+    )
+
+    OCPN_WORKERS: int = Field(
+        default=4,
+        description="Number of worker processes discovering the Petri nets of object types for OCPNs in parallel. When set to 0, Petri nets are discovered in the server process.",
+    )
+
+    CACHE_SESSION_BYTES: int = Field(
+        default=2 * 1024**3,
+        description="Maximum memory usage (in bytes) of the cached results of a single OCEL or emission model. When exceeded, results with the lowest recomputation time per byte are evicted first.",
+    )
+
+    CACHE_GLOBAL_BYTES: int = Field(
+        default=8 * 1024**3,
+        description="Maximum memory usage (in bytes) of the cached results of all sessions together.",
+    )
+
+    CACHE_SPILL_BYTES: int = Field(
+        default=8 * 1024**3,
+        description="Maximum disk usage (in bytes) of the cached results of all sessions that have been evicted from memory and spilled to `DATA_DIR/cache/spill`. When exceeded, spilled results with the lowest recomputation time per byte are removed first. When set to 0, evicted results are discarded.",
+    )
+
+    CACHE_SPILL_MIN_SECONDS: float = Field(
+        default=1.0,
+        description="Minimum computation time (in seconds) of a cached result to be spilled to disk on eviction. Faster results are recomputed instead.",
+    )
+
+    CACHE_WAIT_TIMEOUT: float = Field(
+        default=1800.0,
+        description="Number of seconds a cached method call waits for a concurrent call computing the same result before failing. When set to 0, calls wait indefinitely.",
+    )
+
     CURRENCY_EXCHANGE_DATE: str = Field(
         default="20241005",
         description="Reference date for currency exchange rates, determines what pint context to use.\nThe rates can be updated, and a new context generated, using the notebook at `data/units/currency_exchange_rates.ipynb`.",
@@ -8,6 +8,7 @@ import pandas as pd
 
 from api.logger import logger
 from ocel.ocel_wrapper import OCELWrapper
+from util.cache import WeightedCache
 from util.types import PathLike
 
 if TYPE_CHECKING:
@@ -40,6 +41,14 @@ class Session:
         # Store session in static variable
         Session.sessions[self.id] = self
 
+    @property
+    def caches(self) -> list[WeightedCache]:
+        """Instance caches of the session's OCEL and emission model (see util.cache)"""
+        caches = [self.ocel.cache]
+        if self.emission_model is not None:
+            caches += self.emission_model.caches
+        return caches
+
     def get_task(self, task_id: str):
         return self._tasks.get(task_id, None)
 
@@ -490,6 +490,7 @@ class Allocator:
         name1 = cls1 if cls1 != cls2 and cls1 != "all" and cls2 != "all" else None
         name2 = cls2 if cls1 != cls2 and cls1 != "all" and cls2 != "all" else None
 
+        # Cached result (shared with other sessions), columns are added to a shallow copy
         relations = self.ocel.object_relations(
             **self.object_relations_filter(cls1, cls2),
             name1=name1,
@@ -498,7 +499,7 @@ class Allocator:
             include_o2o_qualifiers=False,
             include_frequencies=False,
             remove_otype_loops=remove_otype_loops,
-        )
+        ).copy(deep=False)
         oid1_col = "ocel:oid_1" if name1 is None else f"{name1}_oid"
         oid2_col = "ocel:oid_2" if name2 is None else f"{name2}_oid"
         type1_col = "ocel:type_1" if name1 is None else f"{name1}_type"
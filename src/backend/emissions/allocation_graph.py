@@ -6,11 +6,13 @@ from functools import cached_property
 from typing import TYPE_CHECKING, Iterable, Literal
 
 import networkx as nx
+import numpy as np
 import pandas as pd
 import tqdm
 
 import util.graph as graph_util
 from api.logger import logger
+from ocel.encoding import MISSING
 
 if TYPE_CHECKING:
     from emissions.allocation import Allocator
@@ -142,14 +144,22 @@ class ObjectGraph(nx.Graph):
         progress: bool = False,
         **kwargs,
     ) -> pd.DataFrame:
-        relations = self.ocel.relations[["ocel:eid", "ocel:oid"]]
-        relations = relations[relations["ocel:oid"].isin(self.objects)]
+        # Unique E2O pairs of the graph's objects, taken from the incidence index
+        enc, inc = self.ocel.encoding, self.ocel.incidence
         if events is not None:
             # Limit set of events and thus set of objects related to them
-            relations = relations[relations["ocel:eid"].isin(events)]
-            objects = set(relations["ocel:oid"])
+            eids = np.unique(enc.events.encode(list(events)))
+            pairs = inc.pairs_of_events(eids[eids != MISSING])
         else:
-            objects = None
+            pairs = np.arange(inc.num_pairs)
+        pairs = pairs[enc.objects.isin(inc.pair_oids[pairs], self.objects)]
+        relations = pd.DataFrame(
+            {
+                "ocel:eid": enc.events.decode(inc.pair_eids[pairs]),
+                "ocel:oid": enc.objects.decode(inc.pair_oids[pairs]),
+            }
+        )
+        objects = set(relations["ocel:oid"]) if events is not None else None
 
         if object_target_paths is None:
             # First compute paths from all objects to targets
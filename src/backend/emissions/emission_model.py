@@ -7,7 +7,6 @@ from typing import TYPE_CHECKING, Sequence
 
 import numpy as np
 import pandas as pd
-from cachetools import LRUCache
 from pydantic import Field, computed_field, model_validator
 
 import util.pandas as pd_util
@@ -20,7 +19,7 @@ from emissions.allocation import Allocator
 from emissions.rules.emission_rule import EmissionRule
 from ocel.attribute import AttributeDefinition
 from units.pint import PintUnit, UnitMismatchError, is_weight, ureg
-from util.cache import instance_lru_cache
+from util.cache import WeightedCache, instance_lru_cache
 from util.misc import indent
 
 if TYPE_CHECKING:
@@ -217,13 +216,18 @@ class EmissionModel:
         self.alloc: Allocator | None = None
 
         # Instance-level cache object (using cachetools)
-        self.cache = LRUCache(maxsize=128)
         self.cache_lock = Lock()
+        self.cache = WeightedCache(lock=self.cache_lock)
 
     def set_rules(self, rules: Sequence[EmissionRule]):
         self._rules = rules
         self.cache.clear()
 
+    @property
+    def caches(self) -> list[WeightedCache]:
+        """Instance caches of the model and its rules"""
+        return [self.cache, *(rule.cache for rule in self._rules)]
+
     def set_imported_emissions(
         self,
         imported_event_emissions: pd.Series,
@@ -7,7 +7,6 @@ from threading import Lock
 from typing import TYPE_CHECKING, Any, Literal, Sequence, final
 
 import pandas as pd
-from cachetools import LRUCache
 from pydantic import Field, ValidationInfo, computed_field
 
 from api.model.with_ocel import ModelWithOcel, model_ocel_validator
@@ -17,7 +16,7 @@ from emissions.utils import otq
 from ocel.attribute import AttributeDefinition, ObjectAttributeDefinition, OCELAttribute
 from ocel.utils import join_current_attr_values
 from units.pint import is_dimensionless, is_weight
-from util.cache import instance_lru_cache
+from util.cache import WeightedCache, instance_lru_cache
 from util.misc import snake_case
 
 if TYPE_CHECKING:
@@ -46,8 +45,8 @@ class EmissionRule(ModelWithOcel, ABC):
         # Only compute the hash when asked for - in case subclasses call super().__post_init__() first and then change some value.
         object.__setattr__(self, "_hash", None)  # bypass frozen
         # Instance-level cache object (using cachetools)
-        object.__setattr__(self, "cache", LRUCache(maxsize=128))  # bypass frozen
         object.__setattr__(self, "cache_lock", Lock())  # bypass frozen
+        object.__setattr__(self, "cache", WeightedCache(lock=self.cache_lock))  # bypass frozen
 
     @computed_field
     def default_name(self) -> str:
@@ -61,7 +61,7 @@ from ocel.default_ocel import (
     load_default_ocels,
 )
 from ocel.ocel_wrapper import OCELWrapper
-from routes import editor, overview
+from routes import admin, editor, overview
 from units.climatiq import ClimatiqUnitType
 from units.pint import UnitMismatchError, is_weight, ureg
 from util.misc import export_example_settings_as_dotenv, pluralize, set_str
@@ -98,6 +98,7 @@ init_custom_docs(app)
 
 app.include_router(editor.router)
 app.include_router(overview.router)
+app.include_router(admin.router)
 # ----- TASK MANAGEMENT ------------------------------------------------------------------------------------------
 # region
 
@@ -333,7 +334,7 @@ def discover_efg(
         **session.respond(
             route="efg",
             msg=f"Eventually-follows graph of '{req.object_type}' has been discovered.",
-            graph=DirectedGraphResponse.graph_from_tuples(efg),
+            graph=efg,
         )
     )
 
@@ -513,6 +514,9 @@ def import_ocel(
         version_info=True,
         output=False,
         upload_date=upload_date,
+        snapshot=True,
+        lazy=True,
+        mmap=config.MMAP_SNAPSHOTS,
     )
     set_ocel_context(ocel)
 
@@ -688,13 +692,11 @@ def download_ocel(
             # Remove object emissions if contained in OCEL
             if attr_name in ocel.objects.columns:
                 logger.warning(f'Dropping static object attribute "{attr_name}".')
-                ocel.objects.drop(columns=[attr_name], inplace=True)
-                ocel.ocel.objects = ocel.objects
+                ocel.objects = ocel.objects.drop(columns=[attr_name])
             if attr_name in ocel.objects.columns:
                 logger.warning(f'Dropping dynamic object attribute "{attr_name}".')
-                ocel.object_changes.drop(columns=[attr_name], inplace=True)
+                ocel.object_changes = ocel.object_changes.drop(columns=[attr_name])
                 # TODO additionally, might need to drop all ROWS where "ocel:field" == attr_name
-                ocel.ocel.object_changes = ocel.object_changes
             # Add event emissions
             ocel.events = ocel.ocel.events = ocel.events.join(
                 event_emissions.set_index("ocel:eid")[EMISSIONS_KG_NAME].rename(
@@ -703,7 +705,7 @@ def download_ocel(
                 on="ocel:eid",
             )
             # Clear attribute information cache
-            OCELAttribute.reset_attributes_cache(ocel)
+            OCELAttribute.reset_attributes_cache(ocel, columns=[attr_name])
 
             # Add emissions unit to AppState
             activities = sorted(
@@ -739,8 +741,7 @@ def download_ocel(
             # Remove event emissions if contained in OCEL
             if attr_name in ocel.events.columns:
                 logger.warning(f'Dropping event attribute "{attr_name}".')
-                ocel.events.drop(columns=[attr_name], inplace=True)
-                ocel.ocel.events = ocel.events
+                ocel.events = ocel.events.drop(columns=[attr_name])
             # Add object emissions
             ocel.objects = ocel.ocel.objects = ocel.objects.join(
                 object_emissions.rename(attr_name),
@@ -748,7 +749,7 @@ def download_ocel(
                 how="left",
             )
             # Clear attribute information cache
-            OCELAttribute.reset_attributes_cache(ocel)
+            OCELAttribute.reset_attributes_cache(ocel, columns=[attr_name])
 
             # Add emissions unit to AppState
             otypes = sorted(
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import asdict, dataclass
 from functools import cached_property
-from typing import TYPE_CHECKING, Annotated, Any, Literal
+from typing import TYPE_CHECKING, Annotated, Any, Iterable, Literal
 
 import numpy as np
 import pandas as pd
@@ -11,7 +11,8 @@ from pydantic.alias_generators import to_camel
 
 from api.model.ocean_units import Unit
 from api.model.with_ocel import ModelWithOcel, NoOcelError, model_ocel_validator
-from ocel.utils import join_current_attr_values
+from ocel.encoding import MISSING
+from ocel.incidence import timestamp_ns
 from units.pint import PintUnit
 
 if TYPE_CHECKING:
@@ -180,10 +181,15 @@ class OCELAttribute:
         ]
 
     @staticmethod
-    def reset_attributes_cache(ocel: OCELWrapper):
-        del ocel.cache[("attr_info",)]
-        del ocel.cache[("attributes",)]
-        ocel._attr_info_initialized = False
+    def reset_attributes_cache(ocel: OCELWrapper, columns: Iterable[str] | None = None):
+        """Forgets the attribute information and other cached results depending on attribute columns,
+        after they have been added, changed or removed. By default, all attribute columns are assumed to have changed.
+        """
+        if columns is None:
+            columns = {
+                col for table in ATTRIBUTE_TABLES for col in getattr(ocel.ocel, table).columns
+            }
+        ocel.revalidate([(table, col) for table in ATTRIBUTE_TABLES for col in columns])
         # access .attributes to re-compute attr data
         _attributes = ocel.attributes
 
@@ -219,78 +225,21 @@ def attribute_info(ocel: OCELWrapper) -> pd.DataFrame:
     eattr_info_cols = [*common_info_cols, "ocel:activity"]
     # ----- DYNAMIC OBJECT ATTRIUBUTES --------------------------------------------------
     if ocel.oattr_names_dynamic:
-        # Convert dynamic attribute data (from ocel.object_changes) to key-value pairs
-        oattrs_dynamic_values = ocel.object_changes.melt(
-            id_vars=["ocel:oid", "ocel:type", "ocel:timestamp", "ocel:field", "@@cumcount"],
-            value_vars=ocel.oattr_names_dynamic,
-            var_name="ocel:field_2",
-            value_name="ocel:value",
-        ).dropna(subset="ocel:value")
-        assert (
-            oattrs_dynamic_values["ocel:field"] == oattrs_dynamic_values["ocel:field_2"]
-        ).all(), "ocel.object_changes is malformatted"
-        oattrs_dynamic_values.drop(columns=["ocel:field_2"], inplace=True)
-        oattrs_dynamic_info = (
-            oattrs_dynamic_values.groupby(["ocel:type", "ocel:field"])["ocel:value"]
-            .apply(aggregate_attribute_values)
-            .unstack()
-            .reset_index()
-        )
-        # Add E2O availability percentage
-        attr_values = join_current_attr_values(
-            ocel,
-            oattrs_dynamic=ocel.oattr_names_dynamic,
-            oattrs_static=[],
-            otypes=oattrs_dynamic_info["ocel:type"].unique().tolist(),
-        )
-        e2o_availability = (
-            attr_values.groupby(["ocel:type", "ocel:activity"])[ocel.oattr_names_dynamic]  # type: ignore
-            .agg(lambda xs: 1 - xs.isna().sum() / len(xs))
-            .reset_index()
-        )
-        e2o_availability = e2o_availability.melt(
-            id_vars=["ocel:type", "ocel:activity"], var_name="ocel:field", value_name="availability"
-        )
-        e2o_availability.sort_values(
-            ["ocel:type", "ocel:field", "availability"],
-            ascending=[True, True, False],
-            inplace=True,
+        # Statistics and E2O availability, per attribute column (from ocel.object_changes)
+        oattrs_dynamic_info = pd.concat(
+            [ocel.attribute_column_info("object_changes", f) for f in ocel.oattr_names_dynamic],
             ignore_index=True,
         )
-        e2o_availability = (
-            e2o_availability.set_index(["ocel:type", "ocel:field", "ocel:activity"])
-            .groupby(level=[0, 1])["availability"]
-            .agg(lambda xs: xs.to_dict())
-        )
-        e2o_availability = e2o_availability.apply(
-            lambda d: {act: a for (_, _, act), a in d.items()}
-        )
-        oattrs_dynamic_info = oattrs_dynamic_info.merge(
-            e2o_availability, on=["ocel:type", "ocel:field"]
-        )
-        oattrs_dynamic_info["availability"] = oattrs_dynamic_info["availability"].where(
-            oattrs_dynamic_info["availability"].notna(), lambda x: [{}]
-        )
-        oattrs_dynamic_info["dynamic"] = True
     else:
         oattrs_dynamic_info = pd.DataFrame([], columns=oattr_info_cols)
 
     # ----- STATIC OBJECT ATTRIUBUTES --------------------------------------------------
     if ocel.oattr_names_static:
-        # Convert static attribute data (from ocel.objects) to key-value pairs
-        oattrs_static_values = ocel.objects.melt(
-            id_vars=["ocel:oid", "ocel:type"],
-            value_vars=ocel.oattr_names_static,
-            var_name="ocel:field",
-            value_name="ocel:value",
-        ).dropna(subset="ocel:value")
-        oattrs_static_info = (
-            oattrs_static_values.groupby(["ocel:type", "ocel:field"])["ocel:value"]
-            .apply(aggregate_attribute_values)
-            .unstack()
-            .reset_index()
+        # Statistics per attribute column (from ocel.objects)
+        oattrs_static_info = pd.concat(
+            [ocel.attribute_column_info("objects", f) for f in ocel.oattr_names_static],
+            ignore_index=True,
         )
-        oattrs_static_info["dynamic"] = False
     else:
         oattrs_static_info = pd.DataFrame([], columns=oattr_info_cols)
 
@@ -308,21 +257,12 @@ def attribute_info(ocel: OCELWrapper) -> pd.DataFrame:
 
     # ----- EVENT ATTRIUBUTES --------------------------------------------------
     if ocel.eattr_names:
-        # Convert event attribute data (from ocel.events) to key-value pairs
-        eattrs_values = ocel.events.melt(
-            id_vars=["ocel:eid", "ocel:activity"],
-            value_vars=ocel.eattr_names,
-            var_name="ocel:field",
-            value_name="ocel:value",
-        ).dropna(subset="ocel:value")
-        eattrs_info = (
-            eattrs_values.groupby(["ocel:activity", "ocel:field"])["ocel:value"]
-            .apply(aggregate_attribute_values)
-            .unstack()
-            .reset_index()
+        # Statistics per attribute column (from ocel.events)
+        eattrs_info = pd.concat(
+            [ocel.attribute_column_info("events", f) for f in ocel.eattr_names],
+            ignore_index=True,
         )
         eattrs_info["target"] = "event"
-        eattrs_info["dynamic"] = False
     else:
         eattrs_info = pd.DataFrame([], columns=eattr_info_cols)
 
@@ -353,47 +293,158 @@ def attribute_info(ocel: OCELWrapper) -> pd.DataFrame:
     return attrs_info
 
 
-def aggregate_attribute_values(values: pd.Series):
-    """Aggregates all values of an event/object attribute and computes some basic descriptive statistics.
-    Determines whether an attribute is numeric or categorical.
-    If an attribute contains any numeric value, it is considered numeric.
+ATTRIBUTE_TABLES = ("events", "objects", "object_changes")
+"""OCEL tables containing attribute columns"""
+
+
+def attribute_column_info(ocel: OCELWrapper, table: str, column: str) -> pd.DataFrame:
+    """Collects statistics of a single attribute column of ocel.events, ocel.objects or ocel.object_changes,
+    with one row per activity (events) or object type (objects, object_changes).
+    Attributes from ocel.object_changes are dynamic, and their E2O availability is added.
     """
+    if table == "events":
+        info = attribute_statistics(ocel.events[column], ocel.events["ocel:activity"])
+        info = info.rename_axis("ocel:activity").reset_index()
+    elif table == "objects":
+        info = attribute_statistics(ocel.objects[column], ocel.objects["ocel:type"])
+        info = info.rename_axis("ocel:type").reset_index()
+    elif table == "object_changes":
+        object_changes = ocel.object_changes
+        assert (
+            object_changes[column].isna() | (object_changes["ocel:field"] == column)
+        ).all(), "ocel.object_changes is malformatted"
+        info = attribute_statistics(object_changes[column], object_changes["ocel:type"])
+        info = info.rename_axis("ocel:type").reset_index()
+        # Object types without any E2O relations are omitted
+        availability = e2o_availability(ocel, column, info["ocel:type"])
+        info = info.merge(availability, on="ocel:type")
+    else:
+        raise ValueError(f'Unknown attribute table "{table}"')
+    info["ocel:field"] = column
+    info["dynamic"] = table == "object_changes"
+    return info
+
+
+def attribute_statistics(values: pd.Series, groups: pd.Series) -> pd.DataFrame:
+    """Computes basic descriptive statistics of an attribute column per type (activity / object type, given by `groups`).
+    Determines whether an attribute is numeric or categorical. If an attribute contains any numeric value, it is considered numeric.
+    All types are handled at once using vectorized operations, returning one row per type with at least one value (indexed by type).
+    """
+    has_value = values.notna().to_numpy() & groups.notna().to_numpy()
+    values = values[has_value].reset_index(drop=True)
+    codes, labels = pd.factorize(groups[has_value], sort=True)
+    num_groups, positions = len(labels), np.arange(len(codes))
+    first = np.zeros(num_groups, dtype=np.int64)
+    first[codes[::-1]] = positions[::-1]
+
+    # Value type (Python type name), falling back to the dtype when types are mixed
+    if values.dtype == object:
+        type_codes, value_types = pd.factorize(values.map(type))
+        type_names = np.array([t.__name__ for t in value_types], dtype=object)
+        group_types = np.unique(codes.astype(np.int64) * len(type_names) + type_codes)
+        num_types = np.bincount(group_types // max(len(type_names), 1), minlength=num_groups)
+        types = np.where(num_types == 1, type_names[type_codes[first]], str(values.dtype))
+    else:
+        types = np.full(
+            num_groups, type(values[:1].astype(object).iloc[0]).__name__ if len(values) else ""
+        )
+
     numeric_values = pd.to_numeric(values, errors="coerce")
-    value_type = values.dtype
-    type_set = set(values.apply(lambda x: type(x).__name__))
-    if len(type_set) == 1:
-        value_type = list(type_set)[0]
-
-    common = {
-        "num_values": values.count(),
-        "type": value_type,
-    }
-
-    if numeric_values.isna().all():
-        # Not numeric
-        value_counts = values.value_counts()
-        return pd.Series(
-            {
-                **common,
-                "numeric": False,
-                "mode": value_counts.idxmax() if not values.empty else None,
-                "mode_frequency": value_counts.max() if not values.empty else None,
-                "frequent_values": value_counts[:5].to_dict(),
-                "num_unique": len(value_counts),
-            }
+    numeric = (
+        np.bincount(codes, weights=numeric_values.notna().to_numpy(), minlength=num_groups) > 0
+    )
+    info = pd.DataFrame(
+        {"num_values": np.bincount(codes, minlength=num_groups), "type": types, "numeric": numeric}
+    )
+
+    # Numeric attributes: min, max, mean, median
+    is_numeric = numeric[codes]
+    if is_numeric.any():
+        grouped = numeric_values[is_numeric].groupby(codes[is_numeric])
+        grouped_float = numeric_values[is_numeric].astype(float).groupby(codes[is_numeric])
+        info = info.join(
+            pd.DataFrame(
+                {
+                    "min": grouped.min(),
+                    "max": grouped.max(),
+                    "mean": grouped_float.mean(),
+                    "median": grouped_float.median(),
+                }
+            )
         )
-    else:
-        # Numeric
-        return pd.Series(
-            {
-                **common,
-                "numeric": True,
-                "min": numeric_values.min(),
-                "max": numeric_values.max(),
-                "mean": numeric_values.mean(),
-                "median": numeric_values.median(),
-            }
+
+    # Categorical attributes: value counts, sorted by decreasing frequency per group
+    if not is_numeric.all():
+        value_counts = (
+            pd.DataFrame({"group": codes[~is_numeric], "value": values[~is_numeric].to_numpy()})
+            .groupby(["group", "value"], sort=False)
+            .size()
         )
+        group_codes = value_counts.index.get_level_values(0).to_numpy()
+        counts = value_counts.to_numpy()
+        order = np.lexsort((-counts, group_codes))
+        group_codes, counts = group_codes[order], counts[order]
+        unique_values = value_counts.index.get_level_values(1).to_numpy()[order]
+        starts = np.flatnonzero(np.diff(group_codes, prepend=-1) != 0)
+        ends = np.append(starts[1:], len(group_codes))
+        info = info.join(
+            pd.DataFrame(
+                {
+                    "mode": unique_values[starts],
+                    "mode_frequency": counts[starts],
+                    "frequent_values": [
+                        dict(
+                            zip(
+                                unique_values[i : min(i + 5, j)], counts[i : min(i + 5, j)].tolist()
+                            )
+                        )
+                        for i, j in zip(starts, ends)
+                    ],
+                    "num_unique": ends - starts,
+                },
+                index=group_codes[starts],
+            )
+        )
+
+    info.index = pd.Index(labels)
+    return info
+
+
+def e2o_availability(ocel: OCELWrapper, field: str, otypes: Iterable[str]) -> pd.DataFrame:
+    """Returns the share of E2O relations with a current value of a dynamic attribute at the event's timestamp,
+    for each object type and activity. The availability per object type is a dict, sorted by decreasing availability.
+    """
+    enc = ocel.encoding
+    activities, relation_activities = enc.activities, enc.relation_activities
+    rows = np.flatnonzero(
+        enc.otypes.isin(enc.relation_otypes, otypes) & (relation_activities != MISSING)
+    )
+    values = ocel._attribute_values(
+        enc.relation_oids[rows],
+        field,
+        timestamp_ns(ocel.relations["ocel:timestamp"])[rows],
+        static=False,
+    )
+    # Count relations (with values) per (object type, activity)
+    keys = enc.relation_otypes[rows].astype(np.int64) * len(activities) + relation_activities[rows]
+    num_relations = np.bincount(keys, minlength=len(enc.otypes) * len(activities))
+    num_missing = np.bincount(
+        keys, weights=values.isna().to_numpy(), minlength=len(enc.otypes) * len(activities)
+    )
+    (keys,) = np.nonzero(num_relations)
+    availability = pd.DataFrame(
+        {
+            "ocel:type": enc.otypes.decode(keys // len(activities)),
+            "ocel:activity": activities.decode(keys % len(activities)),
+            "availability": 1 - num_missing[keys] / num_relations[keys],
+        }
+    ).sort_values(["ocel:type", "availability", "ocel:activity"], ascending=[True, False, True])
+    return (
+        availability.groupby("ocel:type", sort=False)[["ocel:activity", "availability"]]
+        .apply(lambda df: dict(zip(df["ocel:activity"], df["availability"])))
+        .rename("availability")
+        .reset_index()
+    )
 
 
 def rename_attributes(
@@ -463,8 +514,12 @@ def rename_attributes(
         # ocel.object_changes["ocel:field"].replace(renamer, inplace=True)
         ocel.object_changes.replace({"ocel:field": renamer}, inplace=True)
 
-    # Update or forget cached OCEL properties
-    ocel.cache.clear()  # TODO this should only be used when this function is called ONCE on unit detection -> use dict
-    ocel._attr_info_initialized = False
+    # Forget cached OCEL properties depending on the renamed attributes
+    ocel.revalidate(
+        [
+            *((table, col) for table in ATTRIBUTE_TABLES for col in [*renamer, *renamer.values()]),
+            ("object_changes", "ocel:field"),
+        ]
+    )
     # ocel.attr_info.replace({"ocel:field": renamer}, inplace=True)
     # ocel.eattr_names.cache_clear()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.encoding import MISSING, Codebook, OCELEncoding
+from ocel.incidence import timestamp_ns
+
+
+def upper_bound(
+    values: np.ndarray, lo: np.ndarray, hi: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Vectorized binary search, returning the first position in each sorted range `values[lo:hi]` with a value > target."""
+    lo, hi = lo.copy(), hi.copy()
+    active = np.flatnonzero(lo < hi)
+    while len(active):
+        mid = (lo[active] + hi[active]) // 2
+        right = values[mid] <= targets[active]
+        lo[active[right]] = mid[right] + 1
+        hi[active[~right]] = mid[~right]
+        active = active[lo[active] < hi[active]]
+    return lo
+
+
+@dataclass(frozen=True, eq=False)
+class AttributeChangeIndex:
+    """Compressed sparse row (CSR) index over the dynamic object attribute values in `ocel.object_changes`.
+
+    Changes are grouped by (object, field) segments and sorted by timestamp within each segment (ties by row order).
+    Changes without a value in their field's column are skipped.
+    Looking up the value at a point in time takes one binary search within the segment.
+    """
+
+    encoding: OCELEncoding
+    fields: Codebook
+
+    # Sorted segment keys (object code * number of fields + field code) and CSR bounds
+    keys: np.ndarray
+    indptr: np.ndarray
+
+    # Changes, ordered by segment and timestamp
+    times: np.ndarray  # int64 nanoseconds (see timestamp_ns)
+    rows: np.ndarray  # position in ocel.object_changes
+
+    # Position of each object code in ocel.objects (-1 if not contained)
+    object_rows: np.ndarray
+
+    @staticmethod
+    def from_ocel(ocel: OCEL, encoding: OCELEncoding) -> AttributeChangeIndex:
+        changes = ocel.object_changes
+        object_rows = np.full(len(encoding.objects), MISSING, dtype=np.int64)
+        object_rows[encoding.objects.encode(ocel.objects["ocel:oid"])] = np.arange(
+            len(ocel.objects)
+        )
+
+        if "ocel:field" not in changes.columns:
+            fields = Codebook.from_values()
+            empty = np.array([], dtype=np.int64)
+            return AttributeChangeIndex(
+                encoding, fields, empty, np.zeros(1, dtype=np.int64), empty, empty, object_rows
+            )
+
+        fields = Codebook.from_values(changes["ocel:field"])
+        field_codes = fields.encode(changes["ocel:field"])
+        oid_codes = encoding.objects.encode(changes["ocel:oid"])
+        has_value = np.zeros(len(changes), dtype=bool)
+        for code, field in enumerate(fields.labels):
+            if field in changes.columns:
+                is_field = field_codes == code
+                has_value[is_field] = changes[field][is_field].notna().to_numpy()
+        (rows,) = np.nonzero(has_value & (oid_codes != MISSING))
+
+        all_keys = oid_codes[rows].astype(np.int64) * len(fields) + field_codes[rows]
+        times = timestamp_ns(changes["ocel:timestamp"])[rows]
+        order = np.lexsort((rows, times, all_keys))
+        rows, times, all_keys = rows[order], times[order], all_keys[order]
+        starts = np.flatnonzero(np.diff(all_keys, prepend=-1) != 0)
+
+        return AttributeChangeIndex(
+            encoding=encoding,
+            fields=fields,
+            keys=all_keys[starts],
+            indptr=np.append(starts, len(rows)),
+            times=times,
+            rows=rows,
+            object_rows=object_rows,
+        )
+
+    @property
+    def num_changes(self) -> int:
+        return len(self.rows)
+
+    def lookup(self, oid_codes: np.ndarray, field: str, times: np.ndarray) -> np.ndarray:
+        """Returns the last change of the field at or before each (object, timestamp) query,
+        as position in ocel.object_changes (-1 if there is none). Timestamps are int64 nanoseconds (see timestamp_ns).
+        """
+        result = np.full(len(oid_codes), -1, dtype=np.int64)
+        field_code = self.fields.code(field)
+        if field_code == MISSING or not len(self.keys):
+            return result
+        query_keys = np.asarray(oid_codes).astype(np.int64) * len(self.fields) + field_code
+        segments = np.searchsorted(self.keys, query_keys)
+        found_key = self.keys[np.minimum(segments, len(self.keys) - 1)] == query_keys
+        (found,) = np.nonzero(found_key & (np.asarray(oid_codes) != MISSING))
+        segments = segments[found]
+        lo = self.indptr[segments]
+        ix = upper_bound(self.times, lo, self.indptr[segments + 1], times[found]) - 1
+        has_change = ix >= lo
+        result[found[has_change]] = self.rows[ix[has_change]]
+        return result
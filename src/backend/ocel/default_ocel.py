@@ -1,7 +1,7 @@
 import json
 import os
-from copy import deepcopy
 from functools import cached_property
+from pathlib import Path
 from typing import Any
 
 from pydantic import Field, FilePath
@@ -17,6 +17,7 @@ from ocel.ocel_wrapper import OCELWrapper
 
 data = json.load(open(config.DATA_DIR / "event_logs.json", "r"))
 OCEL_BASE_PATH = config.DATA_DIR / data["base_path"]
+SNAPSHOT_BASE_PATH = config.DATA_DIR / "cache" / "snapshots"
 
 
 class DefaultOCEL(ApiBaseModel):
@@ -36,6 +37,10 @@ class DefaultOCEL(ApiBaseModel):
     def path(self) -> FilePath:
         return OCEL_BASE_PATH / self.file
 
+    @property
+    def snapshot_path(self) -> Path:
+        return SNAPSHOT_BASE_PATH / self.file
+
     @cached_property
     def default_app_state(self) -> dict[str, Any] | None:
         """Reads app state from a .json file named like '<OCEL>.meta.json'.
@@ -47,10 +52,12 @@ class DefaultOCEL(ApiBaseModel):
         return data
 
     def get_ocel_copy(self, use_abbreviations: bool = False) -> OCELWrapper:
-        """Reads the OCEL from the given file (if not done yet), and returns a copy of the stored OCEL object."""
+        """Reads the OCEL from the given file (if not done yet), and returns a copy of the stored OCEL object.
+        The copy shares tables and cached data with the stored OCEL until they are modified (copy-on-write).
+        """
         self.load_ocel()
         ocel = getattr(self, "__ocel")
-        ocel = deepcopy(ocel)
+        ocel = ocel.copy_on_write()
         if use_abbreviations and self.abbr_map:
             ocel = ocel.translate(self.abbr_map)
         return ocel
@@ -64,6 +71,10 @@ class DefaultOCEL(ApiBaseModel):
             str(self.path),
             output=False,
             version_info=True,
+            snapshot=True,
+            snapshot_path=self.snapshot_path,
+            lazy=True,
+            mmap=config.MMAP_SNAPSHOTS,
         )
         object.__setattr__(self, "__ocel", ocel)
 
@@ -158,7 +169,7 @@ def load_default_ocels() -> list[Session]:
         ocel_data.load_ocel()
 
         # Init dummy session with consistent key (for API playground)
-        ocel = getattr(ocel_data, "__ocel")
+        ocel = getattr(ocel_data, "__ocel").copy_on_write()
         em = EmissionModel(ocel=ocel)
         app_state = AppState.instantiate(ocel_data.default_app_state or {}, ocel=ocel)
         session = Session(id=key, ocel=ocel, emission_model=em, app_state=app_state)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Any, Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from util.columnar import read_arrays, write_arrays
+from util.types import PathLike
+
+CODE_DTYPE = np.int32
+MISSING = -1
+"""Code used for missing (NaN) or unknown labels"""
+
+
+class Codebook:
+    """Bijective mapping between labels (event IDs, object IDs, activities, ...) and dense int32 codes.
+    Labels are sorted whenever possible, such that comparing/sorting codes is equivalent to comparing/sorting labels.
+    Missing or unknown labels are encoded as -1 (MISSING).
+    """
+
+    def __init__(self, labels: pd.Index):
+        assert labels.is_unique, "Codebook labels need to be unique."
+        self.labels = labels
+        self._labels_array = labels.to_numpy(dtype=object)
+
+    @staticmethod
+    def from_values(*values: pd.Series | np.ndarray | Sequence) -> Codebook:
+        """Builds a codebook from the union of the unique non-null values of the given columns."""
+        uniques = pd.unique(
+            np.concatenate([pd.Series(v, dtype=object).dropna().unique() for v in values])
+            if values
+            else np.array([], dtype=object)
+        )
+        try:
+            uniques = np.sort(uniques)
+        except TypeError:
+            # Mixed label types, keep order of appearance
+            pass
+        return Codebook(pd.Index(uniques, dtype=object))
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __repr__(self) -> str:
+        return f"Codebook({len(self)} labels)"
+
+    @property
+    def sorted(self) -> bool:
+        return self.labels.is_monotonic_increasing
+
+    def code(self, label: Any) -> int:
+        """Returns the code of a single label, or -1 if unknown."""
+        try:
+            return int(self.labels.get_loc(label))  # type: ignore
+        except KeyError:
+            return MISSING
+
+    def encode(self, values: pd.Series | np.ndarray | Iterable) -> np.ndarray:
+        """Encodes an array of labels. Unknown or missing labels are encoded as -1."""
+        if not isinstance(values, (pd.Series, pd.Index, np.ndarray)):
+            values = pd.Index(list(values), dtype=object)
+        return self.labels.get_indexer(values).astype(CODE_DTYPE, copy=False)
+
+    def decode(self, codes: np.ndarray | pd.Series) -> np.ndarray:
+        """Decodes an array of codes to an object array of labels. Code -1 is decoded to NaN."""
+        codes = np.asarray(codes)
+        labels = self._labels_array.take(codes) if len(self) else np.full(len(codes), np.nan)
+        missing = codes < 0
+        if missing.any():
+            labels[missing] = np.nan
+        return labels
+
+    def mask(self, labels: Iterable | None) -> np.ndarray:
+        """Returns a boolean lookup table over all codes, to be indexed with an array of codes (`table[codes]`).
+        The table has an additional last entry, such that code -1 (missing) always maps to False.
+        Passing None selects all (non-missing) codes."""
+        table = np.zeros(len(self) + 1, dtype=bool)
+        if labels is None:
+            table[:-1] = True
+        else:
+            codes = self.encode(labels)
+            table[codes[codes != MISSING]] = True
+        return table
+
+    def isin(self, codes: np.ndarray | pd.Series, labels: Iterable | None) -> np.ndarray:
+        """Vectorized equivalent of `Series.isin` working on codes."""
+        return self.mask(labels)[np.asarray(codes)]
+
+
+@dataclass(frozen=True, eq=False)
+class OCELEncoding:
+    """Integer-coded representation of the identifier columns of an OCEL.
+
+    Events, objects, activities, object types and qualifiers are mapped to dense int32 codes via `Codebook` objects.
+    Per-event and per-object properties are stored as arrays indexed by event / object code,
+    E2O and O2O relation codes are aligned with the rows of `ocel.relations` and `ocel.o2o`.
+    Event and object codebooks contain all IDs referenced in any relation table, such that relation codes are never -1.
+    """
+
+    events: Codebook
+    objects: Codebook
+    activities: Codebook
+    otypes: Codebook
+    qualifiers: Codebook
+
+    # Activity code per event code, object type code per object code
+    event_activities: np.ndarray
+    object_otypes: np.ndarray
+
+    # E2O relations, aligned with ocel.relations rows
+    relation_eids: np.ndarray
+    relation_oids: np.ndarray
+    relation_activities: np.ndarray
+    relation_otypes: np.ndarray
+    relation_qualifiers: np.ndarray
+
+    # O2O relations, aligned with ocel.o2o rows
+    o2o_oids_1: np.ndarray
+    o2o_oids_2: np.ndarray
+    o2o_qualifiers: np.ndarray
+
+    @staticmethod
+    def from_ocel(ocel: OCEL) -> OCELEncoding:
+        events, objects, relations, o2o = ocel.events, ocel.objects, ocel.relations, ocel.o2o
+
+        eids = Codebook.from_values(events["ocel:eid"], relations["ocel:eid"])
+        oids = Codebook.from_values(
+            objects["ocel:oid"], relations["ocel:oid"], o2o["ocel:oid"], o2o["ocel:oid_2"]
+        )
+        activities = Codebook.from_values(events["ocel:activity"], relations["ocel:activity"])
+        otypes = Codebook.from_values(objects["ocel:type"], relations["ocel:type"])
+        qualifiers = Codebook.from_values(relations["ocel:qualifier"], o2o["ocel:qualifier"])
+
+        event_activities = np.full(len(eids), MISSING, dtype=CODE_DTYPE)
+        event_activities[eids.encode(events["ocel:eid"])] = activities.encode(
+            events["ocel:activity"]
+        )
+        object_otypes = np.full(len(oids), MISSING, dtype=CODE_DTYPE)
+        object_otypes[oids.encode(objects["ocel:oid"])] = otypes.encode(objects["ocel:type"])
+
+        return OCELEncoding(
+            events=eids,
+            objects=oids,
+            activities=activities,
+            otypes=otypes,
+            qualifiers=qualifiers,
+            event_activities=event_activities,
+            object_otypes=object_otypes,
+            relation_eids=eids.encode(relations["ocel:eid"]),
+            relation_oids=oids.encode(relations["ocel:oid"]),
+            relation_activities=activities.encode(relations["ocel:activity"]),
+            relation_otypes=otypes.encode(relations["ocel:type"]),
+            relation_qualifiers=qualifiers.encode(relations["ocel:qualifier"]),
+            o2o_oids_1=oids.encode(o2o["ocel:oid"]),
+            o2o_oids_2=oids.encode(o2o["ocel:oid_2"]),
+            o2o_qualifiers=qualifiers.encode(o2o["ocel:qualifier"]),
+        )
+
+    def write(self, path: PathLike):
+        """Stores the encoding as a directory of .npy files, see `read`"""
+        arrays = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            arrays[f.name] = (
+                value.labels.to_numpy(dtype=object) if isinstance(value, Codebook) else value
+            )
+        write_arrays(arrays, path)
+
+    @staticmethod
+    def read(path: PathLike, mmap: bool = False) -> OCELEncoding:
+        """Reads an encoding stored by `write`. With `mmap=True`, code arrays are memory-mapped read-only."""
+        arrays = read_arrays(path, mmap=mmap)
+        return OCELEncoding(
+            **{
+                f.name: (
+                    Codebook(pd.Index(arrays[f.name], dtype=object))
+                    if f.type == "Codebook"
+                    else arrays[f.name]
+                )
+                for f in fields(OCELEncoding)
+            }
+        )
+
+    @property
+    def num_relations(self) -> int:
+        return len(self.relation_eids)
+
+    def otype_of(self, oid_codes: np.ndarray | pd.Series) -> np.ndarray:
+        """Returns the object type codes of the given object codes (-1 for unknown objects)."""
+        return np.append(self.object_otypes, MISSING)[np.asarray(oid_codes)]
+
+    def activity_of(self, eid_codes: np.ndarray | pd.Series) -> np.ndarray:
+        """Returns the activity codes of the given event codes (-1 for unknown events)."""
+        return np.append(self.event_activities, MISSING)[np.asarray(eid_codes)]
+
+    def object_order(
+        self,
+        oid_codes: np.ndarray,
+        otype_codes: np.ndarray,
+        otype_order: Sequence[str],
+        prepend: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Numeric equivalent of `ocel.utils.add_object_order`, returning an int64 sort key per object.
+        Objects are ordered by the given object type order, then by object ID.
+        Optionally, a superior order (small non-negative integers) can be passed via `prepend`.
+        Requires a sorted object codebook."""
+        assert self.objects.sorted, "object_order requires a sorted object codebook."
+        n_otypes, n_objects = len(otype_order) + 1, len(self.objects)
+        otype_ix = np.full(len(self.otypes) + 1, len(otype_order), dtype=np.int64)
+        for i, ot in enumerate(otype_order):
+            code = self.otypes.code(ot)
+            if code != MISSING:
+                otype_ix[code] = i
+        key = otype_ix[np.asarray(otype_codes)] * n_objects + np.asarray(oid_codes, dtype=np.int64)
+        if prepend is not None:
+            key += np.asarray(prepend, dtype=np.int64) * (n_otypes * n_objects)
+        return key
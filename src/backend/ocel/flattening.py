@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+from pm4py.util import constants, xes_constants
+from pm4py.util.compression.dtypes import UVCL
+
+from ocel.encoding import MISSING, OCELEncoding
+from ocel.incidence import NAT_NS, IncidenceIndex, timestamp_ns
+
+
+def flattened_pairs(
+    ocel: OCEL,
+    encoding: OCELEncoding,
+    incidence: IncidenceIndex,
+    otypes: Iterable[str] | None = None,
+) -> np.ndarray:
+    """Returns the E2O pairs contained in the flattened logs of the given object types (default: all),
+    sorted by object, event timestamp and position in ocel.events (the order used by pm4py's discovery algorithms).
+    Like pm4py.ocel_flattening, objects need to have the same type in ocel.objects and ocel.relations,
+    and events need to be contained in ocel.events.
+    Pairs with multiple relation rows (e.g., multiple qualifiers) are repeated once per row, as in pm4py's flattened logs.
+    """
+    enc, inc = encoding, incidence
+    pair_otypes = enc.relation_otypes[inc.pair_rows]
+    (pairs,) = np.nonzero(
+        enc.otypes.isin(pair_otypes, otypes)
+        & (enc.object_otypes[inc.pair_oids] == pair_otypes)
+        & (enc.event_activities[inc.pair_eids] != MISSING)
+    )
+    pairs = np.repeat(pairs, inc.pair_multiplicities[pairs])
+    event_codes = enc.events.encode(ocel.events["ocel:eid"])
+    event_rows = np.full(len(enc.events), MISSING, dtype=np.int64)
+    event_rows[event_codes] = np.arange(len(event_codes))
+    event_times = np.full(len(enc.events), NAT_NS, dtype=np.int64)
+    event_times[event_codes] = timestamp_ns(ocel.events["ocel:timestamp"])
+    # Missing timestamps are sorted last
+    event_times[event_times == NAT_NS] = np.iinfo(np.int64).max
+    eids = inc.pair_eids[pairs]
+    return pairs[np.lexsort((event_rows[eids], event_times[eids], inc.pair_oids[pairs]))]
+
+
+@dataclass(frozen=True, eq=False)
+class FlattenedLog:
+    """Flattened log of an OCEL for one object type (see pm4py.ocel_flattening), where each object is a case.
+    Represented as index arrays over ocel.events and ocel.objects, without copying or referencing any table.
+    Rows are ordered by case and timestamp (see flattened_pairs).
+    A pm4py-compatible DataFrame is only created on demand (see to_pm4py).
+    """
+
+    encoding: OCELEncoding
+    otype: str
+
+    # Position of each row's event in ocel.events and of its case (object) in ocel.objects
+    event_rows: np.ndarray
+    object_rows: np.ndarray
+    # Activity code of each row (see OCELEncoding.activities)
+    activities: np.ndarray
+
+    @staticmethod
+    def from_ocel(
+        ocel: OCEL, encoding: OCELEncoding, incidence: IncidenceIndex, otype: str
+    ) -> FlattenedLog:
+        pairs = flattened_pairs(ocel, encoding, incidence, otypes=[otype])
+        event_rows = np.full(len(encoding.events), MISSING, dtype=np.int64)
+        event_rows[encoding.events.encode(ocel.events["ocel:eid"])] = np.arange(len(ocel.events))
+        object_rows = np.full(len(encoding.objects), MISSING, dtype=np.int64)
+        object_rows[encoding.objects.encode(ocel.objects["ocel:oid"])] = np.arange(
+            len(ocel.objects)
+        )
+        eids = incidence.pair_eids[pairs]
+        return FlattenedLog(
+            encoding=encoding,
+            otype=otype,
+            event_rows=event_rows[eids],
+            object_rows=object_rows[incidence.pair_oids[pairs]],
+            activities=encoding.event_activities[eids],
+        )
+
+    def __len__(self) -> int:
+        return len(self.event_rows)
+
+    @property
+    def case_starts(self) -> np.ndarray:
+        """Row positions where a new case starts"""
+        return np.flatnonzero(np.diff(self.object_rows, prepend=MISSING) != 0)
+
+    @property
+    def num_cases(self) -> int:
+        return len(self.case_starts)
+
+    def to_pm4py(self, ocel: OCEL) -> pd.DataFrame:
+        """Returns the flattened log as pm4py DataFrame, equal to the output of pm4py.ocel_flattening
+        (rows in order of ocel.events, columns `concept:name`, `time:timestamp` and `case:` prefixed object attributes).
+        Takes all columns from the given OCEL, which needs to have the events and objects the log has been created from.
+        """
+        order = np.lexsort((self.object_rows, self.event_rows))
+        events = ocel.events.iloc[self.event_rows[order]].reset_index(drop=True)
+        objects = ocel.objects.iloc[self.object_rows[order]].reset_index(drop=True)
+        objects = objects.rename(columns={"ocel:oid": xes_constants.DEFAULT_TRACEID_KEY})
+        objects.columns = [constants.CASE_ATTRIBUTE_PREFIX + col for col in objects.columns]
+        events = events.rename(
+            columns={
+                "ocel:activity": xes_constants.DEFAULT_NAME_KEY,
+                "ocel:timestamp": xes_constants.DEFAULT_TIMESTAMP_KEY,
+            }
+        )
+        return pd.concat([events, objects], axis=1)
+
+
+VARIANT_HASH_BASES = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F)
+"""Odd 64-bit bases of the polynomial hashes identifying activity sequences (see sequence_hashes)"""
+
+
+def sequence_hashes(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Polynomial hashes (modulo 2^64) of the sequences of non-negative integers starting at the given positions,
+    each running until the next start. Returns one column per base in VARIANT_HASH_BASES.
+    """
+    positions = np.arange(len(values)) - np.repeat(starts, np.diff(starts, append=len(values)))
+    terms = values.astype(np.uint64) + np.uint64(1)
+    hashes = np.zeros((len(starts), len(VARIANT_HASH_BASES)), dtype=np.uint64)
+    if not len(values):
+        return hashes
+    for i, base in enumerate(VARIANT_HASH_BASES):
+        # Powers of the base, wrapping around on overflow
+        powers = np.full(positions.max() + 1, base, dtype=np.uint64)
+        powers[0] = 1
+        powers = np.cumprod(powers)
+        hashes[:, i] = np.add.reduceat(terms * powers[positions], starts)
+    return hashes
+
+
+@dataclass(frozen=True, eq=False)
+class VariantLog:
+    """Variant-compressed flattened log, where cases with the same activity sequence share a variant.
+    Variants are identified by hashing the sequences (see sequence_hashes) together with their length,
+    and numbered in order of their first case. Sequences are only materialized per variant (see to_pm4py).
+    """
+
+    log: FlattenedLog
+
+    case_variants: np.ndarray  # variant ID of each case
+    variant_cases: np.ndarray  # first case of each variant
+    counts: np.ndarray  # number of cases of each variant
+
+    @staticmethod
+    def from_flattened_log(log: FlattenedLog) -> VariantLog:
+        starts = log.case_starts
+        lengths = np.diff(starts, append=len(log)).astype(np.uint64)
+        keys = np.column_stack([lengths, sequence_hashes(log.activities, starts)])
+        _, first, inverse, counts = np.unique(
+            keys, axis=0, return_index=True, return_inverse=True, return_counts=True
+        )
+        order = np.argsort(first)
+        variant_ids = np.empty_like(order)
+        variant_ids[order] = np.arange(len(order))
+        return VariantLog(
+            log=log,
+            case_variants=variant_ids[inverse.reshape(-1)],
+            variant_cases=first[order],
+            counts=counts[order],
+        )
+
+    def __len__(self) -> int:
+        return len(self.variant_cases)
+
+    @property
+    def num_events(self) -> int:
+        """Total number of events of all variants (each variant counted once)"""
+        starts = self.log.case_starts
+        lengths = np.diff(starts, append=len(self.log))
+        return int(lengths[self.variant_cases].sum())
+
+    def sequences(self) -> list[tuple[str, ...]]:
+        """Activity sequence of each variant"""
+        starts = np.append(self.log.case_starts, len(self.log))
+        activities = self.log.encoding.activities
+        return [
+            tuple(activities.decode(self.log.activities[starts[case] : starts[case + 1]]))
+            for case in self.variant_cases
+        ]
+
+    def to_pm4py(self) -> UVCL:
+        """Returns the variants with their number of cases as pm4py univariate variant-compressed log (UVCL),
+        as used by pm4py's inductive miner."""
+        return Counter(dict(zip(self.sequences(), self.counts.tolist())))
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.encoding import CODE_DTYPE, OCELEncoding
+
+
+def csr_gather(indptr: np.ndarray, values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Concatenates the CSR rows `values[indptr[k]:indptr[k+1]]` of all given keys, without a Python loop."""
+    keys = np.asarray(keys)
+    starts = indptr[keys]
+    lengths = indptr[keys + 1] - starts
+    if not len(lengths):
+        return values[:0]
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return values[offsets + np.arange(lengths.sum())]
+
+
+def timestamp_array(timestamps: pd.Series) -> np.ndarray:
+    """Returns a sortable datetime64 array of a timestamp column (timezone-aware timestamps are converted to UTC)."""
+    if isinstance(timestamps.dtype, pd.DatetimeTZDtype):
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps.to_numpy()
+
+
+NAT_NS = np.iinfo(np.int64).min
+"""Integer nanosecond representation of NaT, sorting before all timestamps"""
+
+
+def timestamp_ns(timestamps: pd.Series) -> np.ndarray:
+    """Returns a timestamp column as int64 nanoseconds (UTC), with NaT as NAT_NS."""
+    return timestamp_array(timestamps).astype("datetime64[ns]").view(np.int64)
+
+
+@dataclass(frozen=True, eq=False)
+class IncidenceIndex:
+    """Compressed sparse row (CSR) index over the E2O relations of an OCEL.
+
+    E2O relations are deduplicated to unique (event, object) pairs, represented by their first row in `ocel.relations`.
+    Pair IDs are ordered like the relation rows, such that selecting pairs in ascending order equals `drop_duplicates`.
+    Two CSR permutations give access to the pairs of an event (sorted by object) and of an object (sorted by timestamp).
+    Lifecycle positions and successors are derived once from the object permutation and shared by all object type filters.
+    """
+
+    encoding: OCELEncoding
+
+    # Unique E2O pairs (in order of first appearance in ocel.relations)
+    pair_rows: np.ndarray  # position of the first relation row of each pair
+    pair_eids: np.ndarray
+    pair_oids: np.ndarray
+    relation_pairs: np.ndarray  # pair ID of each relation row
+
+    # event -> objects (pairs sorted by object code)
+    event_indptr: np.ndarray
+    event_pairs: np.ndarray
+
+    # object -> events (pairs sorted by timestamp)
+    object_indptr: np.ndarray
+    object_pairs: np.ndarray
+
+    # Position of each pair in its object's lifecycle, and the succeeding pair (-1 for the last event)
+    pair_lifecycle_index: np.ndarray
+    pair_successors: np.ndarray
+
+    @staticmethod
+    def from_ocel(ocel: OCEL, encoding: OCELEncoding) -> IncidenceIndex:
+        n_events, n_objects = len(encoding.events), len(encoding.objects)
+        relation_eids, relation_oids = encoding.relation_eids, encoding.relation_oids
+
+        # Deduplicate (event, object) pairs, keeping the first relation row
+        key = relation_eids.astype(np.int64) * n_objects + relation_oids
+        uniques, first_rows, relation_pairs = np.unique(key, return_index=True, return_inverse=True)
+        # Re-number pairs by first appearance
+        pair_rows = np.sort(first_rows)
+        pair_ids = np.empty(len(uniques), dtype=np.int64)
+        pair_ids[np.argsort(first_rows, kind="stable")] = np.arange(len(uniques))
+        relation_pairs = pair_ids[relation_pairs.reshape(-1)]
+        pair_eids, pair_oids = relation_eids[pair_rows], relation_oids[pair_rows]
+
+        # event -> objects
+        event_pairs = np.lexsort((pair_oids, pair_eids))
+        event_indptr = np.zeros(n_events + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pair_eids, minlength=n_events), out=event_indptr[1:])
+
+        # object -> events, ordered by timestamp (ties by relation order)
+        timestamps = timestamp_array(ocel.relations["ocel:timestamp"])[pair_rows]
+        object_pairs = np.lexsort((pair_rows, timestamps, pair_oids))
+        object_counts = np.bincount(pair_oids, minlength=n_objects)
+        object_indptr = np.zeros(n_objects + 1, dtype=np.int64)
+        np.cumsum(object_counts, out=object_indptr[1:])
+
+        pair_lifecycle_index = np.empty(len(pair_rows), dtype=np.int64)
+        pair_lifecycle_index[object_pairs] = np.arange(len(pair_rows)) - np.repeat(
+            object_indptr[:-1], object_counts
+        )
+        pair_successors = np.full(len(pair_rows), -1, dtype=np.int64)
+        same_object = pair_oids[object_pairs[1:]] == pair_oids[object_pairs[:-1]]
+        pair_successors[object_pairs[:-1][same_object]] = object_pairs[1:][same_object]
+
+        return IncidenceIndex(
+            encoding=encoding,
+            pair_rows=pair_rows,
+            pair_eids=pair_eids,
+            pair_oids=pair_oids,
+            relation_pairs=relation_pairs,
+            event_indptr=event_indptr,
+            event_pairs=event_pairs,
+            object_indptr=object_indptr,
+            object_pairs=object_pairs,
+            pair_lifecycle_index=pair_lifecycle_index,
+            pair_successors=pair_successors,
+        )
+
+    @property
+    def num_pairs(self) -> int:
+        return len(self.pair_rows)
+
+    @property
+    def has_duplicate_relations(self) -> bool:
+        return self.num_pairs < len(self.relation_pairs)
+
+    @property
+    def pair_multiplicities(self) -> np.ndarray:
+        """Number of relation rows of each pair (more than one for pairs with multiple qualifiers)"""
+        return np.bincount(self.relation_pairs, minlength=self.num_pairs)
+
+    @property
+    def event_degrees(self) -> np.ndarray:
+        """Number of distinct objects per event code"""
+        return np.diff(self.event_indptr)
+
+    @property
+    def object_degrees(self) -> np.ndarray:
+        """Number of distinct events per object code"""
+        return np.diff(self.object_indptr)
+
+    def objects_of(self, eid_code: int) -> np.ndarray:
+        """Object codes related to an event"""
+        pairs = self.event_pairs[self.event_indptr[eid_code] : self.event_indptr[eid_code + 1]]
+        return self.pair_oids[pairs]
+
+    def events_of(self, oid_code: int) -> np.ndarray:
+        """Event codes related to an object, sorted by timestamp"""
+        pairs = self.object_pairs[self.object_indptr[oid_code] : self.object_indptr[oid_code + 1]]
+        return self.pair_eids[pairs]
+
+    def pairs_of_events(self, eid_codes: np.ndarray) -> np.ndarray:
+        """Pair IDs of all E2O relations of the given events"""
+        return csr_gather(self.event_indptr, self.event_pairs, eid_codes)
+
+    def pairs_of_objects(self, oid_codes: np.ndarray) -> np.ndarray:
+        """Pair IDs of all E2O relations of the given objects, each object's pairs sorted by timestamp"""
+        return csr_gather(self.object_indptr, self.object_pairs, oid_codes)
+
+    def mean_lifecycle_index(self, pairs: np.ndarray | None = None) -> np.ndarray:
+        """Returns the average lifecycle index of each event code over the given pairs (NaN for events without pairs)."""
+        if pairs is None:
+            pairs = np.arange(self.num_pairs)
+        n_events = len(self.encoding.events)
+        eids = self.pair_eids[pairs]
+        sums = np.bincount(eids, weights=self.pair_lifecycle_index[pairs], minlength=n_events)
+        counts = np.bincount(eids, minlength=n_events)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return sums / counts
+
+    def incidence_matrix(
+        self, pair_mask: np.ndarray | None = None, transpose: bool = False
+    ) -> sp.csr_matrix:
+        """Binary sparse event x object matrix B of the unique E2O pairs, optionally restricted to some pairs.
+        With `transpose=True`, returns the object x event matrix Bᵀ instead.
+        The matrix is assembled from the CSR permutations, without sorting."""
+        n_events, n_objects = len(self.encoding.events), len(self.encoding.objects)
+        if transpose:
+            rows, cols, pairs = self.pair_oids, self.pair_eids, self.object_pairs
+            shape = (n_objects, n_events)
+        else:
+            rows, cols, pairs = self.pair_eids, self.pair_oids, self.event_pairs
+            shape = (n_events, n_objects)
+        if pair_mask is not None:
+            pairs = pairs[pair_mask[pairs]]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows[pairs], minlength=shape[0]), out=indptr[1:])
+        data = np.ones(len(pairs), dtype=np.int32)
+        return sp.csr_matrix((data, cols[pairs], indptr), shape=shape)
+
+    def cooccurrences(
+        self, pair_mask1: np.ndarray | None = None, pair_mask2: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Counts the events shared by pairs of distinct objects, as the sparse product B1ᵀ·B2
+        of the incidence matrices restricted to the pairs selected by the two masks.
+        Returns the object codes (oid_1, oid_2) and counts of all pairs sharing an event, sorted by object codes.
+        """
+        b1_transposed = self.incidence_matrix(pair_mask1, transpose=True)
+        product = b1_transposed @ self.incidence_matrix(pair_mask2)
+        product.sort_indices()
+        oids_1 = np.repeat(np.arange(product.shape[0], dtype=CODE_DTYPE), np.diff(product.indptr))
+        oids_2, counts = product.indices.astype(CODE_DTYPE), product.data.astype(np.int64)
+        keep = oids_1 != oids_2
+        return oids_1[keep], oids_2[keep], counts[keep]
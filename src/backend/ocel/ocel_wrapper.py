@@ -4,6 +4,7 @@ import platform
 import re
 import sys
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
@@ -14,26 +15,82 @@ import networkx as nx
 import numpy as np
 import pandas as pd
 import pm4py
-from cachetools import LRUCache
 from pm4py.objects.ocel.obj import OCEL
 
 from api.logger import logger
+from ocel import sqlite_reader
 from ocel.attribute import (
     AttributeDefinition,
     AttributeDefinitionBase,
     EventAttributeDefinition,
     ObjectAttributeDefinition,
     OCELAttribute,
+    attribute_column_info,
     attribute_info,
 )
-from ocel.utils import add_object_order, filter_pm4py_ocel, filter_relations
-from util.cache import instance_lru_cache
+from ocel.changes import AttributeChangeIndex
+from ocel.encoding import CODE_DTYPE, MISSING, OCELEncoding
+from ocel.flattening import FlattenedLog, VariantLog, flattened_pairs
+from ocel.incidence import IncidenceIndex, timestamp_ns
+from ocel.ocpn import (
+    OCPN_WORKER_MIN_EVENTS,
+    discover_dfg_petri_net,
+    discover_otype_petri_net,
+    discover_variant_petri_net,
+    merge_ocpn,
+    otype_dfg,
+    otype_ocel,
+    run_in_worker,
+)
+from ocel.snapshot import (
+    read_snapshot,
+    read_snapshot_encoding,
+    snapshot_is_current,
+    write_snapshot,
+)
+from ocel.utils import filter_pm4py_ocel, filter_relations
+from ocel.view import TABLE_NAMES, OCELView, num_rows, shared_ocel
+from util.artifacts import ArtifactStore
+from util.cache import (
+    Dependency,
+    WeightedCache,
+    affects,
+    cache_metrics,
+    instance_lru_cache,
+)
+from util.graph import transitive_closure
 from util.misc import exactly_one, pluralize
-from util.pandas import mirror_dataframe, mmmm
+from util.pandas import mmmm
 from util.types import PathLike
 
 # from sklearn.cluster import KMeans
 
+EAGER_TABLES = ("events", "objects", "relations", "o2o")
+"""Tables of lazily loaded OCELs that are read at import, as they are needed for the integer encoding and by most requests"""
+
+# Dependencies of cached methods (see instance_lru_cache), invalidated by editing (see revalidate)
+EVENT_IDS = ("events", "ocel:eid")
+EVENT_ACTIVITIES = ("events", "ocel:activity")
+EVENT_TIMESTAMPS = ("events", "ocel:timestamp")
+OBJECT_IDS = ("objects", "ocel:oid")
+OBJECT_TYPES = ("objects", "ocel:type")
+LOG_STRUCTURE = (
+    EVENT_IDS,
+    EVENT_ACTIVITIES,
+    EVENT_TIMESTAMPS,
+    OBJECT_IDS,
+    OBJECT_TYPES,
+    "relations",
+    "o2o",
+)
+"""All data except attribute columns and object changes"""
+ATTRIBUTE_COLUMN_DEPENDENCIES: dict[str, tuple[Dependency, ...]] = {
+    "events": (EVENT_ACTIVITIES,),
+    "objects": (OBJECT_TYPES,),
+    "object_changes": ("object_changes", *LOG_STRUCTURE),
+}
+"""Data the statistics of an attribute column depend on, besides the column itself (see attribute_column_info)"""
+
 
 class OCELWrapper:
     def __init__(self, ocel: OCEL):
@@ -41,37 +98,90 @@ class OCELWrapper:
         # Metadata, to be set manually after creating the instance
         self.filtered_from: OCELWrapper | None = None
         self.meta: dict[str, Any] = {}
-        self._cache_info = {}
         self._attr_info_initialized = False
-
-        # pm4py aliases
-        self.events = ocel.events
-        self.objects = ocel.objects
-        self.object_changes = ocel.object_changes
-        self.relations = ocel.relations
+        # Attribute statistics per (table, column), kept when other columns change (see revalidate)
+        self._attr_column_info: dict[tuple[str, str], pd.DataFrame] = {}
+        # On-disk store of derived data, only set for unmodified OCELs read from a file
+        self.artifacts: ArtifactStore | None = None
 
         self._init_cache()
 
     def _init_cache(self):
         # Instance-level cache object (using cachetools)
-        self.cache = LRUCache(maxsize=128)
         self.cache_lock = Lock()
+        self.cache = WeightedCache(lock=self.cache_lock)
+
+    # ----- pm4py ALIASES ------------------------------------------------------------------------------------------
+    # region
+    # Tables are not aliased at init, as filtered and lazily loaded OCELs (OCELView) materialize them on first access.
+
+    @property
+    def events(self) -> pd.DataFrame:
+        return self.ocel.events
+
+    @events.setter
+    def events(self, events: pd.DataFrame):
+        self.ocel.events = events
+
+    @property
+    def objects(self) -> pd.DataFrame:
+        return self.ocel.objects
+
+    @objects.setter
+    def objects(self, objects: pd.DataFrame):
+        self.ocel.objects = objects
+
+    @property
+    def object_changes(self) -> pd.DataFrame:
+        return self.ocel.object_changes
+
+    @object_changes.setter
+    def object_changes(self, object_changes: pd.DataFrame):
+        self.ocel.object_changes = object_changes
+
+    @property
+    def relations(self) -> pd.DataFrame:
+        return self.ocel.relations
+
+    @relations.setter
+    def relations(self, relations: pd.DataFrame):
+        self.ocel.relations = relations
+
+    def load(self, *tables: str) -> OCELWrapper:
+        """Loads the given tables (default: all) of a lazily loaded OCEL (see OCELView)"""
+        if isinstance(self.ocel, OCELView):
+            self.ocel.materialize(tables or TABLE_NAMES)
+        return self
+
+    def unload(self, *tables: str) -> list[str]:
+        """Frees the given tables (default: all) if they can be loaded again from their source, e.g. a snapshot.
+        Returns the names of unloaded tables. Modified tables are kept."""
+        if isinstance(self.ocel, OCELView):
+            return self.ocel.unload(tables or TABLE_NAMES)
+        return []
+
+    def pin(self):
+        """Prevents unloading the currently loaded tables, to be called after modifying them in-place."""
+        if isinstance(self.ocel, OCELView):
+            self.ocel.pin()
+
+    # endregion
 
     # ----- BASIC PROPERTIES / STATS ------------------------------------------------------------------------------------------
     # region
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[EVENT_ACTIVITIES])
     def activities(self) -> list[str]:
         return list(sorted(self.ocel.events["ocel:activity"].unique().tolist()))
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[EVENT_ACTIVITIES])
     def activity_counts(self) -> pd.Series:
         return self.ocel.events["ocel:activity"].value_counts()
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[OBJECT_TYPES])
     def object_types(self) -> list[str]:
         return list(sorted(self.ocel.objects["ocel:type"].unique().tolist()))
 
@@ -81,12 +191,12 @@ class OCELWrapper:
         return self.object_types
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[OBJECT_TYPES])
     def otype_counts(self) -> pd.Series:
         return self.ocel.objects["ocel:type"].value_counts()
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[OBJECT_IDS, OBJECT_TYPES])
     def objects_with_otypes(self) -> pd.Series:
         """pandas Series containing the object type of each object"""
         return self.ocel.objects[["ocel:oid", "ocel:type"]].set_index("ocel:oid")[
@@ -94,7 +204,7 @@ class OCELWrapper:
         ]
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[EVENT_IDS, EVENT_ACTIVITIES])
     def events_with_activities(self) -> pd.Series:
         """pandas Series containing the activity of each event"""
         return self.ocel.events[["ocel:eid", "ocel:activity"]].set_index("ocel:eid")[
@@ -111,6 +221,18 @@ class OCELWrapper:
         """Alias for events_with_activities"""
         return self.events_with_activities
 
+    @property
+    @instance_lru_cache(depends_on=LOG_STRUCTURE)
+    def encoding(self) -> OCELEncoding:
+        """Integer codes of events, objects, activities, object types and qualifiers (see OCELEncoding)"""
+        return OCELEncoding.from_ocel(self.ocel)
+
+    @property
+    @instance_lru_cache(depends_on=["relations"])
+    def incidence(self) -> IncidenceIndex:
+        """CSR index of events and objects over the E2O relations (see IncidenceIndex)"""
+        return IncidenceIndex.from_ocel(self.ocel, self.encoding)
+
     def has_object_types(self, otypes: Iterable[str]) -> bool:
         return all(ot in self.otypes for ot in otypes)
 
@@ -122,7 +244,7 @@ class OCELWrapper:
     # ----- PROCESS DISCOVERY ------------------------------------------------------------------------------------------
     # region
 
-    @instance_lru_cache(make_hashable=True)
+    @instance_lru_cache(make_hashable=True, depends_on=LOG_STRUCTURE)
     def ocpn(
         self,
         otypes: set[str] | None = None,
@@ -133,7 +255,9 @@ class OCELWrapper:
         Discovers an Object-centric Petri Net (OCPN), filtering for a given list of object types.
         Uses a custom cache, able to save multiple OCPNs for different object type sets.
 
-        Wrapper for pm4py's OCPN discovery method (pm4py.discover_oc_petri_net)
+        The Petri nets of the object types are discovered concurrently in worker processes,
+        reusing the nets of object types that have been discovered before (see otype_petri_net).
+        Equivalent to pm4py's OCPN discovery method (pm4py.discover_oc_petri_net) on the filtered OCEL.
         """
         # Complete parameters
         if otypes is None:
@@ -144,44 +268,138 @@ class OCELWrapper:
                 f"OCPN Discovery received invalid or empty object type set."
             )
 
-        # Discover OCPN
-        # TODO might use own filter function
-        filtered_ocel = pm4py.filter_ocel_object_types(self.ocel, sorted_otypes)
-        ocpn = pm4py.discover_oc_petri_net(
-            filtered_ocel,
-            inductive_miner_variant=inductive_miner_variant,
-            diagnostics_with_tbr=diagnostics_with_tbr,
-        )
+        # Discover Petri nets per object type
+        encoding, incidence = self.encoding, self.incidence
+        with ThreadPoolExecutor(max_workers=len(sorted_otypes)) as pool:
+            petri_nets = pool.map(
+                lambda ot: self.otype_petri_net(
+                    ot, inductive_miner_variant, diagnostics_with_tbr
+                ),
+                sorted_otypes,
+            )
+            petri_nets = dict(zip(sorted_otypes, petri_nets))
 
-        return ocpn
+        return merge_ocpn(encoding, incidence, petri_nets)
 
-    @instance_lru_cache()
-    def flatten(self, otype: str) -> pd.DataFrame:
+    @instance_lru_cache(persistent=True, depends_on=LOG_STRUCTURE)
+    def otype_petri_net(
+        self,
+        otype: str,
+        inductive_miner_variant: Literal["im", "imd"] = "im",
+        diagnostics_with_tbr: bool = False,
+    ) -> dict[str, Any]:
+        """Discovers the Petri net of a single object type in a worker process (see ocel.ocpn).
+        IM is fed the variant log (see variant_log), IMd the object type's DFG (see otype_dfg), token-based replay needs the full OCEL.
+        Results are stored on disk, such that OCPNs of other object type sets only discover the missing types.
+        """
+        if diagnostics_with_tbr:
+            ocel = otype_ocel(self.ocel, self.encoding, self.incidence, otype)
+            func, args = discover_otype_petri_net, (
+                ocel,
+                otype,
+                inductive_miner_variant,
+                True,
+            )
+            num_events = len(ocel.relations)
+        elif inductive_miner_variant == "imd":
+            # IMd only processes the DFG, which is small regardless of the log size
+            return discover_dfg_petri_net(otype_dfg(self.ocel, self.encoding, otype))
+        else:
+            variant_log = self.variant_log(otype)
+            func, args = discover_variant_petri_net, (variant_log.to_pm4py(),)
+            num_events = variant_log.num_events
+        if num_events < OCPN_WORKER_MIN_EVENTS:
+            # Small logs are discovered right away, starting or messaging a worker would take longer
+            return func(*args)
+        return run_in_worker(func, *args)
+
+    @instance_lru_cache(depends_on=[EVENT_IDS, EVENT_TIMESTAMPS, OBJECT_IDS])
+    def flattened_log(self, otype: str) -> FlattenedLog:
+        """Flattened log of an object type, as index arrays over ocel.events and ocel.objects (see FlattenedLog)"""
         if otype not in self.otypes:
             raise ValueError(f"Object type '{otype}' not found")
-        return pm4py.ocel.ocel_flattening(ocel=self.ocel, object_type=otype)
+        return FlattenedLog.from_ocel(self.ocel, self.encoding, self.incidence, otype)
 
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
+    def variant_log(self, otype: str) -> VariantLog:
+        """Variant-compressed flattened log of an object type (see VariantLog)"""
+        return VariantLog.from_flattened_log(self.flattened_log(otype))
+
+    def flatten(self, otype: str) -> pd.DataFrame:
+        """Returns the flattened log of an object type as pm4py DataFrame (like pm4py.ocel_flattening).
+        Not cached, use flattened_log where no pm4py algorithm is involved."""
+        return self.flattened_log(otype).to_pm4py(self.ocel)
+
+    @property
+    @instance_lru_cache(depends_on=[EVENT_IDS, EVENT_TIMESTAMPS])
+    def directly_follows_table(self) -> pd.DataFrame:
+        """Directly-follows relations of all object types at once, with their frequencies (freq).
+        Counts succeeding events within the lifecycles of all objects, like DFG discovery on each flattened log (see flattened_pairs).
+        As in pm4py, an event related to an object via multiple qualifiers directly follows itself.
+        """
+        enc, inc = self.encoding, self.incidence
+        pairs = flattened_pairs(self.ocel, enc, inc)
+        same_object = inc.pair_oids[pairs[1:]] == inc.pair_oids[pairs[:-1]]
+        pairs_1, pairs_2 = pairs[:-1][same_object], pairs[1:][same_object]
+        pair_otypes = enc.relation_otypes[inc.pair_rows]
+        pair_activities = enc.event_activities[inc.pair_eids]
+
+        n_activities = len(enc.activities)
+        keys = (
+            pair_otypes[pairs_1].astype(np.int64) * n_activities
+            + pair_activities[pairs_1]
+        ) * n_activities + pair_activities[pairs_2]
+        keys, freqs = np.unique(keys, return_counts=True)
+        return pd.DataFrame(
+            {
+                "ocel:type": enc.otypes.decode(keys // n_activities**2),
+                "ocel:activity_1": enc.activities.decode(
+                    keys // n_activities % n_activities
+                ),
+                "ocel:activity_2": enc.activities.decode(keys % n_activities),
+                "freq": freqs,
+            }
+        )
+
+    @instance_lru_cache(depends_on=[])
     def directly_follows_graph(self, otype: str) -> dict[tuple[str, str], int]:
-        dfg, _, _ = pm4py.discovery.discover_directly_follows_graph(self.flatten(otype))
-        return dfg
+        """Discovers the directly-follows graph (DFG) of the flattened log, derived from directly_follows_table."""
+        if otype not in self.otypes:
+            raise ValueError(f"Object type '{otype}' not found")
+        dft = self.directly_follows_table
+        dft = dft[dft["ocel:type"] == otype]
+        return {
+            (act1, act2): int(freq)
+            for act1, act2, freq in zip(
+                dft["ocel:activity_1"], dft["ocel:activity_2"], dft["freq"]
+            )
+        }
 
     def dfg(self, otype: str):
         """Alias of directly_follows_graph"""
         return self.directly_follows_graph(otype)
 
-    @instance_lru_cache()
-    def eventually_follows_graph(self, otype: str) -> set[tuple[str, str]]:
-        """Discovers the eventually-follows graph of the flattened log, without frequencies."""
-        dfg = self.directly_follows_graph(otype=otype)
-        DFG = nx.DiGraph()
-        DFG.add_edges_from(dfg.keys())
-        EFG = nx.transitive_closure(DFG)
-
-        # Output graph as edge set
-        # efg = {u: set(EFG.successors(u)) for u in EFG.nodes() if EFG.out_degree(u)}
-        efg = set(EFG.edges())
-        return efg
+    @instance_lru_cache(depends_on=[])
+    def eventually_follows_graph(self, otype: str) -> dict[str, set[str]]:
+        """Discovers the eventually-follows graph of the flattened log, without frequencies.
+        Returns the successors of each activity (omitting activities without successors).
+        """
+        if otype not in self.otypes:
+            raise ValueError(f"Object type '{otype}' not found")
+        dft = self.directly_follows_table
+        dft = dft[dft["ocel:type"] == otype]
+        codes, activities = pd.factorize(
+            np.concatenate([dft["ocel:activity_1"], dft["ocel:activity_2"]])
+        )
+        sources, targets = codes[: len(dft)], codes[len(dft) :]
+        adjacency = np.zeros((len(activities), len(activities)), dtype=bool)
+        adjacency[sources, targets] = True
+        efg = transitive_closure(adjacency)
+        return {
+            activities[u]: set(activities[efg[u]])
+            for u in range(len(activities))
+            if efg[u].any()
+        }
 
     def efg(self, otype: str):
         """Alias of eventually_follows_graph"""
@@ -192,7 +410,61 @@ class OCELWrapper:
     # ----- OBJECT INTERACTIONS ------------------------------------------------------------------------------------------
     # region
 
-    @instance_lru_cache(make_hashable=True)
+    @property
+    @instance_lru_cache(depends_on=[])
+    def interaction_pairs(self) -> pd.DataFrame:
+        """All pairs of distinct objects sharing events, with their number of shared events (freq).
+        Pairs are mirrored (contained in both orders) and sorted by object codes.
+        Contains integer codes (see OCELEncoding), object_relations derives its (filtered) interactions from this table.
+        """
+        enc, inc = self.encoding, self.incidence
+        # Count shared events of all object pairs at once (sparse product BᵀB)
+        oids_1, oids_2, freqs = inc.cooccurrences()
+        relation_otypes = np.full(len(enc.objects), MISSING, dtype=CODE_DTYPE)
+        relation_otypes[inc.pair_oids] = enc.relation_otypes[inc.pair_rows]
+        return pd.DataFrame(
+            {
+                "ocel:eid": MISSING,
+                "ocel:oid_1": oids_1,
+                "ocel:type_1": relation_otypes[oids_1],
+                "ocel:oid_2": oids_2,
+                "ocel:type_2": relation_otypes[oids_2],
+                "ocel:qualifier": MISSING,
+                "freq": freqs,
+            }
+        )
+
+    @property
+    @instance_lru_cache(depends_on=["o2o"])
+    def o2o_pairs(self) -> pd.DataFrame:
+        """O2O relations in both directions, excluding self-loops.
+        Contains integer codes (see OCELEncoding), object_relations derives its (filtered) O2O relations from this table.
+        """
+        enc = self.encoding
+        o2o_oids_1, o2o_oids_2 = enc.o2o_oids_1, enc.o2o_oids_2
+        # Mirror O2O relations
+        o2o = pd.DataFrame(
+            {
+                "ocel:eid": MISSING,
+                "ocel:oid_1": np.concatenate([o2o_oids_1, o2o_oids_2]),
+                "ocel:oid_2": np.concatenate([o2o_oids_2, o2o_oids_1]),
+                "ocel:qualifier": np.tile(enc.o2o_qualifiers, 2),
+            },
+            index=np.tile(self.ocel.o2o.index, 2),
+            dtype=CODE_DTYPE,
+        )
+        o2o["ocel:type_1"] = enc.otype_of(o2o["ocel:oid_1"])
+        o2o["ocel:type_2"] = enc.otype_of(o2o["ocel:oid_2"])
+
+        # Ignore self-loops, but warn if they exist:
+        if num_self_loops := (o2o_oids_1 == o2o_oids_2).sum():
+            logger.warning(
+                f"object_relations currently not supporting O2O self-loops. Dropping {num_self_loops} relations."
+            )
+            o2o = o2o[o2o["ocel:oid_1"] != o2o["ocel:oid_2"]]
+        return o2o
+
+    @instance_lru_cache(make_hashable=True, persistent=True, depends_on=LOG_STRUCTURE)
     def object_relations(
         self,
         /,
@@ -243,24 +515,52 @@ class OCELWrapper:
         if isempty(otype2_filter) or isempty(oid2_filter):
             raise ValueError(f"Empty filter in object_relations (otype2/oid2)")
 
-        if include_interactions:
-            relations = self.ocel.relations[["ocel:eid", "ocel:oid", "ocel:type"]]
+        # All computations are done on integer codes, labels are decoded at the end.
+        enc = self.encoding
+        otype1_mask, otype2_mask = enc.otypes.mask(otype1_filter), enc.otypes.mask(
+            otype2_filter
+        )
+        oid1_mask = enc.objects.mask(oid1_filter) if oid1_filter is not None else None
+        oid2_mask = enc.objects.mask(oid2_filter) if oid2_filter is not None else None
+        INTERACTION, O2O = 1, 2
+
+        if include_interactions and groupby_objects:
+            # Derive from the cached table of all interacting object pairs by masking
+            interactions = self.interaction_pairs
+            type_1 = interactions["ocel:type_1"].to_numpy()
+            type_2 = interactions["ocel:type_2"].to_numpy()
+            ix = otype1_mask[type_1] & otype2_mask[type_2]
+            if oid1_mask is not None:
+                ix &= oid1_mask[interactions["ocel:oid_1"].to_numpy()]
+            if oid2_mask is not None:
+                ix &= oid2_mask[interactions["ocel:oid_2"].to_numpy()]
+            if remove_otype_loops:
+                ix &= type_1 != type_2
+            interactions = interactions[ix]
+        elif include_interactions:
+            relations = pd.DataFrame(
+                {
+                    "ocel:eid": enc.relation_eids,
+                    "ocel:oid": enc.relation_oids,
+                    "ocel:type": enc.relation_otypes,
+                }
+            )
 
             # Init relations1 (left side)
             if not otype1_filter_all:
-                relations1 = relations[relations["ocel:type"].isin(otype1_filter)]
+                relations1 = relations[otype1_mask[relations["ocel:type"].to_numpy()]]
             else:
                 relations1 = relations
-            if oid1_filter is not None:
-                relations1 = relations1[relations1["ocel:oid"].isin(oid1_filter)]
+            if oid1_mask is not None:
+                relations1 = relations1[oid1_mask[relations1["ocel:oid"].to_numpy()]]
 
             # Init relations2 (right side)
             if not otype2_filter_all:
-                relations2 = relations[relations["ocel:type"].isin(otype2_filter)]
+                relations2 = relations[otype2_mask[relations["ocel:type"].to_numpy()]]
             else:
                 relations2 = relations
-            if oid2_filter is not None:
-                relations2 = relations2[relations2["ocel:oid"].isin(oid2_filter)]
+            if oid2_mask is not None:
+                relations2 = relations2[oid2_mask[relations2["ocel:oid"].to_numpy()]]
 
             assert otype1_filter and otype2_filter
             relations1 = relations1.drop_duplicates()
@@ -273,70 +573,51 @@ class OCELWrapper:
             ix = interactions["ocel:oid_1"] != interactions["ocel:oid_2"]
             if remove_otype_loops:
                 ix = ix & (interactions["ocel:type_1"] != interactions["ocel:type_2"])
-            interactions.drop(index=interactions.index[~ix], inplace=True)
+            interactions = interactions[ix]
 
-            if groupby_objects and not include_frequencies:
-                interactions.drop_duplicates(
-                    subset=["ocel:oid_1", "ocel:oid_2"], inplace=True
-                )
+            interactions = interactions.assign(**{"ocel:qualifier": MISSING})
         else:
             interactions = None
 
         # Add O2O relations
         if include_o2o:
-            if not self.o2o.empty:
-                # Mirror O2O relations
-                o2o = pd.concat([self.o2o, mirror_dataframe(self.o2o)])
-            else:
-                # Empty O2O but need column names
-                o2o = self.o2o.copy()
-
-            # Ignore self-loops, but warn if they exist:
-            if (self.o2o["ocel:oid_1"] == self.o2o["ocel:oid_2"]).any():
-                num_self_loops = (
-                    self.o2o["ocel:oid_1"] == self.o2o["ocel:oid_2"]
-                ).sum()
-                logger.warning(
-                    f"object_relations currently not supporting O2O self-loops. Dropping {num_self_loops} relations."
-                )
-                o2o = o2o[o2o["ocel:oid_1"] != o2o["ocel:oid_2"]]
-
+            o2o = self.o2o_pairs
+            type_1 = o2o["ocel:type_1"].to_numpy()
+            type_2 = o2o["ocel:type_2"].to_numpy()
+            ix = otype1_mask[type_1] & otype2_mask[type_2]
+            if oid1_mask is not None:
+                ix &= oid1_mask[o2o["ocel:oid_1"].to_numpy()]
+            if oid2_mask is not None:
+                ix &= oid2_mask[o2o["ocel:oid_2"].to_numpy()]
             if remove_otype_loops:
-                o2o = o2o[o2o["ocel:type_1"] != o2o["ocel:type_2"]]
+                ix &= type_1 != type_2
+            o2o = o2o[ix]
 
-            # Apply otype filters
-            o2o = o2o[
-                o2o["ocel:type_1"].isin(otype1_filter)
-                & o2o["ocel:type_2"].isin(otype2_filter)
-            ]
-            # Apply oid filters
-            if oid1_filter is not None:
-                o2o = o2o[o2o["ocel:oid_1"].isin(oid1_filter)]
-            if oid2_filter is not None:
-                o2o = o2o[o2o["ocel:oid_2"].isin(oid2_filter)]
-
-            if include_o2o_qualifiers:
-                o2o.rename(
-                    columns={"ocel:qualifier": "ocel:o2o_qualifier"}, inplace=True
-                )
-            else:
+            if not include_o2o_qualifiers:
                 # No aggregation like counts etc. needed, use faster drop_duplicates instead of groupby
-                o2o.drop_duplicates(subset=["ocel:oid_1", "ocel:oid_2"], inplace=True)
-                o2o.drop(columns=["ocel:qualifier"], inplace=True)
+                o2o = o2o.drop_duplicates(subset=["ocel:oid_1", "ocel:oid_2"])
         else:
             o2o = None
 
+        columns = ["ocel:eid", "ocel:oid_1", "ocel:type_1", "ocel:oid_2", "ocel:type_2"]
+        if include_o2o:
+            columns.append("ocel:qualifier")
+        if include_frequencies:
+            columns.append("freq")
+            if o2o is not None:
+                o2o = o2o.assign(freq=0)
         if include_relation_type:
+            columns.append("reltype")
             if interactions is not None:
-                interactions["reltype"] = "interaction"
+                interactions = interactions.assign(reltype=INTERACTION)
             if o2o is not None:
-                o2o["reltype"] = "o2o"
+                o2o = o2o.assign(reltype=O2O)
         if include_interactions and include_o2o:
-            og = pd.concat([interactions, o2o])
+            og = pd.concat([interactions[columns], o2o[columns]])  # type: ignore
         elif include_interactions and interactions is not None:
-            og = interactions
+            og = interactions[columns]
         elif include_o2o and o2o is not None:
-            og = o2o
+            og = o2o[columns]
         else:
             raise ValueError
 
@@ -345,52 +626,49 @@ class OCELWrapper:
             # Remove duplicate pair rows (with switched oid1/oid2 order)
             # Dedupe only needs to be handled when there are common_otypes.
             # The og DataFrame is currently mirrored (each relation represented 2 times)
-            # Idea: use canonical ordering (add_object_order()), and overwrite this order in case an object type is just contained on one side.
+            # Idea: use canonical ordering (object_order()), and overwrite this order in case an object type is just contained on one side.
             # -1: Force keep on left side. 0: Use canonical order. 1: Force keep on right side.
+            # (Shifted by 3 to get non-negative sort keys)
+            type_1, type_2 = og["ocel:type_1"].to_numpy(), og["ocel:type_2"].to_numpy()
             if oid1_filter is None and oid2_filter is None:
                 if len(common_otypes) == len(self.otypes):
                     # Canonical order is used for all pairs
-                    prepend = None
+                    prepend1, prepend2 = None, None
                 else:
                     # Add object order just considering otype filters
-                    side_filter1_otype = np.where(
-                        og["ocel:type_1"].isin(otype2_filter), 0, -1
-                    )
-                    side_filter2_otype = np.where(
-                        og["ocel:type_2"].isin(otype1_filter), 0, 1
-                    )
-                    prepend = (side_filter1_otype, side_filter2_otype)
+                    prepend1 = np.where(otype2_mask[type_1], 0, -1) + 3
+                    prepend2 = np.where(otype1_mask[type_2], 0, 1) + 3
             else:
-                # New:
                 # Add object order considering otype & oid filters
-                side_filter1_otype = np.where(
-                    og["ocel:type_1"].isin(otype2_filter), 0, -1
+                side_filter1_otype = np.where(otype2_mask[type_1], 0, -1)
+                side_filter2_otype = np.where(otype1_mask[type_2], 0, 1)
+                oids1_mask = (
+                    oid1_mask
+                    if oid1_mask is not None
+                    else np.append(otype1_mask[enc.object_otypes], False)
                 )
-                side_filter2_otype = np.where(
-                    og["ocel:type_2"].isin(otype1_filter), 0, 1
-                )
-
-                oids1 = oid1_filter or set(
-                    self.objects[self.objects["ocel:type"].isin(otype1_filter)][
-                        "ocel:oid"
-                    ]
+                oids2_mask = (
+                    oid2_mask
+                    if oid2_mask is not None
+                    else np.append(otype2_mask[enc.object_otypes], False)
                 )
-                oids2 = oid2_filter or set(
-                    self.objects[self.objects["ocel:type"].isin(otype2_filter)][
-                        "ocel:oid"
-                    ]
+                side_filter1_oid = np.where(
+                    oids2_mask[og["ocel:oid_1"].to_numpy()], 0, -1
                 )
-                side_filter1_oid = np.where(og["ocel:oid_1"].isin(oids2), 0, -1)
-                side_filter2_oid = np.where(og["ocel:oid_2"].isin(oids1), 0, 1)
-                prepend = (
-                    2 * side_filter1_otype + side_filter1_oid,
-                    2 * side_filter2_otype + side_filter2_oid,
+                side_filter2_oid = np.where(
+                    oids1_mask[og["ocel:oid_2"].to_numpy()], 0, 1
                 )
+                prepend1 = 2 * side_filter1_otype + side_filter1_oid + 3
+                prepend2 = 2 * side_filter2_otype + side_filter2_oid + 3
 
-            add_object_order(og, otype_order, prepend=prepend)
             # Just retain pairs where order1 < order2
-            og = og[og["obj_order_1"] < og["obj_order_2"]]
-            og.drop(columns=["obj_order_1", "obj_order_2"], inplace=True)
+            order1 = enc.object_order(
+                og["ocel:oid_1"], type_1, otype_order, prepend=prepend1
+            )
+            order2 = enc.object_order(
+                og["ocel:oid_2"], type_2, otype_order, prepend=prepend2
+            )
+            og = og[order1 < order2]
 
         # Group by oids & count common events
         if groupby_objects:
@@ -403,32 +681,81 @@ class OCELWrapper:
                 agg = {
                     "ocel:type_1": "first",
                     "ocel:type_2": "first",
-                    # "obj_order_1": "first",
-                    # "obj_order_2": "first",
                 }
                 if include_frequencies:
-                    agg["ocel:eid"] = "count"
-                if include_o2o_qualifiers:
-                    agg["ocel:o2o_qualifier"] = "unique"
+                    agg["freq"] = "sum"
                 if include_relation_type and include_interactions and include_o2o:
-                    agg["reltype"] = (
-                        lambda types: types.iloc[0] if types.nunique() == 1 else "both"
-                    )  # type: ignore
-                og = (
-                    og.groupby(["ocel:oid_1", "ocel:oid_2"], as_index=False)
-                    .agg(agg)
-                    .rename(columns={"ocel:eid": "freq"})
+                    og = og.assign(reltype_max=og["reltype"])
+                    agg["reltype"] = "min"
+                    agg["reltype_max"] = "max"
+                grouped = og.groupby(
+                    ["ocel:oid_1", "ocel:oid_2"], as_index=False, sort=True
                 )
+                if include_o2o_qualifiers:
+                    # Aggregate qualifiers of O2O rows only
+                    o2o_rows = og[og["ocel:qualifier"] != MISSING]
+                    o2o_rows = o2o_rows.drop_duplicates(
+                        ["ocel:oid_1", "ocel:oid_2", "ocel:qualifier"]
+                    )
+                    o2o_qualifiers = (
+                        o2o_rows.assign(
+                            **{
+                                "ocel:qualifier": enc.qualifiers.decode(
+                                    o2o_rows["ocel:qualifier"]
+                                )
+                            }
+                        )
+                        .groupby(["ocel:oid_1", "ocel:oid_2"], as_index=False)[
+                            "ocel:qualifier"
+                        ]
+                        .agg(set)
+                    )
+                og = grouped.agg(agg)
+                if include_frequencies:
+                    og["freq"] = og["freq"].astype(np.int64)
+                if include_relation_type and include_interactions and include_o2o:
+                    og["reltype"] = np.where(
+                        og["reltype"] == og["reltype_max"], og["reltype"], 0
+                    )
+                    og.drop(columns=["reltype_max"], inplace=True)
+                if include_o2o_qualifiers:
+                    qualifier_sets = og.merge(
+                        o2o_qualifiers,
+                        how="left",
+                        on=["ocel:oid_1", "ocel:oid_2"],
+                    )["ocel:qualifier"]
+                    og["ocel:o2o_qualifiers"] = [
+                        qs if isinstance(qs, set) else set() for qs in qualifier_sets
+                    ]
             else:
                 # No aggregation like counts etc. needed, use faster drop_duplicates instead of groupby
-                og.drop_duplicates(subset=["ocel:oid_1", "ocel:oid_2"], inplace=True)
-            if include_o2o and include_o2o_qualifiers:
-                og["ocel:o2o_qualifiers"] = og["ocel:o2o_qualifier"].apply(
-                    lambda qs: set(qs).difference({np.nan})
-                )
-                og.drop(columns=["ocel:o2o_qualifier"], inplace=True)
+                og = og.drop_duplicates(subset=["ocel:oid_1", "ocel:oid_2"])
+                og = og.drop(columns=["ocel:qualifier"], errors="ignore")
             if not include_frequencies:
-                og.drop(columns=["ocel:eid"], inplace=True, errors="ignore")
+                og = og.drop(columns=["ocel:eid"], errors="ignore")
+        elif include_o2o:
+            if include_o2o_qualifiers:
+                og = og.rename(columns={"ocel:qualifier": "ocel:o2o_qualifier"})
+            else:
+                og = og.drop(columns=["ocel:qualifier"])
+
+        # Decode labels
+        og = og.copy()
+        for col, codebook in [
+            ("ocel:eid", enc.events),
+            ("ocel:oid_1", enc.objects),
+            ("ocel:type_1", enc.otypes),
+            ("ocel:oid_2", enc.objects),
+            ("ocel:type_2", enc.otypes),
+            ("ocel:qualifier", enc.qualifiers),
+            ("ocel:o2o_qualifier", enc.qualifiers),
+        ]:
+            if col in og.columns:
+                og[col] = codebook.decode(og[col])
+        if "reltype" in og.columns:
+            og["reltype"] = np.array(["both", "interaction", "o2o"], dtype=object)[
+                og["reltype"].to_numpy()
+            ]
 
         assert name1 is None or name2 is None or name1 != name2
         if name1 is not None:
@@ -451,7 +778,7 @@ class OCELWrapper:
         return og
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def object_interaction_frequencies(self):
         return self.object_relations(
             include_frequencies=True,
@@ -459,7 +786,7 @@ class OCELWrapper:
         ).rename(columns={"freq": "num_events"})
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def object_interaction_graph(self) -> nx.Graph:
         return nx.from_pandas_edgelist(
             self.object_relations(
@@ -475,31 +802,29 @@ class OCELWrapper:
     # ----- EVENT-OBJECT GRAPH ------------------------------------------------------------------------------------------
     # region
 
-    @instance_lru_cache(make_hashable=True)
+    @instance_lru_cache(make_hashable=True, depends_on=["relations"])
     def successions(self, otypes: set[str] | None = None):
-        relations = self.lifecycle_indices(otypes=otypes, include_qualifiers=False)
-        relations["ocel:next_lifecycle_index"] = relations["ocel:lifecycle_index"] + 1
-        relations = relations[
-            [
-                "ocel:oid",
-                "ocel:type",
-                "ocel:eid",
-                "ocel:activity",
-                "ocel:lifecycle_index",
-                "ocel:next_lifecycle_index",
-            ]
-        ]
-        succ = pd.merge(
-            relations,
-            relations,
-            left_on=["ocel:oid", "ocel:type", "ocel:next_lifecycle_index"],
-            right_on=["ocel:oid", "ocel:type", "ocel:lifecycle_index"],
-            suffixes=("_1", "_2"),
-        )
-        succ.drop(
-            columns=["ocel:next_lifecycle_index_1", "ocel:next_lifecycle_index_2"],
+        """Returns pairs of directly succeeding events within the lifecycles of objects of the given types."""
+        inc = self.incidence
+        pairs = self._relation_pairs(otypes)
+        next_pairs = inc.pair_successors[pairs]
+        has_next = next_pairs != -1
+        pairs, next_pairs = pairs[has_next], next_pairs[has_next]
+
+        succ = self._relation_rows(
+            inc.pair_rows[pairs], ["ocel:oid", "ocel:type", "ocel:eid", "ocel:activity"]
+        ).reset_index(drop=True)
+        succ.rename(
+            columns={"ocel:eid": "ocel:eid_1", "ocel:activity": "ocel:activity_1"},
             inplace=True,
         )
+        succ["ocel:lifecycle_index_1"] = inc.pair_lifecycle_index[pairs]
+        succ2 = self._relation_rows(
+            inc.pair_rows[next_pairs], ["ocel:eid", "ocel:activity"]
+        )
+        succ["ocel:eid_2"] = succ2["ocel:eid"].to_numpy()
+        succ["ocel:activity_2"] = succ2["ocel:activity"].to_numpy()
+        succ["ocel:lifecycle_index_2"] = inc.pair_lifecycle_index[next_pairs]
         return succ
 
     # endregion
@@ -508,7 +833,7 @@ class OCELWrapper:
     # region
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=["o2o"])
     def o2o(self):
         """O2O relationships, with object types"""
         return self.join_otypes(
@@ -516,7 +841,7 @@ class OCELWrapper:
         )
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def o2o_type_frequencies(self):
         return (
             self.o2o.groupby(["ocel:type_1", "ocel:qualifier", "ocel:type_2"])[
@@ -564,10 +889,29 @@ class OCELWrapper:
         return sorted(set(self.oattr_names_static + self.oattr_names_dynamic))
 
     @property
-    @instance_lru_cache()
     def attr_info(self) -> pd.DataFrame:
+        attr_info = self._attr_info
+        self._attr_info_initialized = True
+        return attr_info
+
+    @property
+    @instance_lru_cache(persistent=True)
+    def _attr_info(self) -> pd.DataFrame:
         return attribute_info(self)
 
+    def attribute_column_info(self, table: str, column: str) -> pd.DataFrame:
+        """Statistics of a single attribute column of ocel.events, ocel.objects or ocel.object_changes (see attribute_info).
+        Cached per column, such that adding or changing a column does not require re-computing all statistics.
+        """
+        key = (table, column)
+        with self.cache_lock:
+            info = self._attr_column_info.get(key)
+        if info is None:
+            info = attribute_column_info(self, table, column)
+            with self.cache_lock:
+                self._attr_column_info[key] = info
+        return info
+
     @property
     @instance_lru_cache()
     def attributes(self) -> list[OCELAttribute]:
@@ -632,27 +976,89 @@ class OCELWrapper:
                 )[attr.name]
         raise TypeError
 
+    @property
+    @instance_lru_cache(depends_on=["object_changes", OBJECT_IDS])
+    def attribute_changes(self) -> AttributeChangeIndex:
+        """CSR index over the dynamic object attribute values (see AttributeChangeIndex)"""
+        return AttributeChangeIndex.from_ocel(self.ocel, self.encoding)
+
+    def attribute_value_at(
+        self,
+        oids: pd.Series | np.ndarray | Iterable[str],
+        field: str,
+        timestamps: pd.Series | np.ndarray | Iterable[datetime] | datetime,
+        static: bool = True,
+        dynamic: bool = True,
+    ) -> pd.Series:
+        """Returns the values of an object attribute at the given points in time, vectorized over many lookups.
+        Takes the most recent value from object_changes set at or before the timestamp (including changes at the same time).
+        Objects without such a change get their value from the objects table.
+        Returns a Series aligned with the passed oids, containing NaN where no value is available.
+        """
+        oid_codes = self.encoding.objects.encode(oids)
+        if isinstance(timestamps, datetime):
+            timestamps = [timestamps] * len(oid_codes)
+        times = timestamp_ns(pd.Series(pd.to_datetime(timestamps)))
+        values = self._attribute_values(
+            oid_codes, field, times, static=static, dynamic=dynamic
+        )
+        if isinstance(oids, pd.Series):
+            values.index = oids.index
+        return values
+
+    def _attribute_values(
+        self,
+        oid_codes: np.ndarray,
+        field: str,
+        times: np.ndarray,
+        static: bool = True,
+        dynamic: bool = True,
+    ) -> pd.Series:
+        """attribute_value_at, working on object codes and int64 nanosecond timestamps (see timestamp_ns)"""
+        objects, object_changes = self.ocel.objects, self.ocel.object_changes
+        index = self.attribute_changes
+        positions = np.full(len(oid_codes), -1, dtype=np.int64)
+        sources = []
+        if static and field in objects.columns:
+            positions = np.append(index.object_rows, -1)[oid_codes]
+            sources.append(objects[field])
+        if dynamic and field in object_changes.columns:
+            change_rows = index.lookup(oid_codes, field, times)
+            offset = len(objects) if sources else 0
+            positions = np.where(change_rows != -1, change_rows + offset, positions)
+            sources.append(object_changes[field])
+        if not sources:
+            return pd.Series(np.nan, index=pd.RangeIndex(len(oid_codes)), name=field)
+        values = pd.concat(sources, ignore_index=True)
+        return values.reindex(positions).reset_index(drop=True).rename(field)
+
     # endregion
 
     # ----- OBJECT LIFECYCLES, ACTIVITY ORDER ------------------------------------------------------------------------------------------
     # region
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def num_events_per_object(self):
-        return self.join_otype(
-            self.ocel.relations.groupby("ocel:oid")["ocel:eid"]
-            .count()
-            .rename("num_events")
-            .reset_index()
+        """Number of E2O relations per object. Events related via multiple qualifiers are counted once per relation."""
+        enc = self.encoding
+        valid = (enc.relation_oids != MISSING) & (enc.relation_eids != MISSING)
+        counts = np.bincount(enc.relation_oids[valid], minlength=len(enc.objects))
+        oids = np.flatnonzero(counts)
+        return pd.DataFrame(
+            {
+                "ocel:oid": enc.objects.decode(oids),
+                "num_events": counts[oids],
+                "ocel:type": enc.otypes.decode(enc.otype_of(oids)),
+            }
         )
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def median_num_events_per_otype(self):
         return self.num_events_per_object.groupby("ocel:type")["num_events"].median()
 
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def sort_otypes(self) -> list[str]:
         """A sorted list of the object types. Object types are sorted by the median number of events per object."""
         return (
@@ -662,7 +1068,7 @@ class OCELWrapper:
         )
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def auto_hu_otypes(self) -> list[str]:
         """
         Automatically generated list of handling unit (HU)-like object types.
@@ -688,7 +1094,7 @@ class OCELWrapper:
         return hu_otypes
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def auto_resource_otypes(self) -> list[str]:
         """
         Automatically generated list of resource-like object types.
@@ -699,7 +1105,7 @@ class OCELWrapper:
         return [ot for ot in self.otypes if ot not in self.auto_hu_otypes]
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def auto_hu_otypes_info(self):
         hu_otypes = self.auto_hu_otypes
         resource_otypes = self.auto_resource_otypes
@@ -711,7 +1117,7 @@ class OCELWrapper:
             ].median(),
         }
 
-    @instance_lru_cache(make_hashable=True)
+    @instance_lru_cache(make_hashable=True, persistent=True, depends_on=LOG_STRUCTURE)
     def lifecycle_indices(
         self, otypes: set[str] | None = None, include_qualifiers: bool = True
     ) -> pd.DataFrame:
@@ -726,35 +1132,53 @@ class OCELWrapper:
             "ocel:oid",
             "ocel:type",
         ]
-        if include_qualifiers:
-            columns.append("ocel:qualifier")
-        relations = self.filter_relations(otypes=otypes, copy=False)
-        relations = relations[columns]
+        enc, inc = self.encoding, self.incidence
+
         if not include_qualifiers:
-            relations = relations.drop_duplicates(subset=["ocel:eid", "ocel:oid"])
+            pairs = self._relation_pairs(otypes)
+            relations = self._relation_rows(inc.pair_rows[pairs], columns)
         elif not self.are_qualifiers_unique():
             # An e2o relation might be present multiple times because of multiple qualifiers.
             # Group these relations and retain the qualifiers in a set.
             # (Otherwise, lifecycle indices do not make sense - an event would be following itself.)
-            e2o = relations.groupby(["ocel:eid", "ocel:oid"])
-            relations = e2o[["ocel:activity", "ocel:timestamp", "ocel:type"]].first()
-            relations["ocel:qualifiers"] = e2o["ocel:qualifier"].agg(set)
-            relations = relations.reset_index()
+            pair_rank = np.empty(inc.num_pairs, dtype=np.int64)
+            pair_rank[inc.event_pairs] = np.arange(inc.num_pairs)
+            rows = np.arange(enc.num_relations)
+            if otypes is not None:
+                rows = rows[enc.otypes.isin(enc.relation_otypes, otypes)]
+            rows = rows[np.argsort(pair_rank[inc.relation_pairs[rows]], kind="stable")]
+            pairs = inc.relation_pairs[rows]
+            is_first = np.r_[True, pairs[1:] != pairs[:-1]]
+            qualifiers = enc.qualifiers.decode(enc.relation_qualifiers[rows])
+            qualifier_sets = [
+                set(qs) for qs in np.split(qualifiers, np.flatnonzero(is_first)[1:])
+            ]
+            pairs = pairs[is_first]
+            relations = self._relation_rows(
+                inc.pair_rows[pairs],
+                [
+                    "ocel:eid",
+                    "ocel:oid",
+                    "ocel:activity",
+                    "ocel:timestamp",
+                    "ocel:type",
+                ],
+            ).reset_index(drop=True)
+            relations["ocel:qualifiers"] = qualifier_sets
         else:
-            relations = relations.copy()
-            relations["ocel:qualifiers"] = relations["ocel:qualifier"].apply(
-                lambda q: {q}
-            )
-            relations.drop(columns=["ocel:qualifier"], inplace=True)
-        # Compute lifecycle indices
-        relations["ocel:lifecycle_index"] = (
-            relations.sort_values(["ocel:oid", "ocel:timestamp"])
-            .groupby("ocel:oid")
-            .cumcount()
-        )
+            rows = np.arange(enc.num_relations)
+            if otypes is not None:
+                rows = rows[enc.otypes.isin(enc.relation_otypes, otypes)]
+            pairs = inc.relation_pairs[rows]
+            relations = self._relation_rows(rows, columns)
+            relations["ocel:qualifiers"] = [
+                {q} for q in enc.qualifiers.decode(enc.relation_qualifiers[rows])
+            ]
+
+        relations["ocel:lifecycle_index"] = inc.pair_lifecycle_index[pairs]
         return relations
 
-    @instance_lru_cache(make_hashable=True)
+    @instance_lru_cache(make_hashable=True, depends_on=[])
     def avg_lifecycle_indices(self, otypes: set[str] | None = None):
         """
         Returns the average index of each event inside its related objects' lifecycles.
@@ -763,14 +1187,19 @@ class OCELWrapper:
         """
         if otypes is None:
             otypes = set(self.auto_hu_otypes)
-        lifecycles = self.lifecycle_indices(otypes=otypes, include_qualifiers=False)
-        return (
-            lifecycles.groupby("ocel:eid")["ocel:lifecycle_index"]
-            .agg("mean")
-            .rename("avg_lifecycle_index")
+        enc = self.encoding
+        avg = self.incidence.mean_lifecycle_index(self._relation_pairs(otypes))
+        (eids,) = np.nonzero(~np.isnan(avg))
+        avg_lifecycle_indices = pd.Series(
+            avg[eids],
+            index=pd.Index(enc.events.decode(eids), name="ocel:eid"),
+            name="avg_lifecycle_index",
         )
+        if not enc.events.sorted:
+            avg_lifecycle_indices = avg_lifecycle_indices.sort_index()
+        return avg_lifecycle_indices
 
-    @instance_lru_cache(make_hashable=True)
+    @instance_lru_cache(make_hashable=True, depends_on=[])
     def sort_activities(
         self, otypes: set[str] | None = None, all_activities: bool = False
     ):
@@ -781,12 +1210,24 @@ class OCELWrapper:
         If all_activities is False (default), the resulting list is limited to those activities related to the given object types.
         Otherwise, the remaining activities are added to the end of the list, sorted by decreasing frequency.
         """
-        avg_lifecycle_indices = self.avg_lifecycle_indices(otypes=otypes)
-        activity_lifecycle_indices = (
-            self.ocel.events.join(avg_lifecycle_indices, on="ocel:eid", how="inner")
-            .groupby("ocel:activity")["avg_lifecycle_index"]
-            .agg(["min", "max", "mean"])
-            .reset_index()
+        enc = self.encoding
+        if otypes is None:
+            otypes = set(self.auto_hu_otypes)
+        avg = self.incidence.mean_lifecycle_index(self._relation_pairs(otypes))
+        # Segment reductions over the events of each activity (sorted by average index)
+        activity_codes = enc.event_activities
+        (eids,) = np.nonzero(~np.isnan(avg) & (activity_codes != MISSING))
+        eids = eids[np.lexsort((avg[eids], activity_codes[eids]))]
+        acts, avg = activity_codes[eids], avg[eids]
+        starts = np.flatnonzero(np.diff(acts, prepend=MISSING) != 0)
+        ends = np.r_[starts[1:], len(acts)] - 1
+        activity_lifecycle_indices = pd.DataFrame(
+            {
+                "ocel:activity": enc.activities.decode(acts[starts]),
+                "min": avg[starts],
+                "max": avg[ends],
+                "mean": np.add.reduceat(avg, starts) / (ends - starts + 1),
+            }
         )
         activity_lifecycle_indices = activity_lifecycle_indices.sort_values(
             ["min", "mean", "max", "ocel:activity"]
@@ -805,7 +1246,7 @@ class OCELWrapper:
     # region
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(persistent=True, depends_on=["relations"])
     def type_relations(self) -> pd.DataFrame:
         x: pd.Series = self.ocel.relations.groupby(
             ["ocel:activity", "ocel:type", "ocel:qualifier"]
@@ -813,12 +1254,12 @@ class OCELWrapper:
         return x.reset_index(name="freq")
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def type_relation_frequencies(self) -> pd.Series:
         return self.type_relations.groupby(["ocel:activity", "ocel:type"])["freq"].sum()
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=["relations"])
     def objects_per_event(self) -> pd.DataFrame:
         """Computes the number of objects per event, grouped by activity and object type, aggregated by mean, min, median, max."""
         # TODO nonzero does not work here. Due to the groupby calls, there are no zero entries, leading to nonzero being either 1 or NaN.
@@ -848,7 +1289,7 @@ class OCELWrapper:
         return type_relation_stats
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(persistent=True, depends_on=["relations", EVENT_ACTIVITIES])
     def objects_per_activity(self) -> pd.DataFrame:
         """Counts the number of objects of each type related to events of an activity.
         Returns a DataFrame with min/max number of objects per event and the (relative) number of events that have any object.
@@ -933,11 +1374,11 @@ class OCELWrapper:
     # region
 
     @property
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def qualifier_frequencies(self) -> pd.DataFrame:
         return self.type_relations
 
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def get_qualifiers(
         self,
         otype: str | None = None,
@@ -950,7 +1391,7 @@ class OCELWrapper:
             qf = qf[qf["ocel:activity"] == activity]
         return set(qf["ocel:qualifier"])
 
-    @instance_lru_cache()
+    @instance_lru_cache(depends_on=[])
     def are_qualifiers_unique(self) -> bool:
         """Returns true iff e2o qualifiers are uniquely determined by activity and object type."""
         return (
@@ -965,7 +1406,7 @@ class OCELWrapper:
         self, df: pd.DataFrame, col_oid: str = "ocel:oid", col_otype: str = "ocel:type"
     ) -> pd.DataFrame:
         """Enriches a DataFrame containing an object ID column with their object types."""
-        return df.join(self.obj_otypes.rename(col_otype), on=col_oid)
+        return df.assign(**{col_otype: self._lookup_otypes(df[col_oid])})
 
     def join_otypes(
         self,
@@ -976,9 +1417,31 @@ class OCELWrapper:
         col_otype_2: str = "ocel:type_2",
     ) -> pd.DataFrame:
         """Enriches a DataFrame containing two object ID columns with their object types."""
-        df = df.join(self.obj_otypes.rename(col_otype_1), on=col_oid_1)
-        df = df.join(self.obj_otypes.rename(col_otype_2), on=col_oid_2)
-        return df
+        return df.assign(
+            **{
+                col_otype_1: self._lookup_otypes(df[col_oid_1]),
+                col_otype_2: self._lookup_otypes(df[col_oid_2]),
+            }
+        )
+
+    def _lookup_otypes(self, oids: pd.Series) -> np.ndarray:
+        enc = self.encoding
+        return enc.otypes.decode(enc.otype_of(enc.objects.encode(oids)))
+
+    def _relation_pairs(self, otypes: set[str] | None = None) -> np.ndarray:
+        """Returns the (ascending) IDs of unique E2O pairs, optionally filtered by object types."""
+        enc, inc = self.encoding, self.incidence
+        pairs = np.arange(inc.num_pairs)
+        if otypes is not None:
+            pairs = pairs[enc.otypes.isin(enc.relation_otypes[inc.pair_rows], otypes)]
+        return pairs
+
+    def _relation_rows(self, ix: np.ndarray, columns: list[str]) -> pd.DataFrame:
+        """Selects E2O relation rows by position, returning a new DataFrame."""
+        relations = self.ocel.relations
+        return relations.iloc[ix, relations.columns.get_indexer(columns)].copy(
+            deep=False
+        )
 
     def join_activity(
         self,
@@ -1008,7 +1471,7 @@ class OCELWrapper:
     # region
 
     def __str__(self):
-        return f"OCELWrapper [{len(self.events)} events, {len(self.objects)} objects]"
+        return f"OCELWrapper [{num_rows(self.ocel, 'events')} events, {num_rows(self.ocel, 'objects')} objects]"
 
     def __repr__(self):
         return str(self)
@@ -1019,13 +1482,27 @@ class OCELWrapper:
         ocel = OCELWrapper(pm4py_ocel)
         ocel.meta = deepcopy(self.meta, memo)
         ocel.filtered_from = self.filtered_from
+        ocel.artifacts = self.artifacts
+        return ocel
+
+    def copy_on_write(self) -> OCELWrapper:
+        """Returns a copy in O(1), sharing all tables and cached results with this OCEL (see ocel.view.shared_ocel).
+        Tables are only copied when replaced in the copy (e.g., by editing), so they must never be modified in-place.
+        """
+        ocel = OCELWrapper(shared_ocel(self.ocel))
+        ocel.meta = deepcopy(self.meta)
+        ocel.filtered_from = self.filtered_from
+        ocel.artifacts = self.artifacts
+        with self.cache_lock:
+            ocel.cache.update_from(self.cache)
+            ocel._attr_column_info = self._attr_column_info.copy()
+            ocel._attr_info_initialized = self._attr_info_initialized
         return ocel
 
     @property
-    def cache_size(self):
-        return {
-            name: cache_info.currsize for name, cache_info in self._cache_info.items()
-        }
+    def cache_size(self) -> dict[str, int]:
+        """Memory usage of the cached results of each method in bytes (see util.cache.cache_metrics)"""
+        return {method: m.bytes for method, m in cache_metrics([self.cache]).items()}
 
     # endregion
 
@@ -1153,20 +1630,22 @@ class OCELWrapper:
                 s = s.replace(a, b)
             return s
 
-        pm4py_ocel2 = deepcopy(self.ocel)
+        # Tables are shared with this OCEL (and possibly a default OCEL, see copy_on_write),
+        # translated tables are assigned as new DataFrames instead of being modified in-place.
+        pm4py_ocel2 = shared_ocel(self.ocel)
 
         # Translate DataFrame columns
         text_columns = [
-            (pm4py_ocel2.objects, ["ocel:type"]),
-            (pm4py_ocel2.events, ["ocel:activity"]),
-            (pm4py_ocel2.relations, ["ocel:type", "ocel:activity", "ocel:qualifier"]),
-            (pm4py_ocel2.object_changes, ["ocel:type"]),
-            (pm4py_ocel2.o2o, ["ocel:qualifier"]),
-            (pm4py_ocel2.e2e, ["ocel:qualifier"]),
+            ("objects", ["ocel:type"]),
+            ("events", ["ocel:activity"]),
+            ("relations", ["ocel:type", "ocel:activity", "ocel:qualifier"]),
+            ("object_changes", ["ocel:type"]),
+            ("o2o", ["ocel:qualifier"]),
+            ("e2e", ["ocel:qualifier"]),
         ]
-        for df, cols in text_columns:
-            for col in cols:
-                df[col] = df[col].apply(repl)
+        for name, cols in text_columns:
+            df = getattr(pm4py_ocel2, name)
+            setattr(pm4py_ocel2, name, df.assign(**{col: df[col].apply(repl) for col in cols}))
 
         # TODO translate attribute names?
 
@@ -1209,10 +1688,13 @@ class OCELWrapper:
                 ]
             logger.info("\n".join(init_output))
 
-        ocel = pm4py.read.read_ocel2_sqlite(str(path))
+        ocel, _ = sqlite_reader.read_ocel2_sqlite(path)
         if output:
             logger.info("Import finished: " + str(ocel))
-        return OCELWrapper(ocel)
+        ocel = OCELWrapper(ocel)
+        ocel.artifacts = ArtifactStore.for_file(path)
+        ocel.encoding  # Build integer encoding at import time
+        return ocel
 
     @staticmethod
     def read_ocel2_sqlite_with_report(
@@ -1221,11 +1703,44 @@ class OCELWrapper:
         version_info: bool = False,
         output: bool = True,
         upload_date: datetime | None = None,
+        snapshot: bool = False,
+        snapshot_path: PathLike | None = None,
+        lazy: bool = False,
+        mmap: bool = False,
     ) -> OCELWrapper:
+        """Imports an OCEL 2.0 sqlite file, collecting warnings and unsatisfied constraints in an import report.
+        When `snapshot=True`, a binary snapshot of the OCEL (see ocel.snapshot) is read instead of the sqlite file if possible,
+        otherwise written after the import. A snapshot at `snapshot_path` is used when it is newer than the sqlite file.
+        Without `snapshot_path`, the snapshot is kept in the file's artifact store, identified by the file contents.
+        With `lazy=True` (requires a snapshot), all tables except events, objects and relations are read from the snapshot on first access.
+        With `mmap=True` (requires a snapshot), numeric columns and encoding arrays are memory-mapped read-only from the snapshot.
+        """
         report = {}
         if not isinstance(path, Path):
             path = Path(path)
 
+        artifacts = None
+        if snapshot and path.exists():
+            fingerprint = None
+            if snapshot_path is None:
+                artifacts = ArtifactStore.for_file(path)
+                if artifacts:
+                    snapshot_path = artifacts.snapshot_path
+                    fingerprint = artifacts.fingerprint
+            if snapshot_path is not None and snapshot_is_current(
+                snapshot_path, path, fingerprint=fingerprint
+            ):
+                ocel = OCELWrapper.read_snapshot(snapshot_path, lazy=lazy, mmap=mmap)
+                ocel.meta = OCELWrapper._import_meta(
+                    path,
+                    ocel.meta.get("importReport", {}),
+                    original_file_name=original_file_name,
+                    upload_date=upload_date,
+                )
+                if output:
+                    logger.info(f"Imported snapshot at {snapshot_path}: {ocel}")
+                return ocel
+
         init_output = [f"Importing OCEL 2.0 at {path}"]
 
         if version_info:
@@ -1240,25 +1755,10 @@ class OCELWrapper:
             logger.info("\n".join(init_output))
 
         with warnings.catch_warnings(record=True) as captured_warnings:
-            try:
-                pm4py_ocel = pm4py.read.read_ocel2_sqlite(str(path))
-            except Exception as err:
-                if err.args == ("File does not exist",):
-                    raise FileNotFoundError(f'File "{path}" does not exist')
-                else:
-                    raise err
+            pm4py_ocel, unsatisfied_constraints = sqlite_reader.read_ocel2_sqlite(path)
 
         # Print the captured warning text
-        other_warnings = []
-        unsatisfied_constraints = []
-        for w in captured_warnings:
-            prefix = "There are unsatisfied OCEL 2.0 constraints in the given relational database: "
-            if str(w.message).startswith(prefix):
-                unsatisfied_constraints = [
-                    c[1:-1] for c in str(w.message)[len(prefix) + 1 : -1].split(", ")
-                ]
-            else:
-                other_warnings.append(w)
+        other_warnings = list(captured_warnings)
         if unsatisfied_constraints:
             report["unsatisfiedOcelConstraints"] = unsatisfied_constraints
             if output:
@@ -1331,35 +1831,126 @@ class OCELWrapper:
                     logger.warning(warning_info(msg, warning_list, locations))
 
         ocel = OCELWrapper(pm4py_ocel)
+        ocel.artifacts = artifacts or ArtifactStore.for_file(path)
+        ocel.encoding  # Build integer encoding at import time
 
         report["ocelStrPm4py"] = str(pm4py_ocel)
         report["ocelStr"] = str(ocel)
 
-        ocel.meta = {
+        ocel.meta = OCELWrapper._import_meta(
+            path, report, original_file_name=original_file_name, upload_date=upload_date
+        )
+        if output:
+            logger.info(pm4py_ocel)
+
+        if snapshot and snapshot_path is not None:
+            try:
+                ocel.write_snapshot(snapshot_path)
+            except Exception as err:
+                logger.warning(
+                    f"Could not write OCEL snapshot ({type(err).__name__}: {err})"
+                )
+            else:
+                if artifacts is not None:
+                    artifacts.prune()
+                if lazy or mmap:
+                    # Continue with the snapshot, freeing tables that are not needed yet (lazy)
+                    # or replacing them by memory-mapped tables (mmap)
+                    ocel = OCELWrapper.read_snapshot(
+                        snapshot_path,
+                        lazy=lazy,
+                        mmap=mmap,
+                        loaded=(
+                            None
+                            if mmap
+                            else {
+                                name: getattr(pm4py_ocel, name) for name in EAGER_TABLES
+                            }
+                        ),
+                    )
+
+        return ocel
+
+    @staticmethod
+    def _import_meta(
+        path: Path,
+        report: dict[str, Any],
+        original_file_name: str | None = None,
+        upload_date: datetime | None = None,
+    ) -> dict[str, Any]:
+        meta = {
             "path": str(path),
             "fileName": original_file_name or str(path.name),
             "importReport": report,
         }
         if upload_date:
-            ocel.meta["uploadDate"] = upload_date.strftime("%Y-%m-%d %H:%M:%S")
-        if output:
-            logger.info(pm4py_ocel)
+            meta["uploadDate"] = upload_date.strftime("%Y-%m-%d %H:%M:%S")
+        return meta
 
+    @staticmethod
+    def read_snapshot(
+        path: PathLike,
+        lazy: bool = False,
+        mmap: bool = False,
+        loaded: dict[str, pd.DataFrame] | None = None,
+    ) -> OCELWrapper:
+        """Reads an OCEL snapshot written by `write_snapshot`, including metadata and integer encoding.
+        With `lazy=True`, tables are read on first access, except events, objects and relations.
+        With `mmap=True`, numeric columns and encoding arrays are memory-mapped read-only.
+        Tables passed via `loaded` are used instead of reading them (see ocel.snapshot.read_snapshot).
+        """
+        pm4py_ocel, header = read_snapshot(path, lazy=lazy, loaded=loaded, mmap=mmap)
+        ocel = OCELWrapper(pm4py_ocel)
+        ocel.load(*EAGER_TABLES)
+        ocel.meta = header["meta"]
+        if header["fingerprint"]:
+            ocel.artifacts = ArtifactStore.for_fingerprint(header["fingerprint"])
+        encoding = read_snapshot_encoding(path, mmap=mmap)
+        if encoding is not None:
+            OCELWrapper.encoding.fget.cache_put(ocel, encoding)  # type: ignore
+        ocel.encoding  # Build integer encoding at import time, unless stored in the snapshot
         return ocel
 
+    def write_snapshot(self, path: PathLike):
+        """Writes a binary snapshot of the OCEL and its metadata (see ocel.snapshot)."""
+        write_snapshot(
+            self.ocel,
+            path,
+            meta=self.meta,
+            fingerprint=self.artifacts.fingerprint if self.artifacts else None,
+            encoding=self.encoding,
+        )
+
     def write_ocel2_sqlite(self, file_path: PathLike):
         pm4py.write_ocel2_sqlite(self.ocel, str(file_path))
 
     # endregion
     # ----- Editing ------------------------------------------------------------------------------------------
     # region
-    def revalidate(self):
-        self.events = self.ocel.events
-        self.objects = self.ocel.objects
-        self.object_changes = self.ocel.object_changes
-        self.relations = self.ocel.relations
-
-        self.cache.clear()  # TODO this should only be used when this function is called ONCE on unit detection -> use dict
+    def revalidate(self, changes: Iterable[Dependency] | None = None):
+        """Forgets the cached results affected by editing the OCEL (see WeightedCache.invalidate).
+        `changes` contains the edited tables (e.g., when adding or removing rows) and (table, column) pairs (e.g., when adding or changing attributes).
+        By default, all cached results are forgotten.
+        """
+        with self.cache_lock:
+            self.cache.invalidate(changes)
+            if changes is None:
+                self._attr_column_info.clear()
+            else:
+                changes = list(changes)
+                for key in [
+                    key
+                    for key in self._attr_column_info
+                    if any(
+                        affects(change, dependency)
+                        for change in changes
+                        for dependency in (key, *ATTRIBUTE_COLUMN_DEPENDENCIES[key[0]])
+                    )
+                ]:
+                    del self._attr_column_info[key]
         self._attr_info_initialized = False
+        # Contents changed, stored artifacts no longer apply
+        self.artifacts = None
+        self.pin()
 
     # endregion
@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Callable, TypeVar
+
+import numpy as np
+import pm4py
+from pm4py.algo.discovery.inductive.dtypes.im_dfg import InductiveDFG
+from pm4py.algo.discovery.inductive.dtypes.im_ds import (
+    IMDataStructureDFG,
+    IMDataStructureUVCL,
+)
+from pm4py.algo.discovery.inductive.variants.im import IMUVCL
+from pm4py.algo.discovery.inductive.variants.imd import IMD
+from pm4py.objects.conversion.process_tree import converter as tree_converter
+from pm4py.objects.dfg.obj import DFG
+from pm4py.objects.ocel.obj import OCEL
+from pm4py.objects.process_tree.obj import ProcessTree
+from pm4py.objects.process_tree.utils.generic import fold, tree_sort
+from pm4py.util.compression.dtypes import UVCL
+
+from api.config import config
+from ocel.encoding import MISSING, OCELEncoding
+from ocel.flattening import flattened_pairs
+from ocel.incidence import IncidenceIndex
+
+"""
+Object-centric Petri net (OCPN) discovery, split into one task per object type.
+The Petri net of an object type only depends on the object type's flattened log,
+such that it can be discovered independently (in a worker process) and cached per object type (see OCELWrapper.otype_petri_net).
+Unless token-based replay diagnostics are requested, the inductive miner is fed the variant-compressed flattened log (see VariantLog),
+and IMd is fed the object type's DFG as computed by pm4py (see otype_dfg).
+The per-type nets are then merged into the OCPN of an object type set, as done by pm4py.discover_oc_petri_net.
+"""
+
+DOUBLE_ARC_THRESHOLD = 0.8
+"""An activity has double (variable) arcs for an object type if at most this share of its events with objects of the type
+have a single E2O relation of the type (as in pm4py's classic OCPN discovery)"""
+
+OCPN_WORKER_MIN_EVENTS = 10_000
+"""Object types with fewer input events (E2O relations, or events of all variants) are discovered in the calling process"""
+
+IM_PARAMETERS = {
+    "noise_threshold": 0.0,
+    "disable_fallthroughs": True,
+    "disable_strict_sequence_cut": True,
+}
+"""Inductive miner parameters used by pm4py.discover_oc_petri_net (by default)"""
+
+T = TypeVar("T")
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = Lock()
+
+
+def run_in_worker(func: Callable[..., T], *args: Any) -> T:
+    """Runs a function in the shared pool of worker processes and waits for the result.
+    The function and its arguments need to be picklable.
+    When no worker processes are configured (`OCPN_WORKERS=0`), the function is called directly."""
+    global _pool
+    if config.OCPN_WORKERS <= 0:
+        return func(*args)
+    with _pool_lock:
+        if _pool is None:
+            # Workers are spawned, as forking a multi-threaded server is unsafe
+            _pool = ProcessPoolExecutor(
+                max_workers=config.OCPN_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        pool = _pool
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        # A worker died, replace the pool for subsequent calls
+        with _pool_lock:
+            if _pool is pool:
+                _pool = None
+        raise
+
+
+def otype_ocel(ocel: OCEL, encoding: OCELEncoding, incidence: IncidenceIndex, otype: str) -> OCEL:
+    """Returns a minimal pm4py OCEL with the objects of a single type, their E2O relations and events.
+    Contains all data needed for the Petri net discovery of this object type, with the same flattened log as the full OCEL.
+    """
+    pair_mask = np.zeros(incidence.num_pairs, dtype=bool)
+    pair_mask[flattened_pairs(ocel, encoding, incidence, otypes=[otype])] = True
+    relations = ocel.relations.iloc[np.flatnonzero(pair_mask[incidence.relation_pairs])]
+    events = ocel.events[ocel.events["ocel:eid"].isin(relations["ocel:eid"])]
+    objects = ocel.objects[ocel.objects["ocel:oid"].isin(relations["ocel:oid"])]
+    return OCEL(
+        events=events[["ocel:eid", "ocel:activity", "ocel:timestamp"]].reset_index(drop=True),
+        objects=objects[["ocel:oid", "ocel:type"]].reset_index(drop=True),
+        relations=relations[
+            [
+                "ocel:eid",
+                "ocel:activity",
+                "ocel:timestamp",
+                "ocel:oid",
+                "ocel:type",
+                "ocel:qualifier",
+            ]
+        ].reset_index(drop=True),
+    )
+
+
+def discover_otype_petri_net(
+    ocel: OCEL,
+    otype: str,
+    inductive_miner_variant: str = "im",
+    diagnostics_with_tbr: bool = False,
+) -> dict[str, Any]:
+    """Discovers the Petri net of a single object type, given an OCEL only containing this type (see otype_ocel).
+    Returns the Petri net (net, initial marking, final marking) and the token-based replay diagnostics, if requested.
+    Runs pm4py's OCPN discovery, to be called in a worker process (see run_in_worker).
+    """
+    ocpn = pm4py.discover_oc_petri_net(
+        ocel,
+        inductive_miner_variant=inductive_miner_variant,
+        diagnostics_with_tbr=diagnostics_with_tbr,
+    )
+    return {
+        "petri_net": ocpn["petri_nets"][otype],
+        "tbr_results": ocpn["tbr_results"].get(otype),
+    }
+
+
+def discover_variant_petri_net(variant_log: UVCL) -> dict[str, Any]:
+    """Discovers the Petri net of a single object type with IM, from its variant-compressed flattened log (see VariantLog.to_pm4py).
+    Equivalent to discover_otype_petri_net without diagnostics, while the inductive miner only processes each variant once.
+    """
+    process_tree = IMUVCL(IM_PARAMETERS).apply(IMDataStructureUVCL(variant_log), IM_PARAMETERS)
+    return {"petri_net": process_tree_petri_net(process_tree), "tbr_results": None}
+
+
+def discover_dfg_petri_net(dfg: DFG) -> dict[str, Any]:
+    """Discovers the Petri net of a single object type with IMd, from its DFG (see otype_dfg).
+    Equivalent to discover_otype_petri_net with IMd and without diagnostics."""
+    process_tree = IMD(IM_PARAMETERS).apply(
+        IMDataStructureDFG(InductiveDFG(dfg=dfg, skip=False)), IM_PARAMETERS
+    )
+    return {"petri_net": process_tree_petri_net(process_tree), "tbr_results": None}
+
+
+def process_tree_petri_net(process_tree: ProcessTree) -> tuple:
+    """Converts a discovered process tree to a Petri net, with the same post-processing as pm4py's inductive miner"""
+    process_tree = fold(process_tree)
+    tree_sort(process_tree)
+    return tree_converter.apply(process_tree)
+
+
+def otype_dfg(ocel: OCEL, encoding: OCELEncoding, otype: str) -> DFG:
+    """Returns the directly-follows graph of an object type, as passed to IMd by pm4py.discover_oc_petri_net
+    (see pm4py.algo.discovery.ocel.ocdfg). Differs from the DFG of the flattened log (see OCELWrapper.directly_follows_graph):
+    - Each object's events are ordered like ocel.events, not by timestamp.
+    - An edge counts distinct couples of events, which are shared by all objects of the type taking part in both events.
+    - Start and end activities are taken from the first and last row of each object in ocel.relations, counting distinct events.
+    """
+    enc = encoding
+    code = enc.otypes.code(otype)
+    (rows,) = np.nonzero((enc.relation_otypes == code) & (enc.otype_of(enc.relation_oids) == code))
+    event_rows = np.full(len(enc.events), MISSING, dtype=np.int64)
+    event_rows[enc.events.encode(ocel.events["ocel:eid"])] = np.arange(len(ocel.events))
+
+    # Edges between successive events of each object, in order of ocel.events
+    walk = rows[event_rows[enc.relation_eids[rows]] != MISSING]
+    walk = walk[np.lexsort((walk, event_rows[enc.relation_eids[walk]], enc.relation_oids[walk]))]
+    oids, eids = enc.relation_oids[walk], enc.relation_eids[walk]
+    same_object = oids[1:] == oids[:-1]
+    couples = np.unique(
+        np.column_stack([eids[:-1][same_object], eids[1:][same_object]]).reshape(-1, 2), axis=0
+    )
+    activities = enc.event_activities[couples]
+
+    def activity_events(rows: np.ndarray) -> dict[str, int]:
+        """Number of distinct events per relation activity"""
+        keys = np.unique(
+            np.column_stack([enc.relation_activities[rows], enc.relation_eids[rows]]), axis=0
+        )
+        acts, counts = np.unique(keys[:, 0], return_counts=True)
+        return dict(zip(enc.activities.decode(acts), counts.tolist()))
+
+    # First and last relation row of each object
+    row_oids = enc.relation_oids[rows]
+    _, first = np.unique(row_oids, return_index=True)
+    _, last = np.unique(row_oids[::-1], return_index=True)
+
+    dfg = DFG()
+    dfg._graph = Counter(
+        zip(enc.activities.decode(activities[:, 0]), enc.activities.decode(activities[:, 1]))
+    )
+    dfg._start_activities = Counter(activity_events(rows[first]))
+    dfg._end_activities = Counter(activity_events(rows[len(rows) - 1 - last]))
+    return dfg
+
+
+def merge_ocpn(
+    encoding: OCELEncoding,
+    incidence: IncidenceIndex,
+    petri_nets: dict[str, dict[str, Any]],
+) -> dict[str, Any]:
+    """Merges the Petri nets of multiple object types (see discover_otype_petri_net) into an OCPN.
+    Activities and double arcs depend on the object type set, they are derived from the E2O relations.
+    Returns the same properties as pm4py.discover_oc_petri_net on the OCEL filtered to the object types
+    (activities, object_types, petri_nets, double_arcs_on_activity, tbr_results).
+    """
+    enc, inc = encoding, incidence
+    otypes = list(petri_nets.keys())
+
+    # E2O relation rows of the object types (including duplicate pairs with multiple qualifiers)
+    otype_mask = enc.otypes.mask(otypes)
+    pair_otypes = enc.relation_otypes[inc.pair_rows]
+    pair_mask = otype_mask[pair_otypes] & otype_mask[enc.object_otypes[inc.pair_oids]]
+    (rows,) = np.nonzero(pair_mask[inc.relation_pairs])
+    event_activities = enc.event_activities[np.unique(enc.relation_eids[rows])]
+
+    double_arcs_on_activity: dict[str, dict[str, bool]] = {}
+    for ot in otypes:
+        ot_rows = rows[enc.relation_otypes[rows] == enc.otypes.code(ot)]
+        # Number of relations with this type per event, with its (relation) activity
+        _, first, num_relations = np.unique(
+            enc.relation_eids[ot_rows], return_index=True, return_counts=True
+        )
+        activities = enc.relation_activities[ot_rows[first]]
+        num_events = np.bincount(activities, minlength=len(enc.activities))
+        num_single = np.bincount(
+            activities, weights=num_relations == 1, minlength=len(enc.activities)
+        )
+        double_arcs_on_activity[ot] = {
+            enc.activities.labels[act]: bool(
+                num_single[act] / num_events[act] <= DOUBLE_ARC_THRESHOLD
+            )
+            for act in np.unique(activities)
+        }
+
+    return {
+        "activities": set(
+            enc.activities.decode(np.unique(event_activities[event_activities != MISSING]))
+        ),
+        "object_types": set(otypes),
+        "petri_nets": {ot: res["petri_net"] for ot, res in petri_nets.items()},
+        "double_arcs_on_activity": double_arcs_on_activity,
+        "tbr_results": {
+            ot: res["tbr_results"]
+            for ot, res in petri_nets.items()
+            if res["tbr_results"] is not None
+        },
+    }
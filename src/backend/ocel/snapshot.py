@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.encoding import OCELEncoding
+from ocel.view import TABLE_NAMES, OCELView, plain_ocel
+from util.columnar import frame_num_rows, read_frame, write_frame
+from util.types import PathLike
+
+"""
+Binary snapshots of OCELs, for fast re-import without parsing the sqlite file.
+A snapshot is a directory containing one columnar frame (see util.columnar) per OCEL table
+and a `snapshot.json` header with the remaining pm4py OCEL attributes, OCELWrapper metadata and the content fingerprint.
+Snapshots can be read lazily, reading each table on first access (see OCELView).
+Optionally, the integer encoding of the OCEL (see OCELEncoding) is stored as well.
+When reading with `mmap=True`, numeric columns and encoding arrays are memory-mapped read-only (see util.columnar),
+such that processes reading the same snapshot share their memory.
+"""
+
+SNAPSHOT_VERSION = 2
+HEADER_FILE = "snapshot.json"
+ENCODING_DIR = "encoding"
+
+
+def write_snapshot(
+    ocel: OCEL,
+    path: PathLike,
+    meta: dict[str, Any],
+    fingerprint: str | None = None,
+    encoding: OCELEncoding | None = None,
+):
+    """Writes a snapshot of a pm4py OCEL. An existing snapshot at the same path is replaced atomically."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.mkdir(parents=True)
+    try:
+        for name in TABLE_NAMES:
+            write_frame(getattr(ocel, name), tmp_path / name)
+        if encoding is not None:
+            encoding.write(tmp_path / ENCODING_DIR)
+        header = {
+            "version": SNAPSHOT_VERSION,
+            # Unique per write, lazily read tables check the snapshot has not been replaced
+            "id": uuid.uuid4().hex,
+            "fingerprint": fingerprint,
+            "encoding": encoding is not None,
+            "ocel": {
+                k: v
+                for k, v in vars(ocel).items()
+                if k not in TABLE_NAMES and not k.startswith("_")
+            },
+            "meta": meta,
+        }
+        # Header is written last, marking the snapshot as complete
+        with open(tmp_path / HEADER_FILE, "w", encoding="utf8") as f:
+            json.dump(header, f, default=str)
+        if path.exists():
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def read_snapshot(
+    path: PathLike,
+    lazy: bool = False,
+    loaded: dict[str, pd.DataFrame] | None = None,
+    mmap: bool = False,
+) -> tuple[OCEL, dict[str, Any]]:
+    """Reads a snapshot, returning the pm4py OCEL and the snapshot header (containing `meta` and `fingerprint`).
+    With `lazy=True`, returns an OCELView reading each table on first access.
+    `loaded` can contain tables of the same OCEL that are already in memory, which are used instead of reading them.
+    With `mmap=True`, columns are memory-mapped where possible. These columns are read-only.
+    """
+    path = Path(path)
+    header = read_snapshot_header(path)
+    if header is None:
+        raise FileNotFoundError(f'No OCEL snapshot at "{path}"')
+    if lazy:
+        sources = {name: SnapshotTable(path, name, header["id"], mmap) for name in TABLE_NAMES}
+        return OCELView(plain_ocel(header["ocel"]), sources, loaded=loaded), header
+    tables = {name: read_frame(path / name, mmap=mmap) for name in TABLE_NAMES} | (loaded or {})
+    return plain_ocel(header["ocel"] | tables), header
+
+
+def read_snapshot_encoding(path: PathLike, mmap: bool = False) -> OCELEncoding | None:
+    """Reads the integer encoding stored with a snapshot, if any."""
+    header = read_snapshot_header(path)
+    if header is None or not header.get("encoding"):
+        return None
+    return OCELEncoding.read(Path(path) / ENCODING_DIR, mmap=mmap)
+
+
+def read_snapshot_header(path: PathLike) -> dict[str, Any] | None:
+    header_path = Path(path) / HEADER_FILE
+    if not header_path.is_file():
+        return None
+    with open(header_path, "r", encoding="utf8") as f:
+        header = json.load(f)
+    if header.get("version") != SNAPSHOT_VERSION:
+        return None
+    return header
+
+
+class SnapshotTable:
+    """OCEL table stored in a snapshot, read on first access (see OCELView)"""
+
+    def __init__(self, path: Path, name: str, snapshot_id: str, mmap: bool = False):
+        self.path = path
+        self.name = name
+        self.snapshot_id = snapshot_id
+        self.mmap = mmap
+
+    def materialize(self) -> pd.DataFrame:
+        self._check()
+        return read_frame(self.path / self.name, mmap=self.mmap)
+
+    def num_rows(self) -> int:
+        self._check()
+        return frame_num_rows(self.path / self.name)
+
+    def select(self, columns: list[str]) -> pd.DataFrame:
+        self._check()
+        return read_frame(self.path / self.name, columns=columns, mmap=self.mmap)
+
+    def _check(self):
+        header = read_snapshot_header(self.path)
+        if header is None or header["id"] != self.snapshot_id:
+            raise FileNotFoundError(f'OCEL snapshot at "{self.path}" has been replaced or deleted')
+
+
+def snapshot_is_current(
+    path: PathLike, source_path: PathLike, fingerprint: str | None = None
+) -> bool:
+    """Checks if a snapshot can be used in place of the given source file.
+    When passing the source file's content fingerprint, the snapshot needs to have the same fingerprint,
+    otherwise it needs to be newer than the source file."""
+    header = read_snapshot_header(path)
+    if header is None:
+        return False
+    if fingerprint is not None:
+        return header["fingerprint"] == fingerprint
+    return os.path.getmtime(Path(path) / HEADER_FILE) >= os.path.getmtime(source_path)
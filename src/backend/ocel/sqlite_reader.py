@@ -0,0 +1,428 @@
+from __future__ import annotations
+
+import sqlite3
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+from pm4py.objects.ocel.util import ocel_consistency
+from pm4py.objects.ocel.util.filtering_utils import propagate_relations_filtering
+
+from ocel.incidence import timestamp_array
+from util.types import PathLike
+
+"""
+Native reader for the OCEL 2.0 sqlite format.
+Tables are read with sqlite3 cursors in chunks of rows, converted to column arrays right away,
+and independent tables are loaded concurrently on a thread pool (sqlite3 releases the GIL while stepping through rows).
+The result is equivalent to `pm4py.read_ocel2_sqlite`, which parses all tables row-wise via Python dicts.
+Additionally, the relational schema is checked against the OCEL 2.0 constraints (names as in pm4py's validation).
+"""
+
+CHUNK_SIZE = 50_000
+MAX_WORKERS = 4
+
+
+def read_ocel2_sqlite(
+    path: PathLike, chunk_size: int = CHUNK_SIZE, max_workers: int = MAX_WORKERS
+) -> tuple[OCEL, list[str]]:
+    """Reads an OCEL 2.0 sqlite file. Returns the pm4py OCEL and a list of unsatisfied OCEL 2.0 constraints."""
+    path = Path(path)
+    if not path.is_file():
+        raise FileNotFoundError(f'File "{path}" does not exist')
+
+    with closing(_connect(path)) as con:
+        schema = SqliteSchema.read(con)
+    unsatisfied_constraints = check_constraints(schema)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def submit(table: str) -> Future[pd.DataFrame]:
+            return pool.submit(read_table, path, table, chunk_size)
+
+        # Largest tables first, type-specific tables as soon as the types are known
+        e2o_future = submit("event_object")
+        o2o_future = submit("object_object")
+        event_ids, object_ids = submit("event"), submit("object")
+
+        event_types = _type_series(event_ids.result())
+        event_tables = [
+            submit("event_" + _type_table(schema.event_type_map, et))
+            for et in _sorted_types(event_types)
+        ]
+        object_types = _type_series(object_ids.result())
+        object_tables = [
+            submit("object_" + _type_table(schema.object_type_map, ot))
+            for ot in _sorted_types(object_types)
+        ]
+
+        events = _assemble_events([f.result() for f in event_tables], event_types)
+        objects, object_changes = _assemble_objects(
+            [f.result() for f in object_tables], object_types
+        )
+        relations = _assemble_relations(e2o_future.result(), events, event_types, object_types)
+        o2o = _assemble_o2o(o2o_future.result())
+
+    events = _sort_by_timestamp(events)
+    relations = _sort_by_timestamp(relations)
+    if object_changes is not None:
+        object_changes = _sort_by_timestamp(object_changes)
+
+    ocel = OCEL(
+        events=events,
+        objects=objects,
+        relations=relations,
+        object_changes=object_changes,
+        o2o=o2o,
+    )
+    ocel = ocel_consistency.apply(ocel)
+    ocel = propagate_relations_filtering(ocel)
+    return ocel, unsatisfied_constraints
+
+
+def read_table(path: PathLike, table: str, chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Reads a whole sqlite table, fetching `chunk_size` rows at a time. Column dtypes are inferred like `pd.read_sql`."""
+    with closing(_connect(path)) as con:
+        cursor = con.execute(f"SELECT * FROM {_quote(table)}")
+        names = [d[0] for d in cursor.description]
+        chunks: list[list[np.ndarray]] = [[] for _ in names]
+        while rows := cursor.fetchmany(chunk_size):
+            for column_chunks, values in zip(chunks, zip(*rows)):
+                column_chunks.append(np.array(values, dtype=object))
+            del rows
+    data = {
+        name: np.concatenate(column_chunks) if column_chunks else np.empty(0, dtype=object)
+        for name, column_chunks in zip(names, chunks)
+    }
+    return pd.DataFrame(data, copy=False).infer_objects()
+
+
+# ----- ASSEMBLY ------------------------------------------------------------------------------------------
+# region
+
+
+def _assemble_events(tables: list[pd.DataFrame], event_types: pd.Series) -> pd.DataFrame | None:
+    if not tables:
+        return None
+    for df in tables:
+        df.rename(columns={"ocel_id": "ocel:eid", "ocel_time": "ocel:timestamp"}, inplace=True)
+        df["ocel:eid"] = normalize_ids(df["ocel:eid"])
+    events = pd.concat(tables)
+    events["ocel:activity"] = events["ocel:eid"].map(event_types)
+    events["ocel:timestamp"] = parse_timestamps(events["ocel:timestamp"])
+    return events
+
+
+def _assemble_objects(
+    tables: list[pd.DataFrame], object_types: pd.Series
+) -> tuple[pd.DataFrame | None, pd.DataFrame | None]:
+    if not tables:
+        return None, None
+    for df in tables:
+        df.rename(columns={"ocel_id": "ocel:oid", "ocel_time": "ocel:timestamp"}, inplace=True)
+        df["ocel:oid"] = normalize_ids(df["ocel:oid"])
+    rows = pd.concat(tables)
+    rows["ocel:type"] = rows["ocel:oid"].map(object_types)
+    rows.rename(columns={"ocel_changed_field": "ocel:field"}, inplace=True)
+    rows["@@cumcount"] = rows.groupby("ocel:oid").cumcount()
+
+    # Rows without changed field are initial values, the others attribute changes
+    object_changes = None
+    if "ocel:field" in rows:
+        is_change = rows["ocel:field"].notna().to_numpy()
+        if is_change.all():
+            is_change = (rows["@@cumcount"] > 0).to_numpy()
+        objects = rows[~is_change].drop(columns="ocel:field")
+        if is_change.any():
+            object_changes = rows[is_change].copy()
+            object_changes["ocel:timestamp"] = parse_timestamps(object_changes["ocel:timestamp"])
+    else:
+        objects = rows
+    objects = objects.drop(
+        columns=[col for col in ["ocel:timestamp", "@@cumcount"] if col in objects]
+    )
+    return objects, object_changes
+
+
+def _assemble_relations(
+    e2o: pd.DataFrame, events: pd.DataFrame | None, event_types: pd.Series, object_types: pd.Series
+) -> pd.DataFrame:
+    e2o.rename(
+        columns={
+            "ocel_event_id": "ocel:eid",
+            "ocel_object_id": "ocel:oid",
+            "ocel_qualifier": "ocel:qualifier",
+        },
+        inplace=True,
+    )
+    e2o["ocel:eid"] = normalize_ids(e2o["ocel:eid"])
+    e2o["ocel:oid"] = normalize_ids(e2o["ocel:oid"])
+    e2o["ocel:activity"] = e2o["ocel:eid"].map(event_types)
+    if events is not None:
+        event_timestamps = events.drop_duplicates("ocel:eid", keep="last").set_index("ocel:eid")
+        e2o["ocel:timestamp"] = e2o["ocel:eid"].map(event_timestamps["ocel:timestamp"])
+    else:
+        e2o["ocel:timestamp"] = pd.Series(pd.NaT, index=e2o.index, dtype="datetime64[ns, UTC]")
+    e2o["ocel:type"] = e2o["ocel:oid"].map(object_types)
+    return e2o
+
+
+def _assemble_o2o(o2o: pd.DataFrame) -> pd.DataFrame | None:
+    if not len(o2o):
+        return None
+    o2o.rename(
+        columns={
+            "ocel_source_id": "ocel:oid",
+            "ocel_target_id": "ocel:oid_2",
+            "ocel_qualifier": "ocel:qualifier",
+        },
+        inplace=True,
+    )
+    o2o["ocel:oid"] = normalize_ids(o2o["ocel:oid"])
+    o2o["ocel:oid_2"] = normalize_ids(o2o["ocel:oid_2"])
+    return o2o
+
+
+def _type_series(df: pd.DataFrame) -> pd.Series:
+    """Maps the IDs of the `event`/`object` table to their types (the last row wins for duplicate IDs)."""
+    ids = normalize_ids(df["ocel_id"])
+    return pd.Series(df["ocel_type"].to_numpy(), index=ids.to_numpy()).pipe(
+        lambda s: s[~s.index.duplicated(keep="last")]
+    )
+
+
+def _sorted_types(types: pd.Series) -> list[str]:
+    return sorted(types.dropna().unique().tolist())
+
+
+def _type_table(type_map: dict[str, str], ocel_type: str) -> str:
+    if ocel_type not in type_map:
+        raise ValueError(f'Type "{ocel_type}" is missing in the type map table.')
+    return type_map[ocel_type]
+
+
+def normalize_ids(ids: pd.Series) -> pd.Series:
+    """Converts an ID column to strings (NaN for missing IDs), like pm4py does on import.
+    Integral float IDs lose their decimals. IDs are converted once per unique value."""
+    codes, uniques = pd.factorize(ids)
+    uniques = pd.Series(uniques, dtype=ids.dtype if len(uniques) else object)
+    if pd.api.types.is_float_dtype(uniques) and ((uniques % 1) == 0).all():
+        labels = uniques.astype("Int64").astype("string")
+    elif pd.api.types.is_numeric_dtype(uniques):
+        labels = uniques.astype("string")
+    else:
+        labels = uniques.astype("string").str.replace(r"\.0$", "", regex=True)
+    labels = np.append(labels.to_numpy(dtype=object, na_value=np.nan), np.nan)
+    return pd.Series(labels[codes], index=ids.index, dtype=object)
+
+
+def parse_timestamps(timestamps: pd.Series) -> pd.Series:
+    """Parses a timestamp column to timezone-aware UTC timestamps (naive timestamps are assumed to be UTC)."""
+    if timestamps.dtype == object or pd.api.types.is_string_dtype(timestamps):
+        try:
+            timestamps = pd.to_datetime(timestamps, utc=True)
+        except (ValueError, TypeError):
+            timestamps = pd.to_datetime(timestamps, utc=True, format="mixed")
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        return timestamps
+    if timestamps.dt.tz is None:
+        return timestamps.dt.tz_localize("UTC")
+    return timestamps.dt.tz_convert("UTC")
+
+
+def _sort_by_timestamp(df: pd.DataFrame) -> pd.DataFrame:
+    """Stable sort by timestamp, then by index (the row number in the original table)"""
+    order = np.lexsort((df.index.to_numpy(), timestamp_array(df["ocel:timestamp"])))
+    return df.iloc[order]
+
+
+# endregion
+
+# ----- SCHEMA ------------------------------------------------------------------------------------------
+# region
+
+
+@dataclass
+class SqliteSchema:
+    """Tables, columns and foreign keys of a sqlite database, and the OCEL 2.0 type map tables"""
+
+    # table -> [(column name, declared type, primary key index)]
+    columns: dict[str, list[tuple[str, str, int]]]
+    # table -> [(referenced table, from column, to column)]
+    foreign_keys: dict[str, list[tuple[str, str, str | None]]]
+    event_type_map: dict[str, str]
+    object_type_map: dict[str, str]
+
+    @staticmethod
+    def read(con: sqlite3.Connection) -> SqliteSchema:
+        tables = [
+            name for (name,) in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        ]
+        columns = {
+            table: [
+                (name, decl_type, pk)
+                for _, name, decl_type, _, _, pk in con.execute(
+                    f"PRAGMA table_info({_quote(table)})"
+                )
+            ]
+            for table in tables
+        }
+        foreign_keys = {
+            table: [
+                (ref_table, from_col, to_col)
+                for _, _, ref_table, from_col, to_col, *_ in con.execute(
+                    f"PRAGMA foreign_key_list({_quote(table)})"
+                )
+            ]
+            for table in tables
+        }
+
+        def type_map(table: str) -> dict[str, str]:
+            if {"ocel_type", "ocel_type_map"}.issubset(
+                name for name, _, _ in columns.get(table, [])
+            ):
+                return dict(con.execute(f"SELECT ocel_type, ocel_type_map FROM {table}").fetchall())
+            return {}
+
+        return SqliteSchema(
+            columns=columns,
+            foreign_keys=foreign_keys,
+            event_type_map=type_map("event_map_type"),
+            object_type_map=type_map("object_map_type"),
+        )
+
+    def has_column(self, table: str, column: str, pk: bool = False, decl_type: str | None = None):
+        return any(
+            name == column and (not pk or k > 0) and (decl_type is None or t == decl_type)
+            for name, t, k in self.columns.get(table, [])
+        )
+
+    def pk_index(self, table: str, column: str) -> int:
+        return next((k for name, _, k in self.columns.get(table, []) if name == column), 0)
+
+    def has_foreign_key(self, table: str, ref_table: str, from_col: str, to_col: str) -> bool:
+        return (ref_table, from_col, to_col) in self.foreign_keys.get(table, [])
+
+
+def check_constraints(schema: SqliteSchema) -> list[str]:
+    """Checks the relational OCEL 2.0 constraints, returning the names of unsatisfied constraints."""
+    tables = set(schema.columns)
+
+    def type_tables(prefix: str, type_map: dict[str, str]) -> list[str]:
+        """Existing type-specific tables, once per type map entry"""
+        return [prefix + m for m in type_map.values() if prefix + m in tables]
+
+    def type_tables_match(prefix: str, type_map: dict[str, str], unmapped: set[str]) -> bool:
+        # Every mapped type has a table, and the only other tables named like "<prefix>%" are the given ones
+        mapped = {prefix + m for m in type_map.values()}
+        like = {t for t in tables if len(t) > len(prefix) - 1 and t.lower().startswith(prefix[:-1])}
+        return mapped.issubset(tables) and len(like - mapped) == len(unmapped)
+
+    def once_per_table(names: list[str], condition) -> bool:
+        counts = pd.Series([name for name in names if condition(name)], dtype=object).value_counts()
+        return bool((counts == 1).all())
+
+    event_tables = type_tables("event_", schema.event_type_map)
+    object_tables = type_tables("object_", schema.object_type_map)
+
+    constraints = {
+        "const_1_existence_type_independent_tables": {
+            "event_map_type",
+            "object_map_type",
+            "event",
+            "object",
+            "event_object",
+            "object_object",
+        }.issubset(tables),
+        "const_2_existence_object_type_tables_map_obj_types": type_tables_match(
+            "object_", schema.object_type_map, {"object_map_type", "object_object"}
+        ),
+        "const_3_existence_event_type_tables_map_ev_types": type_tables_match(
+            "event_", schema.event_type_map, {"event_map_type", "event_object"}
+        ),
+        "const_4_ocel_type_column": all(
+            schema.has_column(t, "ocel_type")
+            for t in ["object_map_type", "event_map_type", "event", "object"]
+        ),
+        "const_5_ocel_type_map": all(
+            schema.has_column(t, "ocel_type_map") for t in ["object_map_type", "event_map_type"]
+        ),
+        "const_6_ocel_id": all(schema.has_column(t, "ocel_id") for t in ["event", "object"]),
+        "const_7_ocel_qualifier": all(
+            schema.has_column(t, "ocel_qualifier") for t in ["event_object", "object_object"]
+        ),
+        "const_8_event_object_fields": all(
+            schema.has_column("event_object", c) for c in ["ocel_event_id", "ocel_object_id"]
+        ),
+        "const_9_object_object_fields": all(
+            schema.has_column("object_object", c) for c in ["ocel_source_id", "ocel_target_id"]
+        ),
+        "const_10_existence_ocel_id_obj_type_spec_tables": once_per_table(
+            object_tables, lambda t: schema.has_column(t, "ocel_id")
+        ),
+        "const_11_existence_ocel_id_ev_type_spec_tables": once_per_table(
+            event_tables, lambda t: schema.has_column(t, "ocel_id")
+        ),
+        "const_12_existence_type_ocel_time_obj_type_spec_tables": once_per_table(
+            object_tables, lambda t: schema.has_column(t, "ocel_time", decl_type="TIMESTAMP")
+        ),
+        "const_13_existence_type_ocel_time_ev_type_spec_tables": once_per_table(
+            event_tables, lambda t: schema.has_column(t, "ocel_time", decl_type="TIMESTAMP")
+        ),
+        "const_14_primary_key_object_event_map_type_tables": all(
+            schema.has_column(t, "ocel_type", pk=True)
+            for t in ["object_map_type", "event_map_type"]
+        ),
+        "const_15_primary_key_object_event_tables": all(
+            schema.has_column(t, "ocel_id", pk=True) for t in ["object", "event"]
+        ),
+        "const_16_primary_key_event_object_table": all(
+            schema.has_column("event_object", c, pk=True)
+            for c in ["ocel_event_id", "ocel_object_id", "ocel_qualifier"]
+        ),
+        "const_17_primary_key_object_object_table": all(
+            schema.has_column("object_object", c, pk=True)
+            for c in ["ocel_source_id", "ocel_target_id", "ocel_qualifier"]
+        ),
+        "const_18_primary_key_event_type_spec_tables": all(
+            sum(schema.pk_index(t, "ocel_id") for t in event_tables if t == table) == 1
+            for table in set(event_tables)
+            if schema.has_column(table, "ocel_id")
+        ),
+        "const_19_foreign_key_event": schema.has_foreign_key(
+            "event", "event_map_type", "ocel_type", "ocel_type"
+        ),
+        "const_20_foreign_key_object": schema.has_foreign_key(
+            "object", "object_map_type", "ocel_type", "ocel_type"
+        ),
+        "const_21_foreign_key_event_object": schema.has_foreign_key(
+            "event_object", "event", "ocel_event_id", "ocel_id"
+        )
+        and schema.has_foreign_key("event_object", "object", "ocel_object_id", "ocel_id"),
+        "const_22_foreign_key_object_object": schema.has_foreign_key(
+            "object_object", "object", "ocel_source_id", "ocel_id"
+        )
+        and schema.has_foreign_key("object_object", "object", "ocel_target_id", "ocel_id"),
+        "const_23_foreign_key_event_type_specific": all(
+            schema.has_foreign_key(t, "event", "ocel_id", "ocel_id") for t in event_tables
+        ),
+        "const_24_foreign_key_object_type_specific": all(
+            schema.has_foreign_key(t, "object", "ocel_id", "ocel_id") for t in object_tables
+        ),
+    }
+    return [name for name, satisfied in constraints.items() if not satisfied]
+
+
+# endregion
+
+
+def _connect(path: PathLike) -> sqlite3.Connection:
+    return sqlite3.connect(Path(path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
@@ -2,7 +2,6 @@ from __future__ import annotations
 
 import inspect
 import re
-from copy import deepcopy
 from datetime import datetime
 from typing import TYPE_CHECKING, Callable, Iterable, Sequence
 
@@ -11,6 +10,8 @@ import pandas as pd
 from pm4py.objects.ocel.obj import OCEL
 
 from api.logger import logger
+from ocel.incidence import timestamp_ns
+from ocel.view import DerivedTable, MaskedTable, OCELView, TableSource, is_loaded
 from util.misc import all_or_none
 
 if TYPE_CHECKING:
@@ -184,47 +185,40 @@ def join_current_attr_values(
     if not oattrs_static and not oattrs_dynamic and not eattrs:
         raise ValueError(f"join_current_attr_values: No attributes found.")
 
-    # Extract static attribute values
-    if oattrs_static:
-        oattr_values_static = ocel.objects[["ocel:oid", "ocel:type", *oattrs_static]]
-        if otypes:
-            oattr_values_static = oattr_values_static[oattr_values_static["ocel:type"].isin(otypes)]
-    else:
-        oattr_values_static = None
-
-    # Extract dynamic attribute values
+    # Check dynamic attribute values exist
     if oattrs_dynamic:
-        # select attributes
-        oattr_values_dynamic = ocel.object_changes[
-            ["ocel:oid", "ocel:type", "ocel:timestamp", *oattrs_dynamic]
-        ]
         value_filter = ocel.object_changes["ocel:field"].isin(oattrs_dynamic)
         if otypes:
-            value_filter = value_filter & (oattr_values_dynamic["ocel:type"].isin(otypes))
-        oattr_values_dynamic = oattr_values_dynamic[value_filter]
-        if len(oattr_values_dynamic) == 0:
+            value_filter = value_filter & (ocel.object_changes["ocel:type"].isin(otypes))
+        if not value_filter.any():
             # TODO error might be wrong, if no attr values exist
             raise ValueError(
                 f"Attributes {', '.join(oattrs)} not available"
                 + (f" for objects of type(s) '{', '.join(otypes)}'." if otypes else "")
             )
-    else:
-        oattr_values_dynamic = None
 
-    # concat e2o relations with attr values and sort by timestamp (later copy values downwards via ffill)
-    #   static attr -- timestamp <NA> --> na_position="first"
-    #   dynamic attr -- when same timestamp as event, put first (need stable sort)
-    events_and_changes = pd.concat(
-        [oattr_values_static, oattr_values_dynamic, relations], ignore_index=True  # type: ignore
-    )
-    events_and_changes = events_and_changes[list(relations.columns) + oattrs]
-    events_and_changes.sort_values(
-        "ocel:timestamp", na_position="first", kind="stable", inplace=True, ignore_index=True
+    # Look up attribute values at the events' timestamps (see OCELWrapper.attribute_value_at)
+    #   static attr -- value from the objects table
+    #   dynamic attr -- most recent value set at or before the event's timestamp, overriding static values
+    relations = relations.sort_values(
+        "ocel:timestamp", na_position="first", kind="stable", ignore_index=True
     )
-    # copy attribute values downwards within object group
-    events_and_changes[oattrs] = events_and_changes.groupby("ocel:oid")[oattrs].ffill()
-    # drop attribute value rows, only keep e2o relations
-    relations = events_and_changes[~events_and_changes["ocel:eid"].isna()]
+    oid_codes = ocel.encoding.objects.encode(relations["ocel:oid"])
+    times = timestamp_ns(relations["ocel:timestamp"])
+    otype_filter = relations["ocel:type"].isin(otypes).to_numpy() if otypes else None
+    oattr_values = {}
+    for attr in oattrs:
+        values = ocel._attribute_values(
+            oid_codes,
+            attr,
+            times,
+            static=attr in oattrs_static,
+            dynamic=attr in oattrs_dynamic,
+        )
+        if otype_filter is not None:
+            values = values.where(otype_filter)
+        oattr_values[attr] = values.to_numpy()
+    relations = relations.assign(**oattr_values)
 
     # Extract event attributes
     if eattrs:
@@ -299,6 +293,7 @@ def filter_pm4py_ocel(
     Filters a pm4py OCEL by object types, activities, qualifies, and/or timestamps.
     Returns a minimal OCEL, deleting objects not related to any retained events and vice versa.
     In dynamic attributes, when passing min_timestamp, additionally retains the last value set before min_timestamp.
+    The result is an OCELView, keeping row masks over the original tables until a table is accessed.
     """
 
     # relations      [ocel:eid, ocel:oid, ocel:qualifier, ocel:activity, ocel:timestamp, ocel:type]
@@ -308,60 +303,89 @@ def filter_pm4py_ocel(
     # o2o            [ocel:oid, ocel:oid_2, ocel:qualifier]
     # e2e            [ocel:eid, ocel:eid_2, ocel:qualifier]
 
-    def qualifier_filter(df: pd.DataFrame, col: str = "ocel:qualifier"):
+    def qualifier_filter(df: pd.DataFrame, col: str = "ocel:qualifier") -> np.ndarray:
         if qualifiers:
-            return df[col].isin(qualifiers)
-        return df[col].map(lambda x: True)
-
-    ocel2 = deepcopy(ocel)
+            return df[col].isin(qualifiers).to_numpy()
+        return np.ones(len(df), dtype=bool)
 
+    # Instead of copying the OCEL, only compute row masks of the original tables.
+    # Tables are materialized when accessed (see OCELView).
     # E2O relations table
-    relations_filter = ocel2.relations["ocel:eid"].map(lambda x: True)
+    relations = ocel.relations
+    relations_filter = np.ones(len(relations), dtype=bool)
     if otypes:
-        relations_filter = relations_filter & ocel2.relations["ocel:type"].isin(otypes)
+        relations_filter &= relations["ocel:type"].isin(otypes).to_numpy()
     if oids:
-        relations_filter = relations_filter & ocel2.relations["ocel:oid"].isin(oids)
+        relations_filter &= relations["ocel:oid"].isin(oids).to_numpy()
     if activities:
-        relations_filter = relations_filter & ocel2.relations["ocel:activity"].isin(activities)
+        relations_filter &= relations["ocel:activity"].isin(activities).to_numpy()
     if qualifiers:
-        relations_filter = relations_filter & ocel2.relations["ocel:qualifier"].isin(qualifiers)
+        relations_filter &= relations["ocel:qualifier"].isin(qualifiers).to_numpy()
     if min_timestamp is not None:
-        relations_filter = relations_filter & (ocel2.relations["ocel:timestamp"] >= min_timestamp)
+        relations_filter &= (relations["ocel:timestamp"] >= min_timestamp).to_numpy()
     if max_timestamp is not None:
-        relations_filter = relations_filter & (ocel2.relations["ocel:timestamp"] <= max_timestamp)
-    ocel2.relations = ocel2.relations[relations_filter]
+        relations_filter &= (relations["ocel:timestamp"] <= max_timestamp).to_numpy()
 
     # Retain events & objects that have E2O relations
-    ocel2.events = ocel2.events[ocel2.events["ocel:eid"].isin(ocel2.relations["ocel:eid"])]
-    ocel2.objects = ocel2.objects[ocel2.objects["ocel:oid"].isin(ocel2.relations["ocel:oid"])]
+    events, objects = ocel.events, ocel.objects
+    eids = relations["ocel:eid"][relations_filter].unique()
+    oids_filtered = relations["ocel:oid"][relations_filter].unique()
+    events_filter = events["ocel:eid"].isin(eids).to_numpy()
+    objects_filter = objects["ocel:oid"].isin(oids_filtered).to_numpy()
+    retained_oids = objects["ocel:oid"][objects_filter]
+
+    retained_eids = events["ocel:eid"][events_filter]
+
+    def deferred(name: str, source: Callable[[pd.DataFrame], TableSource]) -> TableSource:
+        # Tables that have not been loaded (see OCELView) are only read when the filtered table is accessed
+        if is_loaded(ocel, name):
+            return source(getattr(ocel, name))
+        return DerivedTable(lambda: source(getattr(ocel, name)).materialize())
 
     # object_changes table
-    ocel2.object_changes = ocel2.object_changes[
-        ocel2.object_changes["ocel:oid"].isin(ocel2.objects["ocel:oid"])
-    ]
-    if max_timestamp is not None:
-        ocel2.object_changes = ocel2.object_changes[
-            ocel2.object_changes["ocel:timestamp"] <= max_timestamp
-        ]
-    if min_timestamp is not None:
+    def object_changes_table(object_changes: pd.DataFrame) -> TableSource:
+        object_changes_filter = object_changes["ocel:oid"].isin(retained_oids).to_numpy()
+        if max_timestamp is not None:
+            object_changes_filter &= (object_changes["ocel:timestamp"] <= max_timestamp).to_numpy()
+        if min_timestamp is None:
+            return MaskedTable(object_changes, object_changes_filter)
+
         # Include the latest values of each attribute that were set before min_timestamp
-        min_timestamp_filter = ocel2.object_changes["ocel:timestamp"] >= min_timestamp
-        filtered = ocel2.object_changes[min_timestamp_filter]
-        before = ocel2.object_changes[~min_timestamp_filter].sort_values("ocel:timestamp")
-        latest_before = before.groupby(["ocel:oid", "ocel:field"], as_index=False).last()
-        ocel2.object_changes = pd.concat([latest_before, filtered])
+        min_timestamp_filter = (object_changes["ocel:timestamp"] >= min_timestamp).to_numpy()
+
+        def object_changes_source():
+            filtered = object_changes[object_changes_filter & min_timestamp_filter]
+            before = object_changes[object_changes_filter & ~min_timestamp_filter].sort_values(
+                "ocel:timestamp"
+            )
+            latest_before = before.groupby(["ocel:oid", "ocel:field"], as_index=False).last()
+            return pd.concat([latest_before, filtered])
+
+        return DerivedTable(object_changes_source)
 
     # O2O relations table
-    o2o_oid = ocel2.o2o["ocel:oid"].isin(ocel2.objects["ocel:oid"])
-    o2o_oid_2 = ocel2.o2o["ocel:oid_2"].isin(ocel2.objects["ocel:oid"])
-    ocel2.o2o = ocel2.o2o[o2o_oid & o2o_oid_2 & qualifier_filter(ocel2.o2o)][ocel2.o2o.columns]
+    def o2o_table(o2o: pd.DataFrame) -> TableSource:
+        o2o_oid = o2o["ocel:oid"].isin(retained_oids).to_numpy()
+        o2o_oid_2 = o2o["ocel:oid_2"].isin(retained_oids).to_numpy()
+        return MaskedTable(o2o, o2o_oid & o2o_oid_2 & qualifier_filter(o2o))
 
     # E2E relations table
-    e2e_eid = ocel2.e2e["ocel:eid"].isin(ocel2.events["ocel:eid"])
-    e2e_eid_2 = ocel2.e2e["ocel:eid"].isin(ocel2.events["ocel:eid"])
-    ocel2.e2e = ocel2.e2e[e2e_eid & e2e_eid_2 & qualifier_filter(ocel2.e2e)][ocel2.e2e.columns]
+    def e2e_table(e2e: pd.DataFrame) -> TableSource:
+        e2e_eid = e2e["ocel:eid"].isin(retained_eids).to_numpy()
+        e2e_eid_2 = e2e["ocel:eid"].isin(retained_eids).to_numpy()
+        return MaskedTable(e2e, e2e_eid & e2e_eid_2 & qualifier_filter(e2e))
 
-    return ocel2
+    return OCELView(
+        ocel,
+        {
+            "relations": MaskedTable(relations, relations_filter),
+            "events": MaskedTable(events, events_filter),
+            "objects": MaskedTable(objects, objects_filter),
+            "object_changes": deferred("object_changes", object_changes_table),
+            "o2o": deferred("o2o", o2o_table),
+            "e2e": deferred("e2e", e2e_table),
+        },
+    )
 
 
 def filter_relations(
@@ -391,6 +415,25 @@ def filter_relations(
             f"filter_relations(): For otype, activity and qualifier, pass either a single value or a list."
         )
 
+    if ocel is not None and relations is ocel.ocel.relations:
+        # Use integer codes for filtering the full E2O relations table
+        enc = ocel.encoding
+        filter = np.ones(enc.num_relations, dtype=bool)
+        for codes, codebook, value, values in [
+            (enc.relation_otypes, enc.otypes, otype, otypes),
+            (enc.relation_activities, enc.activities, activity, activities),
+            (enc.relation_qualifiers, enc.qualifiers, qualifier, qualifiers),
+        ]:
+            if value:
+                filter &= codebook.isin(codes, [value])
+            if values:
+                filter &= codebook.isin(codes, values)
+        if not filter.all():
+            relations = relations[filter]
+        if copy:
+            return relations.copy()
+        return relations
+
     filter = True
     if otype:
         filter = filter & (relations["ocel:type"] == otype)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+from copy import deepcopy
+from typing import Any, Callable, Iterable, Protocol
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+TABLE_NAMES = ("events", "objects", "relations", "object_changes", "o2o", "e2e")
+
+
+class TableSource(Protocol):
+    """Deferred source of an OCEL table, materialized on first access"""
+
+    def materialize(self) -> pd.DataFrame: ...
+
+    def num_rows(self) -> int: ...
+
+    def select(self, columns: list[str]) -> pd.DataFrame: ...
+
+
+class MaskedTable:
+    """Row subset of a parent table, given by a boolean mask. Does not copy any data until materialized."""
+
+    def __init__(self, parent: pd.DataFrame, mask: np.ndarray | pd.Series):
+        self.parent = parent
+        self.mask = np.asarray(mask, dtype=bool)
+        assert len(self.mask) == len(parent)
+
+    def materialize(self) -> pd.DataFrame:
+        return self.parent[self.mask]
+
+    def num_rows(self) -> int:
+        return int(self.mask.sum())
+
+    def select(self, columns: list[str]) -> pd.DataFrame:
+        return self.parent.loc[self.mask, columns]
+
+
+class DerivedTable:
+    """Table computed by a function on first access"""
+
+    def __init__(self, func: Callable[[], pd.DataFrame]):
+        self.func = func
+
+    def materialize(self) -> pd.DataFrame:
+        return self.func()
+
+    def num_rows(self) -> int:
+        return len(self.materialize())
+
+    def select(self, columns: list[str]) -> pd.DataFrame:
+        return self.materialize()[columns]
+
+
+class SharedTable:
+    """Table of another OCEL, shared without copying (copy-on-write, see `shared_ocel`).
+    The table must not be modified in-place, but replaced by a modified copy."""
+
+    def __init__(self, parent: OCEL, name: str):
+        self.parent = parent
+        self.name = name
+
+    def materialize(self) -> pd.DataFrame:
+        return getattr(self.parent, self.name)
+
+    def num_rows(self) -> int:
+        return num_rows(self.parent, self.name)
+
+    def select(self, columns: list[str]) -> pd.DataFrame:
+        if isinstance(self.parent, OCELView):
+            return self.parent.select(self.name, columns)
+        return getattr(self.parent, self.name)[columns]
+
+
+class LazyTable:
+    """Descriptor for the tables of an OCELView. Reading materializes the table from its source once,
+    assigning replaces the source by the given DataFrame.
+    The source of a materialized table is kept, allowing to unload the table until it is reassigned.
+    """
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, ocel: OCELView | None, objtype: type | None = None) -> Any:
+        if ocel is None:
+            return self
+        tables = ocel._tables
+        if self.name not in tables:
+            source = ocel._sources[self.name]
+            tables[self.name] = source.materialize()
+            ocel._origins[self.name] = ocel._sources.pop(self.name)
+        return tables[self.name]
+
+    def __set__(self, ocel: OCELView, value: pd.DataFrame):
+        ocel._sources.pop(self.name, None)
+        ocel._origins.pop(self.name, None)
+        ocel._tables[self.name] = value
+
+
+class OCELView(OCEL):
+    """pm4py OCEL whose tables are deferred views of another OCEL's tables (see filter_pm4py_ocel).
+
+    Each table is kept as a TableSource (e.g., a boolean row mask over the parent table, or a file)
+    and is only materialized when accessed, e.g. for mutation or export.
+    Materialized tables are independent copies, modifying them does not affect the parent OCEL.
+    SharedTable sources are an exception, returning the parent's table itself. Such tables are only replaced, never modified in-place.
+    Unmodified tables can be unloaded to free memory, and are materialized again on the next access.
+    Copying a view keeps the sources of tables that have not been materialized, pickling returns a plain pm4py OCEL.
+    """
+
+    events = LazyTable()
+    objects = LazyTable()
+    relations = LazyTable()
+    object_changes = LazyTable()
+    o2o = LazyTable()
+    e2e = LazyTable()
+
+    def __init__(
+        self,
+        parent: OCEL,
+        sources: dict[str, TableSource | pd.DataFrame],
+        loaded: dict[str, pd.DataFrame] | None = None,
+    ):
+        """Creates a view with the given table sources. Missing sources default to the full parent table.
+        `loaded` can contain tables already materialized from their source."""
+        # OCEL.__init__ is not called, as it would assign all tables.
+        self._tables: dict[str, pd.DataFrame] = {}
+        self._sources: dict[str, TableSource] = {}
+        # Sources of materialized, unmodified tables
+        self._origins: dict[str, TableSource] = {}
+        # Copy column name settings, globals and parameters
+        for key, value in vars(parent).items():
+            if key not in TABLE_NAMES and not key.startswith("_"):
+                setattr(self, key, deepcopy(value))
+        for name in TABLE_NAMES:
+            source = sources.get(name, None)
+            if source is None:
+                # Full parent table, copied on access
+                source = MaskedTable(getattr(parent, name), np.ones(num_rows(parent, name), bool))
+            if isinstance(source, pd.DataFrame):
+                self._tables[name] = source
+            elif loaded and name in loaded:
+                self._tables[name] = loaded[name]
+                self._origins[name] = source
+            else:
+                self._sources[name] = source
+
+    def is_materialized(self, name: str) -> bool:
+        return name in self._tables
+
+    def materialize(self, names: Iterable[str] = TABLE_NAMES) -> OCELView:
+        """Materializes the given tables (default: all)"""
+        for name in names:
+            getattr(self, name)
+        return self
+
+    def unload(self, names: Iterable[str] = TABLE_NAMES) -> list[str]:
+        """Drops materialized tables that can be restored from their source, returning their names.
+        Tables that have been reassigned or pinned are kept."""
+        unloaded = []
+        for name in names:
+            if name in self._origins:
+                del self._tables[name]
+                self._sources[name] = self._origins.pop(name)
+                unloaded.append(name)
+        return unloaded
+
+    def pin(self):
+        """Keeps all materialized tables in memory, e.g. after modifying them in-place"""
+        self._origins.clear()
+
+    def to_ocel(self) -> OCEL:
+        """Returns a plain pm4py OCEL, materializing all tables"""
+        self.materialize()
+        return plain_ocel(
+            {k: v for k, v in vars(self).items() if not k.startswith("_")} | self._tables
+        )
+
+    def select(self, name: str, columns: list[str]) -> pd.DataFrame:
+        """Returns some columns of a table, without materializing the whole table"""
+        if name in self._tables:
+            return self._tables[name][columns]
+        return self._sources[name].select(columns)
+
+    def get_summary(self) -> str:
+        # Run pm4py's summary on the required columns only
+        summary_ocel = plain_ocel({k: v for k, v in vars(self).items() if not k.startswith("_")})
+        summary_ocel.events = self.select("events", [self.event_activity])
+        summary_ocel.objects = self.select("objects", [self.object_type_column])
+        summary_ocel.relations = self.select(
+            "relations", [self.event_activity, self.object_type_column]
+        )
+        return OCEL.get_summary(summary_ocel)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> OCELView:
+        # Sources are shared, materialized tables are copied
+        view = OCELView.__new__(OCELView)
+        for key, value in vars(self).items():
+            if not key.startswith("_"):
+                setattr(view, key, deepcopy(value, memo))
+        view._tables = deepcopy(self._tables, memo)
+        view._sources = dict(self._sources)
+        view._origins = dict(self._origins)
+        return view
+
+    def __reduce__(self):
+        return plain_ocel, (vars(self.to_ocel()),)
+
+
+def num_rows(ocel: OCEL, name: str) -> int:
+    """Number of rows of an OCEL table, without materializing views"""
+    if isinstance(ocel, OCELView) and not ocel.is_materialized(name):
+        return ocel._sources[name].num_rows()
+    return len(getattr(ocel, name))
+
+
+def shared_ocel(ocel: OCEL) -> OCELView:
+    """Returns a copy-on-write copy of an OCEL in O(1). All tables are shared with the given OCEL
+    until they are replaced. Assigning a table only affects the copy."""
+    return OCELView(ocel, {name: SharedTable(ocel, name) for name in TABLE_NAMES})
+
+
+def is_loaded(ocel: OCEL, name: str) -> bool:
+    """Checks if an OCEL table is in memory, i.e. accessing it does not read or compute it"""
+    return not isinstance(ocel, OCELView) or ocel.is_materialized(name)
+
+
+def plain_ocel(state: dict[str, Any]) -> OCEL:
+    """Creates a pm4py OCEL from its attributes, without calling OCEL.__init__"""
+    ocel = OCEL.__new__(OCEL)
+    ocel.__dict__.update(state)
+    return ocel
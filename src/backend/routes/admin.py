@@ -0,0 +1,61 @@
+from fastapi.routing import APIRouter
+from pydantic.main import BaseModel
+
+from api.config import config
+from api.dependencies import ApiSession
+from api.session import Session
+from util.cache import (
+    GLOBAL_CACHE_METRICS,
+    CacheMethodMetrics,
+    cache_metrics,
+    global_cache_bytes,
+    live_caches,
+)
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+class CacheStats(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    methods: dict[str, CacheMethodMetrics]
+
+    @staticmethod
+    def from_methods(
+        methods: dict[str, CacheMethodMetrics], max_bytes: int, bytes: int | None = None
+    ) -> "CacheStats":
+        return CacheStats(
+            entries=sum(m.entries for m in methods.values()),
+            bytes=sum(m.bytes for m in methods.values()) if bytes is None else bytes,
+            max_bytes=max_bytes,
+            methods=methods,
+        )
+
+
+class CacheMetricsResponse(BaseModel):
+    session: CacheStats
+    total: CacheStats | None = None
+    num_sessions: int | None = None
+
+
+@router.get("/cache-metrics", response_model=CacheMetricsResponse)
+def get_cache_metrics(session: ApiSession) -> CacheMetricsResponse:
+    """Hits, misses, computation and lock wait times and current entries of cached methods,
+    for the caches of the requesting session and, if EXPOSE_CACHE_METRICS is set, in total (since server start).
+    """
+    session_stats = CacheStats.from_methods(
+        cache_metrics(session.caches), max_bytes=config.CACHE_SESSION_BYTES
+    )
+    if not config.EXPOSE_CACHE_METRICS:
+        return CacheMetricsResponse(session=session_stats)
+    return CacheMetricsResponse(
+        session=session_stats,
+        total=CacheStats.from_methods(
+            cache_metrics(live_caches(), metrics=GLOBAL_CACHE_METRICS),
+            max_bytes=config.CACHE_GLOBAL_BYTES,
+            # Values shared by copy-on-write sessions are counted once
+            bytes=global_cache_bytes(),
+        ),
+        num_sessions=len(Session.sessions),
+    )
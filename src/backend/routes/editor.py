@@ -123,6 +123,7 @@ class UpsertAttributesRequest(BaseModel):
 @router.post("/ocel/upsert-attributes")
 def upsert_attributes_endpoint(req: UpsertAttributesRequest, ocel: ApiOcel):
     ext_table = DataFrame(req.ext_table)
+    num_rows = len(getattr(ocel.ocel, req.table))
 
     upsert_attributes(
         ocel=ocel.ocel,
@@ -133,7 +134,11 @@ def upsert_attributes_endpoint(req: UpsertAttributesRequest, ocel: ApiOcel):
         replace=req.replace,
     )
 
-    ocel.revalidate()
+    # Statistics of other attributes are kept, unless the merge duplicated rows
+    if len(getattr(ocel.ocel, req.table)) == num_rows:
+        ocel.revalidate([(req.table, col) for _, col in req.added_columns])
+    else:
+        ocel.revalidate([req.table])
     return {"status": "success"}
 
 
@@ -162,7 +167,7 @@ def upsert_objects_endpoint(req: UpsertObjectsRequest, ocel: ApiOcel):
         replace=req.replace,
     )
 
-    ocel.revalidate()
+    ocel.revalidate(["objects"])
 
     return {"status": "success"}
 
@@ -174,6 +179,8 @@ class ApplyO2ORuleRequest(BaseModel):
 @router.post("/ocel/apply-o2o")
 def apply_o2o_rule_endpoint(req: ApplyO2ORuleRequest, ocel: ApiOcel):
     new_relations = apply_o2o_rule(ocel.ocel, req.rule)
+    if new_relations:
+        ocel.revalidate(["o2o"])
 
     return {"relations": new_relations}
 
@@ -203,5 +210,6 @@ def distribute_value_endpoint(req: DistributeRequest, ocel: ApiOcel):
         right_index=True,
         how="left",
     )
+    ocel.revalidate([("events", "distributed_value")])
 
     return {"status": "success", "added_column": "distributed_value"}
@@ -0,0 +1,247 @@
+"""
+Checks that the as-of lookups of dynamic object attribute values (see ocel.changes.AttributeChangeIndex) return
+the same values as a direct search and, in ocel.utils.join_current_attr_values, as the previous concat + sort + ffill
+implementation, including ties at equal timestamps, changes before the first event, objects without changes and
+fields whose value column is missing.
+Run from the backend directory: `python -m unittest discover tests`
+"""
+
+import unittest
+
+import numpy as np
+import pandas as pd
+from pm4py.objects.ocel.obj import OCEL
+
+from ocel.changes import upper_bound
+from ocel.incidence import timestamp_ns
+from ocel.ocel_wrapper import OCELWrapper
+from ocel.utils import join_current_attr_values
+
+OTYPES = ["order", "item"]
+MISSING_FIELD = "volume"
+"""Field with object changes, but without a value column"""
+
+
+def changing_ocel(seed: int = 0, num_events: int = 150, num_objects: int = 40) -> OCEL:
+    """Random OCEL with a static attribute (price), a static and dynamic attribute (weight),
+    a dynamic attribute (status) and changes of a field without a value column (volume).
+    Events and changes share an hourly grid, such that many changes coincide with events or other changes
+    (with different values). Some changes precede the first event, some objects have no changes,
+    and some changes have no value in their field's column.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2024-01-01")
+    objects = pd.DataFrame(
+        {
+            "ocel:oid": [f"o{i}" for i in range(num_objects)],
+            "ocel:type": rng.choice(OTYPES, num_objects),
+            "price": rng.integers(1, 100, num_objects).astype(float),
+            "weight": rng.random(num_objects),
+        }
+    )
+    events = pd.DataFrame(
+        {
+            "ocel:eid": [f"e{i}" for i in range(num_events)],
+            "ocel:activity": rng.choice(["create", "pick", "pack", "ship"], num_events),
+            "ocel:timestamp": start + pd.to_timedelta(rng.integers(0, 40, num_events), unit="h"),
+        }
+    )
+    relations = []
+    for eid, activity, timestamp in events.itertuples(index=False):
+        for o in rng.choice(num_objects, rng.integers(1, 4), replace=False):
+            oid, otype = objects.iloc[o][["ocel:oid", "ocel:type"]]
+            relations.append((eid, activity, timestamp, oid, otype, "q"))
+    relations = pd.DataFrame(
+        relations,
+        columns=[
+            "ocel:eid",
+            "ocel:activity",
+            "ocel:timestamp",
+            "ocel:oid",
+            "ocel:type",
+            "ocel:qualifier",
+        ],
+    )
+
+    # Only objects with even numbers change, changes start three hours before the first event
+    changed = objects.iloc[::2]
+    num_changes = 200
+    change_objects = changed.iloc[rng.integers(0, len(changed), num_changes)]
+    fields = rng.choice(["weight", "status", MISSING_FIELD], num_changes, p=[0.45, 0.45, 0.1])
+    weights = np.where(fields == "weight", rng.random(num_changes), np.nan)
+    statuses = np.where(fields == "status", rng.choice(["new", "open", "done"], num_changes), None)
+    # Some changes without value
+    weights[(fields == "weight") & (rng.random(num_changes) < 0.1)] = np.nan
+    statuses[(fields == "status") & (rng.random(num_changes) < 0.1)] = None
+    object_changes = pd.DataFrame(
+        {
+            "ocel:oid": change_objects["ocel:oid"].to_numpy(),
+            "ocel:type": change_objects["ocel:type"].to_numpy(),
+            "ocel:timestamp": start + pd.to_timedelta(rng.integers(-3, 40, num_changes), unit="h"),
+            "ocel:field": fields,
+            "weight": weights,
+            "status": statuses,
+        }
+    )
+    return OCEL(events=events, objects=objects, relations=relations, object_changes=object_changes)
+
+
+def concat_ffill_attr_values(
+    ocel: OCEL,
+    relations: pd.DataFrame,
+    oattrs_static: list[str],
+    oattrs_dynamic: list[str],
+    otypes: list[str],
+) -> pd.DataFrame:
+    """The object attribute part of join_current_attr_values before the as-of lookups.
+    Unlike the original, which raised a KeyError, value columns missing in object_changes are filled with NaN.
+    """
+    oattrs = list({*oattrs_static, *oattrs_dynamic})
+    oattr_values_static = None
+    if oattrs_static:
+        oattr_values_static = ocel.objects[["ocel:oid", "ocel:type", *oattrs_static]]
+        oattr_values_static = oattr_values_static[oattr_values_static["ocel:type"].isin(otypes)]
+    oattr_values_dynamic = None
+    if oattrs_dynamic:
+        oattr_values_dynamic = ocel.object_changes.reindex(
+            columns=["ocel:oid", "ocel:type", "ocel:timestamp", *oattrs_dynamic]
+        )
+        value_filter = ocel.object_changes["ocel:field"].isin(oattrs_dynamic)
+        value_filter = value_filter & (oattr_values_dynamic["ocel:type"].isin(otypes))
+        oattr_values_dynamic = oattr_values_dynamic[value_filter]
+
+    events_and_changes = pd.concat(
+        [oattr_values_static, oattr_values_dynamic, relations], ignore_index=True  # type: ignore
+    )
+    events_and_changes = events_and_changes[list(relations.columns) + oattrs]
+    events_and_changes.sort_values(
+        "ocel:timestamp", na_position="first", kind="stable", inplace=True, ignore_index=True
+    )
+    events_and_changes[oattrs] = events_and_changes.groupby("ocel:oid")[oattrs].ffill()
+    return events_and_changes[~events_and_changes["ocel:eid"].isna()]
+
+
+def last_change(ocel: OCEL, oid: str, field: str, timestamp: pd.Timestamp) -> int:
+    """Position of the last change of the field with a value at or before the timestamp (ties by row order), -1 if none"""
+    changes = ocel.object_changes.reset_index(drop=True)
+    if field not in changes.columns:
+        return -1
+    candidates = changes[
+        (changes["ocel:oid"] == oid)
+        & (changes["ocel:field"] == field)
+        & changes[field].notna()
+        & (changes["ocel:timestamp"] <= timestamp)
+    ]
+    if candidates.empty:
+        return -1
+    return int(candidates.sort_values("ocel:timestamp", kind="stable").index[-1])
+
+
+class AttributeValuesTest(unittest.TestCase):
+    ocels: dict[int, OCELWrapper]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ocels = {seed: OCELWrapper(changing_ocel(seed)) for seed in range(3)}
+
+    def assert_same_values(self, ocel: OCELWrapper, oattrs_static, oattrs_dynamic, otypes):
+        actual = join_current_attr_values(
+            ocel,
+            oattrs=[*oattrs_static, *oattrs_dynamic],
+            oattrs_static=oattrs_static,
+            oattrs_dynamic=oattrs_dynamic,
+            otypes=otypes,
+        )
+        relations = ocel.ocel.relations
+        expected = concat_ffill_attr_values(
+            ocel.ocel,
+            relations[relations["ocel:type"].isin(otypes)],
+            oattrs_static,
+            oattrs_dynamic,
+            otypes,
+        )
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True), expected.reset_index(drop=True)
+        )
+        return actual
+
+    def test_join_current_attr_values(self):
+        cases = [
+            ([], ["weight"]),
+            ([], ["status"]),
+            (["weight"], ["weight"]),
+            (["price"], ["status"]),
+            (["price", "weight"], ["weight", "status"]),
+        ]
+        for seed, ocel in self.ocels.items():
+            for oattrs_static, oattrs_dynamic in cases:
+                for otypes in [OTYPES, ["item"]]:
+                    with self.subTest(
+                        seed=seed, static=oattrs_static, dynamic=oattrs_dynamic, otypes=otypes
+                    ):
+                        self.assert_same_values(ocel, oattrs_static, oattrs_dynamic, otypes)
+
+    def test_ties_and_first_values(self):
+        ocel = self.ocels[0]
+        changes = ocel.ocel.object_changes
+        weights = changes[changes["ocel:field"] == "weight"]
+        # The generated logs contain the cases compared in test_join_current_attr_values
+        self.assertTrue(weights.duplicated(["ocel:oid", "ocel:timestamp"]).any())
+        self.assertTrue(weights["ocel:timestamp"].isin(ocel.ocel.events["ocel:timestamp"]).any())
+        self.assertTrue(
+            (weights["ocel:timestamp"] < ocel.ocel.events["ocel:timestamp"].min()).any()
+        )
+        self.assertFalse(ocel.ocel.objects["ocel:oid"].isin(changes["ocel:oid"]).all())
+
+        # Objects without changes keep their static value, or have none
+        relations = self.assert_same_values(ocel, ["weight"], ["weight", "status"], OTYPES)
+        unchanged = ~relations["ocel:oid"].isin(changes["ocel:oid"])
+        static = ocel.ocel.objects.set_index("ocel:oid")["weight"]
+        np.testing.assert_array_equal(
+            relations["weight"][unchanged], relations["ocel:oid"][unchanged].map(static)
+        )
+        self.assertTrue(relations["status"][unchanged].isna().all())
+
+    def test_missing_value_column(self):
+        for seed, ocel in self.ocels.items():
+            with self.subTest(seed=seed):
+                relations = self.assert_same_values(ocel, [], [MISSING_FIELD, "weight"], OTYPES)
+                self.assertTrue(relations[MISSING_FIELD].isna().all())
+
+    def test_lookup(self):
+        for seed, ocel in self.ocels.items():
+            rng = np.random.default_rng(seed)
+            start = ocel.ocel.events["ocel:timestamp"].min()
+            oids = np.append(ocel.ocel.objects["ocel:oid"].to_numpy(), "unknown")
+            for field in ["weight", "status", MISSING_FIELD, "unknown"]:
+                with self.subTest(seed=seed, field=field):
+                    query_oids = rng.choice(oids, 300)
+                    query_times = pd.Series(
+                        start + pd.to_timedelta(rng.integers(-5, 45, len(query_oids)), unit="h")
+                    )
+                    actual = ocel.attribute_changes.lookup(
+                        ocel.encoding.objects.encode(query_oids), field, timestamp_ns(query_times)
+                    )
+                    expected = [
+                        last_change(ocel.ocel, oid, field, timestamp)
+                        for oid, timestamp in zip(query_oids, query_times)
+                    ]
+                    np.testing.assert_array_equal(actual, expected)
+
+    def test_upper_bound(self):
+        rng = np.random.default_rng(0)
+        # Sorted ranges with repeated values, including empty ranges
+        lengths = rng.integers(0, 8, 50)
+        hi = np.cumsum(lengths)
+        lo = hi - lengths
+        values = np.concatenate([np.sort(rng.integers(0, 10, n)) for n in lengths])
+        targets = rng.integers(-1, 11, len(lengths))
+        expected = [
+            start + np.searchsorted(values[start:end], target, side="right")
+            for start, end, target in zip(lo, hi, targets)
+        ]
+        np.testing.assert_array_equal(upper_bound(values, lo, hi, targets), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,452 @@
+"""
+Tests of the weighted instance caches (see util.cache): eviction order, memory budgets, invalidation,
+single flight of concurrent calls and spilling evicted entries to disk (see util.spill).
+Run from the backend directory: `python -m unittest discover tests`
+"""
+
+import tempfile
+import threading
+import unittest
+import weakref
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import util.cache as cache_module
+import util.spill as spill_module
+from api.config import config
+from api.logger import logger
+from util.cache import (
+    CacheTimeoutError,
+    PendingResult,
+    WeightedCache,
+    global_cache_bytes,
+    instance_lru_cache,
+)
+from util.spill import SpillStore, spilled_bytes, write_reserved
+
+KB = 8000
+"""Size of `np.zeros(1000)` in bytes (see util.cache.object_size)"""
+
+
+def array(kilobytes: int = 1) -> np.ndarray:
+    return np.zeros(1000 * kilobytes)
+
+
+class Model:
+    """Instance with cached methods depending on different parts of its data"""
+
+    def __init__(self, maxsize: int | None = None):
+        self.cache_lock = threading.Lock()
+        self.cache = WeightedCache(maxsize=maxsize, lock=self.cache_lock)
+        self.calls = Counter()
+        # Set to block computations of `blocking` until released
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    @instance_lru_cache(depends_on=["events"])
+    def events(self, kilobytes: int = 1) -> np.ndarray:
+        self.calls["events"] += 1
+        return array(kilobytes)
+
+    @instance_lru_cache(depends_on=[("objects", "ocel:type")])
+    def object_types(self) -> np.ndarray:
+        self.calls["object_types"] += 1
+        return array()
+
+    @instance_lru_cache()
+    def everything(self) -> np.ndarray:
+        self.calls["everything"] += 1
+        return array()
+
+    @instance_lru_cache(depends_on=[])
+    def derived(self) -> np.ndarray:
+        """Only depends on data via the cached events"""
+        self.calls["derived"] += 1
+        return self.events() + 1
+
+    @instance_lru_cache(depends_on=["events"])
+    def blocking(self) -> np.ndarray:
+        self.calls["blocking"] += 1
+        self.started.set()
+        self.release.wait(timeout=10)
+        return array()
+
+    @instance_lru_cache()
+    def failing(self) -> np.ndarray:
+        self.calls["failing"] += 1
+        self.started.set()
+        self.release.wait(timeout=10)
+        raise ValueError("failed")
+
+
+class CacheTestCase(unittest.TestCase):
+    """Isolates the caches created by a test from all other caches of the process (e.g., of other tests' OCELs),
+    such that the global budget only evicts the test's own entries. Spilling is disabled."""
+
+    def setUp(self):
+        for p in [
+            patch.object(cache_module, "_caches", weakref.WeakValueDictionary()),
+            patch.object(config, "CACHE_SPILL_BYTES", 0),
+            patch.object(config, "CACHE_GLOBAL_BYTES", global_cache_bytes() + 1000 * KB),
+        ]:
+            p.start()
+            self.addCleanup(p.stop)
+
+
+class WeightedCacheTest(CacheTestCase):
+    def test_eviction_order(self):
+        cache = WeightedCache(maxsize=100 * KB)
+        # Computation time per byte: "small-slow" > "large-slow" > "small-fast"
+        for key, seconds, kilobytes in [
+            ("small-slow", 1.0, 1),
+            ("small-fast", 0.0, 1),
+            ("large-slow", 1.0, 10),
+        ]:
+            cache.record_cost(key, seconds)
+            cache[key] = array(kilobytes)
+        self.assertEqual(cache.popitem()[0], "small-fast")
+        self.assertEqual(cache.popitem()[0], "large-slow")
+        self.assertEqual(cache.popitem()[0], "small-slow")
+
+    def test_recently_used_entries_are_kept(self):
+        cache = WeightedCache(maxsize=100 * KB)
+        cache["a"], cache["b"] = array(), array()
+        cache["large"] = array(10)
+        # Evicting raises the inflation value, which is added to the priority of accessed entries
+        self.assertEqual(cache.popitem()[0], "large")
+        cache["a"]
+        self.assertEqual(cache.popitem()[0], "b")
+
+    def test_session_budget(self):
+        cache = WeightedCache(maxsize=3 * KB)
+        for i in range(5):
+            cache[i] = array()
+            self.assertLessEqual(cache.currsize, 3 * KB)
+        self.assertEqual(sorted(cache), [2, 3, 4])
+        self.assertEqual(cache.currsize, sum(cache.sizes.values()))
+        with self.assertRaises(ValueError):
+            cache["too large"] = array(4)
+        self.assertNotIn("too large", cache)
+
+    def test_too_large_results_are_returned(self):
+        model = Model(maxsize=KB)
+        self.assertEqual(len(model.events(2)), 2000)
+        self.assertEqual(len(model.events(2)), 2000)
+        self.assertEqual(model.calls["events"], 2)
+        self.assertEqual(model.cache.currsize, 0)
+
+    def test_global_budget(self):
+        baseline = global_cache_bytes()
+        cache1, cache2 = WeightedCache(lock=threading.Lock()), WeightedCache(lock=threading.Lock())
+        with patch.object(config, "CACHE_GLOBAL_BYTES", baseline + 2 * KB):
+            cache2["fast"] = array()
+            for key in ["a", "b"]:
+                cache1.record_cost(key, 0.5)
+                cache1[key] = array()
+            # Evicts the entry with the lowest priority over both caches
+            self.assertEqual(global_cache_bytes(), baseline + 2 * KB)
+            self.assertNotIn("fast", cache2)
+            self.assertEqual(sorted(cache1), ["a", "b"])
+
+    def test_global_budget_skips_caches_in_use(self):
+        baseline = global_cache_bytes()
+        cache1, cache2 = WeightedCache(lock=threading.Lock()), WeightedCache(lock=threading.Lock())
+        with patch.object(config, "CACHE_GLOBAL_BYTES", baseline + 2 * KB):
+            cache2["fast"] = array()
+            with cache2.lock:
+                for key in ["a", "b"]:
+                    cache1.record_cost(key, 0.5)
+                    cache1[key] = array()
+            self.assertEqual(global_cache_bytes(), baseline + 2 * KB)
+            self.assertIn("fast", cache2)
+            self.assertEqual(sorted(cache1), ["b"])
+
+    def test_shared_entries(self):
+        baseline = global_cache_bytes()
+        parent = WeightedCache(lock=threading.Lock())
+        parent["a"], parent["b"] = array(), array(2)
+        child = WeightedCache(lock=threading.Lock())
+        child.update_from(parent)
+        # Both caches count shared values against their own budget, the global budget counts them once
+        self.assertEqual(child.currsize, parent.currsize)
+        self.assertEqual(child.sizes, parent.sizes)
+        self.assertEqual(global_cache_bytes(), baseline + 3 * KB)
+        parent.clear()
+        self.assertEqual(global_cache_bytes(), baseline + 3 * KB)
+        self.assertEqual(child.evict(), 2 * KB)
+        self.assertEqual(global_cache_bytes(), baseline + KB)
+        # Values of garbage-collected caches are released
+        del child
+        self.assertEqual(global_cache_bytes(), baseline)
+
+    def test_shared_entries_global_budget(self):
+        baseline = global_cache_bytes()
+        parent = WeightedCache(lock=threading.Lock())
+        with patch.object(config, "CACHE_GLOBAL_BYTES", baseline + 2 * KB):
+            parent["shared"] = array()
+            child = WeightedCache(lock=threading.Lock())
+            child.update_from(parent)
+            for key in ["a", "b"]:
+                child.record_cost(key, 0.5)
+                child[key] = array()
+            # Freeing the shared value requires evicting it from both caches
+            self.assertNotIn("shared", parent)
+            self.assertEqual(sorted(child), ["a", "b"])
+            self.assertEqual(global_cache_bytes(), baseline + 2 * KB)
+
+
+class InvalidationTest(CacheTestCase):
+    def test_declared_dependencies(self):
+        model = Model()
+        model.events(), model.object_types(), model.everything()
+        self.assertEqual(model.cache.invalidate([("objects", "ocel:oid")]), 1)
+        self.assertEqual(sorted(k[0] for k in model.cache), ["events", "object_types"])
+        self.assertEqual(model.cache.invalidate(["events"]), 1)
+        self.assertEqual(sorted(k[0] for k in model.cache), ["object_types"])
+        # A changed table affects all of its columns
+        self.assertEqual(model.cache.invalidate(["objects"]), 1)
+        self.assertEqual(len(model.cache), 0)
+
+    def test_dependent_entries(self):
+        model = Model()
+        model.derived()
+        self.assertEqual(sorted(k[0] for k in model.cache), ["derived", "events"])
+        self.assertEqual(model.cache.invalidate([("objects", "ocel:type")]), 0)
+        self.assertEqual(model.cache.invalidate(["events"]), 2)
+        model.derived()
+        self.assertEqual(model.calls, Counter(events=2, derived=2))
+
+    def test_dependent_entries_of_evicted_entries(self):
+        model = Model()
+        model.derived()
+        Model.events.cache_forget(model)
+        self.assertEqual(sorted(k[0] for k in model.cache), ["derived"])
+        self.assertEqual(model.cache.invalidate(["events"]), 1)
+        self.assertEqual(len(model.cache), 0)
+
+    def test_invalidate_all(self):
+        model = Model()
+        model.derived(), model.object_types()
+        self.assertEqual(model.cache.invalidate(), 3)
+        self.assertEqual(len(model.cache), 0)
+
+    def test_pending_computation(self):
+        model = Model()
+        results = []
+        thread = threading.Thread(target=lambda: results.append(model.blocking()))
+        thread.start()
+        self.assertTrue(model.started.wait(timeout=10))
+        model.cache.invalidate(["events"])
+        model.release.set()
+        thread.join(timeout=10)
+        # The result computed from outdated data is returned, but not stored
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(model.cache), 0)
+        model.blocking()
+        self.assertEqual(model.calls["blocking"], 2)
+
+    def test_unaffected_pending_computation(self):
+        model = Model()
+        thread = threading.Thread(target=model.blocking)
+        thread.start()
+        self.assertTrue(model.started.wait(timeout=10))
+        model.cache.invalidate(["objects"])
+        model.release.set()
+        thread.join(timeout=10)
+        self.assertEqual([k[0] for k in model.cache], ["blocking"])
+
+
+class SingleFlightTest(CacheTestCase):
+    def call_twice(self, model: Model, method: str) -> list:
+        """Calls a blocking method in two threads, releasing it once the second call waits for the first.
+        Returns the value or exception of each call."""
+        results = [None, None]
+        waiting = threading.Event()
+        wait = PendingResult.wait
+
+        def wait_and_signal(pending: PendingResult, name: str):
+            waiting.set()
+            return wait(pending, name)
+
+        def call(i: int):
+            try:
+                results[i] = getattr(model, method)()
+            except Exception as e:
+                results[i] = e
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(2)]
+        with patch.object(PendingResult, "wait", wait_and_signal):
+            threads[0].start()
+            self.assertTrue(model.started.wait(timeout=10))
+            threads[1].start()
+            self.assertTrue(waiting.wait(timeout=10))
+            model.release.set()
+            for thread in threads:
+                thread.join(timeout=10)
+        return results
+
+    def test_computed_once(self):
+        model = Model()
+        result1, result2 = self.call_twice(model, "blocking")
+        self.assertIsInstance(result1, np.ndarray)
+        self.assertIs(result1, result2)
+        self.assertEqual(model.calls["blocking"], 1)
+        metrics = model.cache.metrics.snapshot()["blocking"]
+        self.assertEqual((metrics.misses, metrics.shared), (1, 1))
+        self.assertIs(model.blocking(), result1)
+        self.assertEqual(model.cache.pending, {})
+
+    def test_shared_exception(self):
+        model = Model()
+        error1, error2 = self.call_twice(model, "failing")
+        self.assertIsInstance(error1, ValueError)
+        self.assertIs(error1, error2)
+        self.assertEqual(model.calls["failing"], 1)
+        self.assertEqual(model.cache.pending, {})
+        # Exceptions are not cached
+        with self.assertRaises(ValueError):
+            model.failing()
+        self.assertEqual(model.calls["failing"], 2)
+
+    def test_timeout(self):
+        model = Model()
+        thread = threading.Thread(target=model.blocking)
+        thread.start()
+        try:
+            self.assertTrue(model.started.wait(timeout=10))
+            with patch.object(config, "CACHE_WAIT_TIMEOUT", 0.01):
+                with self.assertRaises(CacheTimeoutError):
+                    model.blocking()
+        finally:
+            model.release.set()
+            thread.join(timeout=10)
+        self.assertEqual(model.calls["blocking"], 1)
+
+
+class SpillTest(CacheTestCase):
+    """Spills to a temporary directory, isolated from the spill stores of other caches"""
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        for p in [
+            patch.object(config, "DATA_DIR", Path(directory.name)),
+            patch.object(config, "CACHE_SPILL_BYTES", spilled_bytes() + 1000 * KB),
+            patch.object(config, "CACHE_SPILL_MIN_SECONDS", 0.0),
+            patch.object(spill_module, "_process_directory", None),
+            patch.object(spill_module, "_stores", weakref.WeakSet()),
+        ]:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_round_trip(self):
+        frame = pd.DataFrame(
+            {
+                "id": ["a", "b", None],
+                "type": pd.Categorical(["x", "y", "x"]),
+                "value": [1.5, np.nan, 3.0],
+                "count": pd.array([1, None, 3], dtype="Int64"),
+                "time": pd.to_datetime(["2024-01-01", None, "2024-01-03"]).tz_localize("UTC"),
+            },
+            index=pd.Index([10, 20, 30], name="row"),
+        )
+        values = {"frame": frame, "dict": {"a": [1, 2], "b": frame}}
+        cache = WeightedCache()
+        for key, value in values.items():
+            cache[key] = value
+            cache.evict()
+            # Until written, the reserved entry is read from memory
+            self.assertIs(cache.spill.load(key)[0], value)
+        write_reserved()
+        for key, value in values.items():
+            self.assertNotIn(key, cache.sizes)
+            self.assertGreater(cache.spill.size(key), 0)
+        pd.testing.assert_frame_equal(cache["frame"], frame)
+        restored = cache["dict"]
+        self.assertEqual(restored["a"], [1, 2])
+        pd.testing.assert_frame_equal(restored["b"], frame)
+        self.assertEqual(cache.metrics.snapshot()["frame"].spill_hits, 1)
+
+    def test_restored_without_recomputing(self):
+        model = Model(maxsize=KB)
+        spill = model.cache.spill
+        locked = []
+
+        # File I/O happens after releasing the cache lock
+        def checking_lock(method):
+            def wrapper(*args, **kwargs):
+                locked.append(model.cache_lock.locked())
+                return method(*args, **kwargs)
+
+            return wrapper
+
+        with (
+            patch.object(SpillStore, "_write", checking_lock(SpillStore._write)),
+            patch.object(SpillStore, "load", checking_lock(SpillStore.load)),
+        ):
+            model.events()
+            model.object_types()  # evicts and spills events
+            self.assertIn(("events",), spill)
+            model.events()
+        self.assertEqual(model.calls, Counter(events=1, object_types=1))
+        self.assertEqual(locked, [False] * 3)
+        metrics = model.cache.metrics.snapshot()["events"]
+        self.assertEqual((metrics.spills, metrics.spill_hits), (1, 1))
+
+    def test_unreadable_file(self):
+        model = Model(maxsize=KB)
+        model.events()
+        model.object_types()
+        for path in model.cache.spill.directory.rglob("*"):
+            if path.is_file():
+                path.write_bytes(b"not a spilled entry")
+        with self.assertLogs(logger, "WARNING"):
+            model.events()
+        # Recomputed instead
+        self.assertEqual(model.calls["events"], 2)
+        self.assertNotIn(("events",), model.cache.spill)
+
+    def test_invalidated_while_writing(self):
+        cache = WeightedCache()
+        cache["a"] = array()
+        cache.evict()
+        cache.invalidate()
+        write_reserved()
+        self.assertNotIn("a", cache)
+        self.assertEqual(list(cache.spill.directory.iterdir()), [])
+
+    def test_global_budget(self):
+        values = np.random.default_rng(0).random((3, 1000))  # incompressible
+        store1, store2 = SpillStore(), SpillStore()
+        self.assertTrue(store1.save("slow", values[0], cost=5.0))
+        self.assertTrue(store2.save("fast", values[1], cost=1.0))
+        size = store1.size("slow")
+        with patch.object(config, "CACHE_SPILL_BYTES", spilled_bytes() + size // 2):
+            # Removes the entry with the lowest computation time per byte over both stores
+            self.assertTrue(store1.save("new", values[2], cost=3.0))
+            self.assertEqual(list(store1), ["slow", "new"])
+            self.assertEqual(list(store2), [])
+            self.assertLessEqual(spilled_bytes(), config.CACHE_SPILL_BYTES)
+            self.assertEqual(list(store2.directory.iterdir()), [])
+            # Entries exceeding the budget are not stored
+            self.assertFalse(store2.save("large", np.random.default_rng(1).random(10_000)))
+            self.assertEqual(list(store2), [])
+
+    def test_garbage_collected_store(self):
+        baseline = spilled_bytes()
+        store = SpillStore()
+        store.save("a", np.arange(1000))
+        self.assertGreater(spilled_bytes(), baseline)
+        directory = store.directory
+        del store
+        self.assertEqual(spilled_bytes(), baseline)
+        self.assertFalse(directory.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
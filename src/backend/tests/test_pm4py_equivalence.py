@@ -0,0 +1,333 @@
+"""
+Checks that the native implementations of OCELWrapper's discovery methods and the sqlite reader return the same results as
+the pm4py / networkx functions they replace, including OCELs with duplicate E2O pairs (multiple qualifiers).
+Run from the backend directory: `python -m unittest discover tests`
+"""
+
+import sqlite3
+import tempfile
+import unittest
+import warnings
+from contextlib import closing
+from pathlib import Path
+from unittest.mock import patch
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import pm4py
+from pm4py.algo.discovery.ocel.ocdfg.variants import classic as ocdfg_discovery
+from pm4py.objects.ocel.obj import OCEL
+from pm4py.objects.ocel.validation import ocel20_rel_validation
+from pm4py.objects.petri_net.obj import Marking, PetriNet
+
+from api.config import config
+from ocel import sqlite_reader
+from ocel.ocel_wrapper import OCELWrapper
+from ocel.ocpn import otype_dfg
+
+BUNDLED_OCEL = Path(__file__).parents[3] / "data" / "event_logs" / "pallet-logistics-v0.9.sqlite"
+
+
+def synthetic_ocel(seed: int = 0, num_events: int = 120, num_objects: int = 60) -> OCEL:
+    """Random OCEL with many timestamp ties, where about 5% of the E2O pairs have a second qualifier"""
+    rng = np.random.default_rng(seed)
+    objects = pd.DataFrame(
+        {
+            "ocel:oid": [f"o{i}" for i in range(num_objects)],
+            "ocel:type": rng.choice(["order", "item", "package"], num_objects),
+        }
+    )
+    events = pd.DataFrame(
+        {
+            "ocel:eid": [f"e{i}" for i in range(num_events)],
+            "ocel:activity": rng.choice(
+                ["create", "pick", "pack", "ship", "pay", "deliver"], num_events
+            ),
+            "ocel:timestamp": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 50, num_events), unit="h"),
+        }
+    )
+    relations = []
+    for eid, activity, timestamp in events.itertuples(index=False):
+        for o in rng.choice(num_objects, rng.integers(1, 4), replace=False):
+            oid, otype = objects.iloc[o]
+            relations.append((eid, activity, timestamp, oid, otype, "q1"))
+            if rng.random() < 0.05:
+                relations.append((eid, activity, timestamp, oid, otype, "q2"))
+    relations = pd.DataFrame(
+        relations,
+        columns=[
+            "ocel:eid",
+            "ocel:activity",
+            "ocel:timestamp",
+            "ocel:oid",
+            "ocel:type",
+            "ocel:qualifier",
+        ],
+    )
+    return OCEL(events=events, objects=objects, relations=relations)
+
+
+def with_duplicate_relations(ocel: OCEL, share: float = 0.2, seed: int = 0) -> OCEL:
+    """Copy of an OCEL where a share of the E2O relations is repeated with another qualifier"""
+    rng = np.random.default_rng(seed)
+    relations = ocel.relations
+    duplicates = relations[rng.random(len(relations)) < share].assign(
+        **{"ocel:qualifier": "duplicate"}
+    )
+    relations = pd.concat([relations, duplicates]).sort_index(kind="stable")
+    return OCEL(
+        events=ocel.events,
+        objects=ocel.objects,
+        relations=relations.reset_index(drop=True),
+        o2o=ocel.o2o,
+    )
+
+
+def with_attributes(ocel: OCEL, seed: int = 0) -> OCEL:
+    """Copy of an OCEL with an event attribute, an object attribute and changes of that attribute"""
+    rng = np.random.default_rng(seed)
+    changed = ocel.objects.sample(len(ocel.objects) // 3, random_state=seed)
+    object_changes = pd.DataFrame(
+        {
+            "ocel:oid": changed["ocel:oid"].to_numpy(),
+            "ocel:type": changed["ocel:type"].to_numpy(),
+            "ocel:timestamp": pd.Timestamp("2024-01-02")
+            + pd.to_timedelta(rng.integers(0, 50, len(changed)), unit="h"),
+            "ocel:field": "weight",
+            "weight": rng.random(len(changed)),
+        }
+    )
+    return OCEL(
+        events=ocel.events.assign(cost=rng.random(len(ocel.events))),
+        objects=ocel.objects.assign(weight=rng.random(len(ocel.objects))),
+        relations=ocel.relations,
+        object_changes=object_changes,
+    )
+
+
+def write_ocel2_sqlite(path: Path, event_object_foreign_keys: bool = True):
+    """Writes a small OCEL 2.0 sqlite file with all primary and foreign keys of the relational schema,
+    including an E2O pair with two qualifiers and an object attribute change.
+    With `event_object_foreign_keys=False`, the schema violates const_21_foreign_key_event_object.
+    """
+    event_object_keys = (
+        """,
+        FOREIGN KEY (ocel_event_id) REFERENCES event (ocel_id),
+        FOREIGN KEY (ocel_object_id) REFERENCES object (ocel_id)"""
+        if event_object_foreign_keys
+        else ""
+    )
+    with closing(sqlite3.connect(path)) as con:
+        con.executescript(
+            f"""
+            CREATE TABLE event_map_type (ocel_type TEXT PRIMARY KEY, ocel_type_map TEXT);
+            CREATE TABLE object_map_type (ocel_type TEXT PRIMARY KEY, ocel_type_map TEXT);
+            CREATE TABLE event (
+                ocel_id TEXT PRIMARY KEY, ocel_type TEXT,
+                FOREIGN KEY (ocel_type) REFERENCES event_map_type (ocel_type)
+            );
+            CREATE TABLE object (
+                ocel_id TEXT PRIMARY KEY, ocel_type TEXT,
+                FOREIGN KEY (ocel_type) REFERENCES object_map_type (ocel_type)
+            );
+            CREATE TABLE event_object (
+                ocel_event_id TEXT, ocel_object_id TEXT, ocel_qualifier TEXT,
+                PRIMARY KEY (ocel_event_id, ocel_object_id, ocel_qualifier){event_object_keys}
+            );
+            CREATE TABLE object_object (
+                ocel_source_id TEXT, ocel_target_id TEXT, ocel_qualifier TEXT,
+                PRIMARY KEY (ocel_source_id, ocel_target_id, ocel_qualifier),
+                FOREIGN KEY (ocel_source_id) REFERENCES object (ocel_id),
+                FOREIGN KEY (ocel_target_id) REFERENCES object (ocel_id)
+            );
+            CREATE TABLE event_CreateOrder (
+                ocel_id TEXT PRIMARY KEY, ocel_time TIMESTAMP, total REAL,
+                FOREIGN KEY (ocel_id) REFERENCES event (ocel_id)
+            );
+            CREATE TABLE event_Ship (
+                ocel_id TEXT PRIMARY KEY, ocel_time TIMESTAMP,
+                FOREIGN KEY (ocel_id) REFERENCES event (ocel_id)
+            );
+            CREATE TABLE object_Order (
+                ocel_id TEXT, ocel_time TIMESTAMP, ocel_changed_field TEXT, amount REAL,
+                FOREIGN KEY (ocel_id) REFERENCES object (ocel_id)
+            );
+            CREATE TABLE object_Item (
+                ocel_id TEXT, ocel_time TIMESTAMP, ocel_changed_field TEXT, weight REAL,
+                FOREIGN KEY (ocel_id) REFERENCES object (ocel_id)
+            );
+            INSERT INTO event_map_type VALUES ('Create Order', 'CreateOrder'), ('Ship', 'Ship');
+            INSERT INTO object_map_type VALUES ('Order', 'Order'), ('Item', 'Item');
+            INSERT INTO event VALUES ('e1', 'Create Order'), ('e2', 'Ship'), ('e3', 'Ship');
+            INSERT INTO object VALUES ('o1', 'Order'), ('i1', 'Item'), ('i2', 'Item');
+            INSERT INTO event_CreateOrder VALUES ('e1', '2024-01-01 10:00:00', 12.5);
+            INSERT INTO event_Ship VALUES ('e2', '2024-01-03 09:30:00'), ('e3', '2024-01-02 17:00:00');
+            INSERT INTO object_Order VALUES
+                ('o1', '1970-01-01 00:00:00', NULL, 3), ('o1', '2024-01-02 08:00:00', 'amount', 5);
+            INSERT INTO object_Item VALUES
+                ('i1', '1970-01-01 00:00:00', NULL, 1.5), ('i2', '1970-01-01 00:00:00', NULL, 0.5);
+            INSERT INTO event_object VALUES
+                ('e1', 'o1', 'order'), ('e1', 'i1', 'item'), ('e1', 'i2', 'item'), ('e2', 'o1', 'order'),
+                ('e2', 'i1', 'item'), ('e3', 'i2', 'item'), ('e3', 'i2', 'fragile item');
+            INSERT INTO object_object VALUES ('o1', 'i1', 'contains'), ('o1', 'i2', 'contains');
+            """
+        )
+
+
+def petri_net_graph(net: PetriNet, initial_marking: Marking, final_marking: Marking) -> nx.DiGraph:
+    """Graph of an accepting Petri net, labeling transitions by their label and places by their markings"""
+    G = nx.DiGraph()
+    G.add_nodes_from(
+        (p, {"label": ("place", initial_marking[p], final_marking[p])}) for p in net.places
+    )
+    G.add_nodes_from((t, {"label": ("transition", t.label)}) for t in net.transitions)
+    G.add_edges_from((arc.source, arc.target) for arc in net.arcs)
+    return G
+
+
+def load_ocels() -> dict[str, OCEL]:
+    ocels = {"synthetic": synthetic_ocel()}
+    if BUNDLED_OCEL.exists():
+        bundled, _ = sqlite_reader.read_ocel2_sqlite(BUNDLED_OCEL)
+        ocels["bundled"] = bundled
+        ocels["bundled with duplicates"] = with_duplicate_relations(bundled)
+    return ocels
+
+
+class Pm4pyEquivalenceTest(unittest.TestCase):
+    ocels: dict[str, OCELWrapper]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ocels = {name: OCELWrapper(ocel) for name, ocel in load_ocels().items()}
+
+    def test_duplicate_relations(self):
+        for name, ocel in self.ocels.items():
+            if name != "bundled":
+                with self.subTest(ocel=name):
+                    self.assertTrue(ocel.incidence.has_duplicate_relations)
+
+    def test_flattening(self):
+        for name, ocel in self.ocels.items():
+            for otype in ocel.otypes:
+                with self.subTest(ocel=name, otype=otype):
+                    expected = pm4py.ocel_flattening(ocel.ocel, otype)
+                    actual = ocel.flatten(otype)
+                    pd.testing.assert_frame_equal(actual, expected.reset_index(drop=True))
+
+    def test_directly_follows_graph(self):
+        for name, ocel in self.ocels.items():
+            for otype in ocel.otypes:
+                with self.subTest(ocel=name, otype=otype):
+                    flat_log = pm4py.ocel_flattening(ocel.ocel, otype)
+                    dfg, _, _ = pm4py.discover_directly_follows_graph(flat_log)
+                    self.assertEqual(ocel.directly_follows_graph(otype), dict(dfg))
+
+    def test_eventually_follows_graph(self):
+        for name, ocel in self.ocels.items():
+            for otype in ocel.otypes:
+                with self.subTest(ocel=name, otype=otype):
+                    flat_log = pm4py.ocel_flattening(ocel.ocel, otype)
+                    dfg, _, _ = pm4py.discover_directly_follows_graph(flat_log)
+                    G = nx.DiGraph()
+                    G.add_edges_from(dfg.keys())
+                    efg = ocel.eventually_follows_graph(otype)
+                    self.assertEqual(
+                        {(u, v) for u, successors in efg.items() for v in successors},
+                        set(nx.transitive_closure(G).edges()),
+                    )
+
+    def test_otype_dfg(self):
+        for name, ocel in self.ocels.items():
+            expected = ocdfg_discovery.apply(
+                ocel.ocel, parameters={"compute_edges_performance": False}
+            )
+            for otype in ocel.otypes:
+                with self.subTest(ocel=name, otype=otype):
+                    dfg = otype_dfg(ocel.ocel, ocel.encoding, otype)
+                    edges = expected["edges"]["event_couples"].get(otype, {})
+                    self.assertEqual(dict(dfg.graph), {k: len(v) for k, v in edges.items()})
+                    for key in ["start_activities", "end_activities"]:
+                        activities = expected[key]["events"][otype]
+                        self.assertEqual(
+                            dict(getattr(dfg, key)), {k: len(v) for k, v in activities.items()}
+                        )
+
+    def test_ocpn(self):
+        for name, ocel in self.ocels.items():
+            otype_sets = [{otype} for otype in ocel.otypes] + [set(ocel.otypes)]
+            for otypes in otype_sets:
+                for variant in ["im", "imd"]:
+                    with self.subTest(ocel=name, otypes=otypes, variant=variant):
+                        filtered_ocel = pm4py.filter_ocel_object_types(ocel.ocel, list(otypes))
+                        expected = pm4py.discover_oc_petri_net(
+                            filtered_ocel, inductive_miner_variant=variant
+                        )
+                        with patch.object(config, "OCPN_WORKERS", 0):
+                            actual = ocel.ocpn(otypes=otypes, inductive_miner_variant=variant)
+                        for key in ["activities", "object_types", "double_arcs_on_activity"]:
+                            self.assertEqual(actual[key], expected[key], key)
+                        for otype in otypes:
+                            self.assertTrue(
+                                nx.is_isomorphic(
+                                    petri_net_graph(*actual["petri_nets"][otype]),
+                                    petri_net_graph(*expected["petri_nets"][otype]),
+                                    node_match=lambda u, v: u["label"] == v["label"],
+                                ),
+                                otype,
+                            )
+
+
+class SqliteReaderTest(unittest.TestCase):
+    directory: tempfile.TemporaryDirectory
+    paths: dict[str, Path]
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        directory = Path(cls.directory.name)
+        cls.paths = {"schema": directory / "schema.sqlite"}
+        write_ocel2_sqlite(cls.paths["schema"])
+        cls.paths["synthetic"] = directory / "synthetic.sqlite"
+        pm4py.write_ocel2_sqlite(with_attributes(synthetic_ocel()), str(cls.paths["synthetic"]))
+        if BUNDLED_OCEL.exists():
+            cls.paths["bundled"] = BUNDLED_OCEL
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_read_ocel2_sqlite(self):
+        for name, path in self.paths.items():
+            with self.subTest(sqlite=name), warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                actual, unsatisfied_constraints = sqlite_reader.read_ocel2_sqlite(path)
+                _, expected_unsatisfied = ocel20_rel_validation.apply(str(path))
+                self.assertEqual(unsatisfied_constraints, expected_unsatisfied)
+                try:
+                    expected = pm4py.read_ocel2_sqlite(str(path))
+                except Exception as err:
+                    self.skipTest(f"pm4py cannot read {name} ({type(err).__name__}: {err})")
+                for table in ["events", "objects", "relations", "object_changes", "o2o"]:
+                    pd.testing.assert_frame_equal(
+                        getattr(actual, table), getattr(expected, table), obj=table
+                    )
+
+    def test_check_constraints(self):
+        path = Path(self.directory.name) / "broken.sqlite"
+        write_ocel2_sqlite(path, event_object_foreign_keys=False)
+        for sqlite_path, expected in [
+            (self.paths["schema"], []),
+            (path, ["const_21_foreign_key_event_object"]),
+        ]:
+            with self.subTest(sqlite=sqlite_path.name):
+                with closing(sqlite3.connect(sqlite_path)) as con:
+                    schema = sqlite_reader.SqliteSchema.read(con)
+                self.assertEqual(sqlite_reader.check_constraints(schema), expected)
+                self.assertEqual(ocel20_rel_validation.apply(str(sqlite_path))[1], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
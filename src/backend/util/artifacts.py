@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import shutil
+import uuid
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from api.config import config
+from api.logger import logger
+from util.columnar import UnsupportedFrameError, is_frame, read_frame, write_frame
+from util.types import PathLike
+
+ARTIFACT_CACHE_VERSION = 2
+"""Increment when the output of a persistent cached method changes, invalidating all stored artifacts."""
+
+NOT_FOUND = object()
+"""Returned by `ArtifactStore.load` for unknown keys"""
+
+
+class ArtifactStore:
+    """On-disk store of derived data of a single OCEL, identified by a fingerprint of its contents.
+    Used by `instance_lru_cache(persistent=True)` to reuse results across server restarts and re-uploads of the same file.
+
+    DataFrames are stored in a columnar format (see util.columnar), other values are pickled.
+    Failing reads and writes are logged and treated as cache misses.
+    The disk usage of all stores is limited by `ARTIFACT_CACHE_BYTES` (see prune_artifacts).
+    """
+
+    def __init__(self, root: PathLike, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.directory = Path(root) / f"v{ARTIFACT_CACHE_VERSION}" / fingerprint
+
+    def __repr__(self):
+        return f"ArtifactStore({self.fingerprint[:12]})"
+
+    @staticmethod
+    def for_file(path: PathLike) -> ArtifactStore | None:
+        """Returns the artifact store of an OCEL file, or None if the artifact cache is disabled."""
+        if not config.ARTIFACT_CACHE:
+            return None
+        return ArtifactStore.for_fingerprint(file_fingerprint(path))
+
+    @staticmethod
+    def for_fingerprint(fingerprint: str) -> ArtifactStore | None:
+        if not config.ARTIFACT_CACHE:
+            return None
+        store = ArtifactStore(config.DATA_DIR / "cache" / "artifacts", fingerprint)
+        store.touch()
+        return store
+
+    @property
+    def root(self) -> Path:
+        return self.directory.parent.parent
+
+    def touch(self):
+        """Marks the store as recently used, such that it is removed last by prune_artifacts"""
+        try:
+            os.utime(self.directory)
+        except OSError:
+            pass  # Not written yet
+
+    def prune(self):
+        """Removes other stores until the artifact cache fits into `ARTIFACT_CACHE_BYTES` (see prune_artifacts)"""
+        prune_artifacts(self.root, keep=self.directory)
+
+    @property
+    def snapshot_path(self) -> Path:
+        """Location of a binary snapshot of the OCEL itself (see ocel.snapshot)"""
+        return self.directory / "snapshot"
+
+    def key(self, name: str, args: tuple, kwargs: dict[str, Any]) -> str | None:
+        """Returns a file name for a method call, or None if the arguments cannot be serialized deterministically."""
+        try:
+            arg_str = json.dumps([args, kwargs], sort_keys=True, default=_json_default)
+        except TypeError:
+            return None
+        return f"{name}-{hashlib.sha1(arg_str.encode()).hexdigest()[:16]}"
+
+    def load(self, key: str) -> Any:
+        """Returns a stored value, or NOT_FOUND."""
+        frame_path, pickle_path = self._paths(key)
+        try:
+            if is_frame(frame_path):
+                return read_frame(frame_path)
+            if pickle_path.is_file():
+                with open(pickle_path, "rb") as f:
+                    return pickle.load(f)
+        except Exception as err:
+            logger.warning(f"Discarding unreadable artifact {key} ({type(err).__name__}: {err})")
+            self.delete(key)
+        return NOT_FOUND
+
+    def save(self, key: str, value: Any):
+        frame_path, pickle_path = self._paths(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            frame = False
+            if isinstance(value, pd.DataFrame):
+                try:
+                    write_frame(value, frame_path)
+                    frame = True
+                except UnsupportedFrameError:
+                    pass
+            if not frame:
+                _write_pickle(value, pickle_path)
+        except Exception as err:
+            logger.warning(f"Could not store artifact {key} ({type(err).__name__}: {err})")
+            return
+        self.prune()
+
+    def delete(self, key: str):
+        frame_path, pickle_path = self._paths(key)
+        shutil.rmtree(frame_path, ignore_errors=True)
+        pickle_path.unlink(missing_ok=True)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self.directory / key, self.directory / f"{key}.pkl"
+
+
+def prune_artifacts(root: PathLike, keep: Path | None = None, maxsize: int | None = None):
+    """Limits the disk usage of the artifact cache at `root` to `maxsize` (default `ARTIFACT_CACHE_BYTES`),
+    removing the directories of the least recently used stores first (by modification time, see ArtifactStore.touch).
+    Stores of other format versions (see ARTIFACT_CACHE_VERSION) are removed entirely. The store at `keep` is never removed.
+    """
+    root = Path(root)
+    if maxsize is None:
+        maxsize = config.ARTIFACT_CACHE_BYTES
+    current = root / f"v{ARTIFACT_CACHE_VERSION}"
+    stores = []
+    try:
+        for path in root.iterdir():
+            if path != current and path.is_dir() and re.fullmatch(r"v\d+", path.name):
+                shutil.rmtree(path, ignore_errors=True)
+        for path in current.iterdir():
+            if path.is_dir():
+                try:
+                    stores.append((path.stat().st_mtime, _disk_usage(path), path))
+                except FileNotFoundError:
+                    pass  # Removed concurrently
+    except OSError as err:
+        logger.warning(f"Could not prune artifact cache ({type(err).__name__}: {err})")
+        return
+    total = sum(size for _, size, _ in stores)
+    for _, size, path in sorted(stores):
+        if total <= maxsize:
+            break
+        if path != keep:
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def file_fingerprint(path: PathLike, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 hash of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _disk_usage(directory: Path) -> int:
+    size = 0
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            try:
+                size += os.stat(os.path.join(dirpath, name)).st_size
+            except OSError:
+                pass  # Removed concurrently
+    return size
+
+
+def _write_pickle(value: Any, path: Path):
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _json_default(x: Any):
+    if isinstance(x, (set, frozenset)):
+        return sorted(x, key=str)
+    if isinstance(x, (datetime, date, pd.Timestamp)):
+        return x.isoformat()
+    raise TypeError(f"Object of type {type(x).__name__} is not JSON serializable")
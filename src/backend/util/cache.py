@@ -1,21 +1,42 @@
+from __future__ import annotations
+
+import dataclasses
 import functools
 import json
-import operator
+import math
+import sys
+import threading
+import time
 import uuid
 import warnings
+import weakref
+from collections.abc import MutableMapping
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from contextlib import nullcontext
-from typing import Callable, Hashable
+from dataclasses import dataclass
+from itertools import chain
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable, Union
 
-from cachetools import cachedmethod
+import numpy as np
+import pandas as pd
 from cachetools.keys import methodkey
 
+from api.config import config
 from api.task_base import Task
+from util.artifacts import NOT_FOUND
+from util.spill import SpillStore, write_reserved
 
 
 class CacheError(Exception):
     pass
 
 
+class CacheTimeoutError(CacheError, TimeoutError):
+    """Raised when waiting too long for a concurrent call computing the same result (see instance_lru_cache)"""
+
+
 EXCEPTION_ON_NON_HASHABLE = True
 EXCEPTION_ON_TASK_ARG = True
 
@@ -27,7 +48,7 @@ def key_decorator_make_hashable(make_hashable: bool, func: Callable, ignore_firs
         @functools.wraps(key)
         def key_wrapper(*args, **kwargs):
             if ignore_first:
-                # cachetools.cachedmethod passes the instance as first argument for convenience. Not relevant as key.
+                # The instance is passed as first argument for convenience (like cachetools.cachedmethod). Not relevant as key.
                 self, *args = args
             if make_hashable:
                 args = (hash_cache_argument(arg) for arg in args)
@@ -136,6 +157,598 @@ def key_decorator_add_func_name(func: Callable):
     return decorator
 
 
+def read_through_artifacts(ignore_task: bool, func: Callable):
+    """Reads method results from the instance's on-disk artifact store (`self.artifacts`, see util.artifacts) when available,
+    and stores computed results there. Instances without an artifact store call the method directly.
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        artifacts = getattr(self, "artifacts", None)
+        if artifacts is None:
+            return func(self, *args, **kwargs)
+        key_kwargs = {k: v for k, v in kwargs.items() if k != "task"} if ignore_task else kwargs
+        key = artifacts.key(func.__name__, args, key_kwargs)
+        if key is None:
+            return func(self, *args, **kwargs)
+        value = artifacts.load(key)
+        if value is NOT_FOUND:
+            value = func(self, *args, **kwargs)
+            artifacts.save(key, value)
+        return value
+
+    return wrapper
+
+
+# region Metrics
+
+
+@dataclass
+class CacheMethodMetrics:
+    """Usage statistics of a cached method (see CacheMetrics)"""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+    # Calls receiving the result of a concurrent call with the same arguments (see PendingResult)
+    shared: int = 0
+    shared_wait_seconds: float = 0.0
+    # Evictions written to disk, and calls reading them back (see util.spill)
+    spills: int = 0
+    spill_hits: int = 0
+    compute_seconds: float = 0.0
+    max_compute_seconds: float = 0.0
+    lock_wait_seconds: float = 0.0
+    max_lock_wait_seconds: float = 0.0
+    # Current entries, only set in snapshots (see cache_metrics)
+    entries: int = 0
+    bytes: int = 0
+    spilled_entries: int = 0
+    spilled_bytes: int = 0
+
+    def add(self, other: CacheMethodMetrics):
+        self.hits += other.hits
+        self.misses += other.misses
+        self.evictions += other.evictions
+        self.invalidations += other.invalidations
+        self.shared += other.shared
+        self.shared_wait_seconds += other.shared_wait_seconds
+        self.spills += other.spills
+        self.spill_hits += other.spill_hits
+        self.compute_seconds += other.compute_seconds
+        self.max_compute_seconds = max(self.max_compute_seconds, other.max_compute_seconds)
+        self.lock_wait_seconds += other.lock_wait_seconds
+        self.max_lock_wait_seconds = max(self.max_lock_wait_seconds, other.max_lock_wait_seconds)
+        self.entries += other.entries
+        self.bytes += other.bytes
+        self.spilled_entries += other.spilled_entries
+        self.spilled_bytes += other.spilled_bytes
+
+
+class CacheMetrics:
+    """Per-method hit/miss counters, computation and lock wait times of a cache, recorded by instance_lru_cache.
+    All records are also added to the parent (by default the process-wide GLOBAL_CACHE_METRICS).
+    """
+
+    def __init__(self, parent: CacheMetrics | None = None):
+        self.parent = parent
+        self.methods: dict[str, CacheMethodMetrics] = {}
+        self._lock = Lock()
+
+    def record(
+        self,
+        method: str,
+        hit: bool | None = None,
+        compute_seconds: float = 0.0,
+        lock_wait_seconds: float = 0.0,
+        eviction: bool = False,
+        invalidation: bool = False,
+        shared_wait_seconds: float | None = None,
+        spill: bool = False,
+        spill_hit: bool = False,
+    ):
+        """Records a call (hit or miss, if given), an eviction (possibly spilled to disk), an invalidation or a restored spilled entry.
+        Calls waiting for a concurrent call (see PendingResult) are recorded by passing their waiting time.
+        """
+        with self._lock:
+            m = self.methods.setdefault(method, CacheMethodMetrics())
+            if hit is not None:
+                if hit:
+                    m.hits += 1
+                else:
+                    m.misses += 1
+            m.evictions += eviction
+            m.invalidations += invalidation
+            m.spills += spill
+            m.spill_hits += spill_hit
+            if shared_wait_seconds is not None:
+                m.shared += 1
+                m.shared_wait_seconds += shared_wait_seconds
+            m.compute_seconds += compute_seconds
+            m.max_compute_seconds = max(m.max_compute_seconds, compute_seconds)
+            m.lock_wait_seconds += lock_wait_seconds
+            m.max_lock_wait_seconds = max(m.max_lock_wait_seconds, lock_wait_seconds)
+        if self.parent is not None:
+            self.parent.record(
+                method,
+                hit,
+                compute_seconds,
+                lock_wait_seconds,
+                eviction,
+                invalidation,
+                shared_wait_seconds,
+                spill,
+                spill_hit,
+            )
+
+    def snapshot(self) -> dict[str, CacheMethodMetrics]:
+        with self._lock:
+            return {method: dataclasses.replace(m) for method, m in self.methods.items()}
+
+
+GLOBAL_CACHE_METRICS = CacheMetrics()
+"""Aggregated metrics of all instance caches, including those of closed sessions"""
+
+
+def cache_method_name(key: Hashable) -> str:
+    """Name of the method a cache entry belongs to (see key_decorator_add_func_name)"""
+    return str(key[0]) if isinstance(key, tuple) and key else str(key)
+
+
+def cache_metrics(caches: Iterable[MutableMapping], metrics: CacheMetrics | None = None):
+    """Aggregates the metrics of the given caches, including their current entries and sizes per method.
+    By default, the recorded metrics of the caches are summed up, pass `metrics` to use other (e.g., global) records.
+    """
+    caches = [c for c in caches if c is not None]
+    result: dict[str, CacheMethodMetrics] = {}
+    snapshots = [metrics.snapshot()] if metrics is not None else []
+    for cache in caches:
+        if metrics is None and isinstance(getattr(cache, "metrics", None), CacheMetrics):
+            snapshots.append(cache.metrics.snapshot())
+        sizes = getattr(cache, "sizes", None)
+        for key in list(cache.keys()):
+            entry = result.setdefault(cache_method_name(key), CacheMethodMetrics())
+            entry.entries += 1
+            entry.bytes += sizes.get(key, 0) if sizes is not None else 0
+        spill = getattr(cache, "spill", None)
+        for key in list(spill or ()):
+            entry = result.setdefault(cache_method_name(key), CacheMethodMetrics())
+            entry.spilled_entries += 1
+            entry.spilled_bytes += spill.size(key)
+    for snapshot in snapshots:
+        for method, m in snapshot.items():
+            result.setdefault(method, CacheMethodMetrics()).add(m)
+    return dict(sorted(result.items()))
+
+
+# endregion
+
+# region Dependencies
+
+Dependency = Union[str, tuple[str, str]]
+"""Data a cached method depends on: a table (e.g., "events") or a single column of a table (e.g., ("events", "ocel:activity"))"""
+
+
+def affects(change: Dependency, dependency: Dependency) -> bool:
+    """Whether a change invalidates a dependency.
+    A changed table (e.g., added or removed rows) affects all of its columns, a changed column affects its table.
+    """
+    change_table = change if isinstance(change, str) else change[0]
+    dependency_table = dependency if isinstance(dependency, str) else dependency[0]
+    if change_table != dependency_table:
+        return False
+    return isinstance(change, str) or isinstance(dependency, str) or change == dependency
+
+
+_computing = threading.local()
+
+
+def computing_stack() -> list[tuple[MutableMapping, Hashable]]:
+    """Cache entries currently computed in this thread (cache, key), the innermost last"""
+    if not hasattr(_computing, "stack"):
+        _computing.stack = []
+    return _computing.stack
+
+
+# endregion
+
+# region Single flight
+
+
+class PendingResult(Future):
+    """Result of a cache entry being computed by a call of a cached method (see instance_lru_cache).
+    Concurrent calls with the same key wait for this result instead of computing it again,
+    receiving the same value or exception.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.thread = threading.get_ident()
+
+    def wait(self, method: str):
+        """Waits for the result (at most `CACHE_WAIT_TIMEOUT` seconds), re-raising the exception of the computing call"""
+        try:
+            return self.result(timeout=config.CACHE_WAIT_TIMEOUT or None)
+        except FutureTimeoutError:
+            raise CacheTimeoutError(
+                f"{method}: Timed out after {config.CACHE_WAIT_TIMEOUT}s waiting for a concurrent computation of the same result."
+            ) from None
+
+
+# endregion
+
+# region Weighted cache
+
+
+def object_size(value: Any, seen: set[int] | None = None) -> int:
+    """Approximate memory usage of a cached value in bytes.
+    DataFrames and Series are measured with `memory_usage(deep=True)`, NumPy arrays by `nbytes` (plus their elements for object arrays),
+    built-in collections and dataclasses by the sizes of their items.
+    Other objects only count their own size (see sys.getsizeof), not the objects they reference (e.g., the OCEL of a FlattenedLog).
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        if value.dtype == object:
+            return int(value.nbytes) + sum(map(sys.getsizeof, value.ravel()))
+        return int(value.nbytes)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(object_size(k, seen) + object_size(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(object_size(x, seen) for x in value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return size + sum(
+            object_size(getattr(value, field.name), seen) for field in dataclasses.fields(value)
+        )
+    return size
+
+
+DEFAULT_COST = 1e-3
+"""Computation time (in seconds) added to all entries, such that entries without measured time are still ranked by size"""
+
+_caches: weakref.WeakValueDictionary[int, "WeightedCache"] = weakref.WeakValueDictionary()
+_caches_lock = Lock()
+_inflation = 0.0
+
+# Number of entries (over all caches) holding each cached value, by id, and the total size of these values.
+# Values shared by multiple caches (see WeightedCache.update_from) are counted once against `CACHE_GLOBAL_BYTES`.
+_value_refs: dict[int, int] = {}
+_global_size = 0
+
+
+def _retain_value(value: Any, size: int):
+    global _global_size
+    with _caches_lock:
+        refs = _value_refs.get(id(value), 0)
+        _value_refs[id(value)] = refs + 1
+        if not refs:
+            _global_size += size
+
+
+def _release_value(value: Any, size: int) -> int:
+    """Drops an entry's reference to a value, returning the memory freed globally (0 while other entries hold it)"""
+    global _global_size
+    with _caches_lock:
+        refs = _value_refs.pop(id(value)) - 1
+        if refs:
+            _value_refs[id(value)] = refs
+            return 0
+        _global_size -= size
+        return size
+
+
+def _release_values(data: dict, sizes: dict):
+    for key, value in data.items():
+        _release_value(value, sizes[key])
+
+
+def global_cache_bytes() -> int:
+    """Memory usage of the values of all live caches in bytes, counting values shared by multiple caches once"""
+    return _global_size
+
+
+class WeightedCache(MutableMapping):
+    """Instance cache bounded by the memory usage of its values in bytes (see object_size), instead of the number of entries.
+    Replaces cachetools.LRUCache in classes using instance_lru_cache.
+
+    Eviction is cost-aware (GreedyDual-Size): the priority of an entry is its computation time per byte,
+    plus an inflation value at the time of its last access. The entry with the lowest priority is evicted first,
+    and the inflation value rises to its priority, such that entries not accessed for a long time are evicted eventually.
+    Computation times are measured by instance_lru_cache (see record_cost).
+
+    Besides its own budget (default `CACHE_SESSION_BYTES`), all caches share the global budget `CACHE_GLOBAL_BYTES`.
+    When exceeded, the entries with the lowest priority over all caches are evicted.
+    Values shared by multiple caches (see update_from) count against each cache's own budget, but only once globally,
+    until the last cache holding them drops them.
+    Entries of other caches are only evicted when their lock (the instance's cache_lock) is free.
+
+    For fine-grained invalidation (see invalidate), the cache knows the data each method depends on (see declare),
+    and which entries have been used to compute other entries (see add_dependent).
+    Entries currently being computed are kept in `pending` (see PendingResult).
+
+    Evicted entries that took at least `CACHE_SPILL_MIN_SECONDS` to compute are spilled to disk (see util.spill)
+    and restored on their next access. Iteration and sizes only cover the entries in memory.
+    Spilled entries are only reserved under the lock, and written by `write_reserved` after releasing it.
+    instance_lru_cache reads them back outside the lock (see lookup and restore), while indexing reads them directly.
+    """
+
+    def __init__(self, maxsize: int | None = None, lock: Any = None, spill: bool = True):
+        self.maxsize = config.CACHE_SESSION_BYTES if maxsize is None else maxsize
+        self.lock = lock
+        self.currsize = 0
+        self.metrics = CacheMetrics(parent=GLOBAL_CACHE_METRICS)
+        self._data: dict = {}
+        self._sizes: dict = {}
+        self._costs: dict = {}
+        self._priorities: dict = {}
+        # Declared dependencies per method (None: depends on all data), and dependent entries per entry
+        self._dependencies: dict[str, tuple[Dependency, ...] | None] = {}
+        self._dependents: dict[Hashable, set[Hashable]] = {}
+        self.pending: dict[Hashable, PendingResult] = {}
+        self.spill = SpillStore() if spill and config.CACHE_SPILL_BYTES > 0 else None
+        with _caches_lock:
+            _caches[id(self)] = self
+        weakref.finalize(self, _release_values, self._data, self._sizes)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} entries, maxsize={self.maxsize}, currsize={self.currsize})"
+
+    def __getitem__(self, key):
+        try:
+            return self.lookup(key)
+        except KeyError:
+            return self._restore(key)
+
+    def lookup(self, key):
+        """Returns an entry in memory, raising KeyError for missing and spilled entries"""
+        value = self._data[key]
+        self._priorities[key] = self._priority(key)
+        return value
+
+    def setdefault(self, key, default=None):
+        """Returns an entry in memory, or inserts the default value. A spilled entry is replaced without reading it."""
+        try:
+            return self.lookup(key)
+        except KeyError:
+            self[key] = default
+            return default
+
+    def __contains__(self, key):
+        return key in self._data or (self.spill is not None and key in self.spill)
+
+    def __setitem__(self, key, value):
+        if self.spill is not None and key in self.spill:
+            del self.spill[key]
+        self._insert(key, value)
+
+    def _insert(self, key, value):
+        size = object_size(value)
+        if size > self.maxsize:
+            self._costs.pop(key, None)
+            raise ValueError("value too large")
+        if key in self._data:
+            # Replacing a value keeps its computation time
+            self.currsize -= self._sizes[key]
+            _release_value(self._data.pop(key), self._sizes.pop(key))
+            del self._priorities[key]
+        while self.currsize + size > self.maxsize:
+            self.popitem()
+        self._data[key] = value
+        self._sizes[key] = size
+        self.currsize += size
+        _retain_value(value, size)
+        self._priorities[key] = self._priority(key)
+        evict_global(self)
+
+    def __delitem__(self, key):
+        spilled = self.spill is not None and key in self.spill
+        if spilled:
+            del self.spill[key]
+        if key in self._data or not spilled:
+            self._discard(key)
+
+    def _discard(self, key) -> int:
+        """Removes an entry from memory, returning the memory freed globally"""
+        size = self._sizes.pop(key)
+        self.currsize -= size
+        self._costs.pop(key, None)
+        self._priorities.pop(key, None)
+        return _release_value(self._data.pop(key), size)
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        _release_values(self._data, self._sizes)
+        self._data.clear()
+        self._sizes.clear()
+        self._costs.clear()
+        self._priorities.clear()
+        self._dependents.clear()
+        self.pending.clear()
+        if self.spill is not None:
+            self.spill.clear()
+        self.currsize = 0
+
+    def update_from(self, other: WeightedCache):
+        """Copies all entries of another cache, including their computation times and dependencies.
+        The values are shared with the other cache. Both caches count them against their own budget,
+        while the global budget counts them once, until the last cache holding them evicts them.
+        """
+        for key in self._data.keys() & other._data.keys():
+            self._discard(key)
+        self._data.update(other._data)
+        self._sizes.update(other._sizes)
+        for key, value in other._data.items():
+            _retain_value(value, other._sizes[key])
+        self._costs.update(other._costs)
+        self._dependencies.update(other._dependencies)
+        for key, dependents in other._dependents.items():
+            self._dependents.setdefault(key, set()).update(dependents)
+        self.currsize = sum(self._sizes.values())
+        self._priorities = {key: self._priority(key) for key in self._data}
+        while self.currsize > self.maxsize:
+            self.popitem()
+        evict_global(self)
+
+    def declare(self, method: str, depends_on: tuple[Dependency, ...] | None):
+        """Sets the data a method depends on (None: all data), besides the cache entries it uses"""
+        self._dependencies[method] = depends_on
+
+    def add_dependent(self, key, dependent):
+        """Records that the entry `dependent` has been computed using the entry `key`"""
+        self._dependents.setdefault(key, set()).add(dependent)
+
+    def invalidate(self, changes: Iterable[Dependency] | None = None) -> int:
+        """Removes the entries affected by changes of the instance's data (see affects), returning their number.
+        Affected are entries of methods depending on the changed data or without declared dependencies,
+        and all entries that have (transitively) been computed using affected entries, even if those are no longer cached.
+        Passing None removes all entries.
+        Pending entries that are affected are not stored when their computation finishes.
+        """
+        if changes is None:
+            keys = list(self._data) + [key for key in self.spill or () if key not in self._data]
+            self.pending.clear()
+        else:
+            changes = list(changes)
+
+            def is_affected(key) -> bool:
+                dependencies = self._dependencies.get(cache_method_name(key))
+                return dependencies is None or any(
+                    affects(change, dependency) for change in changes for dependency in dependencies
+                )
+
+            stale = {
+                key
+                for key in chain(self._data, self.spill or (), self._dependents, self.pending)
+                if is_affected(key)
+            }
+            queue = list(stale)
+            while queue:
+                for dependent in self._dependents.pop(queue.pop(), ()):
+                    if dependent not in stale:
+                        stale.add(dependent)
+                        queue.append(dependent)
+            keys = [key for key in stale if key in self]
+            for key in stale:
+                self.pending.pop(key, None)
+        for key in keys:
+            del self[key]
+            self.metrics.record(cache_method_name(key), invalidation=True)
+        if changes is None:
+            self._dependents.clear()
+        return len(keys)
+
+    @property
+    def sizes(self) -> dict:
+        """Size of each entry in bytes (see object_size)"""
+        return self._sizes
+
+    def record_cost(self, key, seconds: float):
+        """Stores the computation time of an entry, which may not have been inserted yet"""
+        self._costs[key] = seconds
+        if key in self._priorities:
+            self._priorities[key] = self._priority(key)
+
+    def _priority(self, key) -> float:
+        return _inflation + (self._costs.get(key, 0.0) + DEFAULT_COST) / max(self._sizes[key], 1)
+
+    def min_priority(self) -> float:
+        # Copying the values is atomic, allowing other threads to rank this cache without holding its lock
+        return min(list(self._priorities.values()), default=math.inf)
+
+    def popitem(self):
+        """Removes and returns the entry with the lowest priority"""
+        key, value, _ = self._evict()
+        return key, value
+
+    def _evict(self) -> tuple[Hashable, Any, int]:
+        """Removes the entry with the lowest priority, returning it and the memory freed globally"""
+        global _inflation
+        if not self._priorities:
+            raise KeyError(f"{type(self).__name__} is empty")
+        key = min(self._priorities, key=self._priorities.__getitem__)
+        _inflation = max(_inflation, self._priorities[key])
+        value = self._data[key]
+        cost = self._costs.get(key, 0.0)
+        spilled = self.spill is not None and cost >= config.CACHE_SPILL_MIN_SECONDS
+        if spilled:
+            self.spill.reserve(key, value, cost)
+        freed = self._discard(key)
+        self.metrics.record(cache_method_name(key), eviction=True, spill=spilled)
+        return key, value, freed
+
+    def _restore(self, key):
+        """Reads a spilled entry back into memory, raising KeyError if there is none"""
+        if self.spill is None or key not in self.spill:
+            raise KeyError(key)
+        value, cost = self.spill.load(key)
+        if value is NOT_FOUND:
+            raise KeyError(key)
+        self.restore(key, value, cost)
+        return value
+
+    def restore(self, key, value, cost: float):
+        """Inserts an entry read back from the spill store (see SpillStore.load)"""
+        self.record_cost(key, cost)
+        try:
+            # The spilled file is kept, such that evicting the entry again does not write it
+            self._insert(key, value)
+        except ValueError:
+            pass  # value too large
+        self.metrics.record(cache_method_name(key), spill_hit=True)
+
+    def evict(self) -> int:
+        """Removes the entry with the lowest priority, returning the memory freed globally
+        (0 if its value is still held by another cache)"""
+        return self._evict()[2]
+
+
+def live_caches() -> list[WeightedCache]:
+    """All weighted caches of instances that have not been garbage-collected"""
+    with _caches_lock:
+        return list(_caches.values())
+
+
+def evict_global(cache: WeightedCache):
+    """Evicts entries of all caches until their total size (see global_cache_bytes) fits into `CACHE_GLOBAL_BYTES`,
+    lowest priority first. Shared values are freed once evicted from all caches holding them.
+    The caller holds the lock of `cache`. Caches in use by other threads are skipped.
+    """
+    caches = live_caches()
+    while global_cache_bytes() > config.CACHE_GLOBAL_BYTES:
+        candidates = [c for c in caches if len(c)]
+        if not candidates:
+            break
+        victim = min(candidates, key=WeightedCache.min_priority)
+        if victim is cache:
+            victim.evict()
+        elif victim.lock is not None and victim.lock.acquire(blocking=False):
+            try:
+                if len(victim):
+                    victim.evict()
+            finally:
+                victim.lock.release()
+        else:
+            caches = [c for c in caches if c is not victim]
+
+
+# endregion
+
+
 # from: https://cachetools.readthedocs.io/en/latest/#cachetools.cachedmethod
 # "The key function will be called as key(self, *args, **kwargs) to retrieve a suitable cache key.
 # Note that the default key function, cachetools.keys.methodkey(), ignores its first argument, i.e. self.
@@ -147,24 +760,37 @@ def instance_lru_cache(
     make_hashable: bool = False,
     ignore_task: bool = True,
     use_lock: bool = True,
+    persistent: bool = False,
+    depends_on: Iterable[Dependency] | None = None,
 ):
     """Caches an instance method.
 
     Arguments:
     - key -- The cache key function, default `methodkey`. Gets passed (self, <method name>, *args, **kwargs), and should ignore the first argument.
     - make_hashable -- When True, enables hashing of set, list and dict arguments.
+    - persistent -- When True, results are additionally stored on disk, in the instance's artifact store (`self.artifacts`), if any.
+    - depends_on -- Tables and columns the method reads (see Dependency), for fine-grained invalidation (see WeightedCache.invalidate).
+        Cached methods called during the computation are recorded automatically (within the same thread), such that only direct reads need to be declared.
+        Persistent results read from disk are not computed, so persistent methods need to declare all data they depend on.
+        Default None, when the method is invalidated by any change.
+
+    When `use_lock` is True, concurrent calls with the same key are computed once (single flight):
+    the first call computes the result, while the others wait for it (see PendingResult) and receive the same value or exception.
     """
 
     if key is None:
         key = methodkey
+    if depends_on is not None:
+        depends_on = tuple(depends_on)
 
     def decorator(func):
 
-        key1 = key_decorator_make_hashable(
+        # The method name is added last, such that it stays the first key element (see cache_clear)
+        key1 = key_decorator_add_func_name(func=func)(key)
+        key2 = key_decorator_make_hashable(
             make_hashable=make_hashable, func=func, ignore_first=True
-        )(key)
-        key2 = key_decorator_ignore_task(ignore_task=ignore_task, func=func)(key1)
-        key3 = key_decorator_add_func_name(func=func)(key2)
+        )(key1)
+        key3 = key_decorator_ignore_task(ignore_task=ignore_task, func=func)(key2)
         _key = key3
 
         def lock_context(self):
@@ -195,28 +821,133 @@ def instance_lru_cache(
                 if k in self.cache:
                     del self.cache[k]
 
+        def cache_put(self, value, *args, **kwargs):
+            """Stores a precomputed result in the method cache.
+
+            Arguments:
+                - self -- The instance
+                - value -- The method result
+                - *args, **kwargs -- Arguments of the method call"""
+            with lock_context(self):
+                if isinstance(self.cache, WeightedCache):
+                    self.cache.declare(func.__name__, depends_on)
+                self.cache[_key(self, *args, **kwargs)] = value
+            write_reserved()
+
         def cache_clear(self):
-            """Clears the method cache.
+            """Clears the method cache, including entries spilled to disk.
 
             Arguments:
                 - self -- The instance"""
             with lock_context(self):
-                ks = [k for k in self.cache.keys() if k[0] == func.__name__]
+                spill = getattr(self.cache, "spill", None)
+                ks = [
+                    k
+                    for k in dict.fromkeys(chain(self.cache.keys(), spill or ()))
+                    if k[0] == func.__name__
+                ]
                 for k in ks:
                     del self.cache[k]
 
-        func_cached = cachedmethod(
-            cache=operator.attrgetter("cache"),
-            lock=operator.attrgetter("cache_lock") if use_lock else None,
-            key=_key,
-        )(func)
+        func_read = (
+            read_through_artifacts(ignore_task=ignore_task, func=func) if persistent else func
+        )
+
+        @functools.wraps(func)
+        def func_cached(self, *args, **kwargs):
+            # Like cachetools.cachedmethod, additionally recording metrics, computation times and dependencies
+            cache = self.cache
+            weighted = isinstance(cache, WeightedCache)
+            k = _key(self, *args, **kwargs)
+            stack = computing_stack()
+            pending = future = None
+            spilled = False
+            start = time.perf_counter()
+            with lock_context(self):
+                lock_wait = time.perf_counter() - start
+                if weighted and stack and stack[-1][0] is cache:
+                    # Called while computing another entry of this instance
+                    cache.add_dependent(k, stack[-1][1])
+                try:
+                    value = cache.lookup(k) if weighted else cache[k]
+                    hit = True
+                except KeyError:
+                    hit = False
+                    if weighted:
+                        # Known before storing the result, such that invalidate can tell if the computation is affected
+                        cache.declare(func.__name__, depends_on)
+                    spilled = weighted and cache.spill is not None and k in cache.spill
+                    if weighted and use_lock:
+                        pending = cache.pending.get(k)
+                        if pending is None:
+                            future = cache.pending[k] = PendingResult()
+                        elif pending.thread == threading.get_ident():
+                            pending = None  # Recursive call, computed independently
+
+            if pending is not None:
+                # Computed by a concurrent call
+                start = time.perf_counter()
+                try:
+                    return pending.wait(func.__name__)
+                finally:
+                    cache.metrics.record(
+                        func.__name__,
+                        lock_wait_seconds=lock_wait,
+                        shared_wait_seconds=time.perf_counter() - start,
+                    )
+
+            compute_seconds = 0.0
+            restored = False
+            if not hit:
+                start = time.perf_counter()
+                stack.append((cache, k))
+                try:
+                    if spilled:
+                        # Read back from disk outside the lock, falling back to computing it
+                        value, cost = cache.spill.load(k)
+                        restored = value is not NOT_FOUND
+                    if not restored:
+                        value = func_read(self, *args, **kwargs)
+                        compute_seconds = time.perf_counter() - start
+                except BaseException as e:
+                    if future is not None:
+                        with lock_context(self):
+                            if cache.pending.get(k) is future:
+                                del cache.pending[k]
+                        future.set_exception(e)
+                    raise
+                finally:
+                    stack.pop()
+                start = time.perf_counter()
+                with lock_context(self):
+                    lock_wait += time.perf_counter() - start
+                    # Not stored when invalidated during the computation
+                    if future is None or cache.pending.get(k) is future:
+                        if future is not None:
+                            del cache.pending[k]
+                        if restored:
+                            cache.restore(k, value, cost)
+                        else:
+                            if weighted:
+                                cache.record_cost(k, compute_seconds)
+                            try:
+                                # In case of a race, prefer the item already in the cache
+                                value = cache.setdefault(k, value)
+                            except ValueError:
+                                pass  # value too large
+                if future is not None:
+                    future.set_result(value)
+            if weighted:
+                cache.metrics.record(func.__name__, hit or restored, compute_seconds, lock_wait)
+                # Spilled entries evicted while holding the lock
+                write_reserved()
+            return value
+
         # Assign method cache helpers
-        # (func_cached.cache and existing convenience methods refer to the whole object cache)
         func_cached.cache_has = cache_has
         func_cached.cache_forget = cache_forget
-        func_cached.cache_clear = (
-            cache_clear  # Overriding the original method, only clearing cache for this method
-        )
+        func_cached.cache_put = cache_put
+        func_cached.cache_clear = cache_clear  # Only clearing the cache entries of this method
         return func_cached
 
     return decorator
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from util.types import PathLike
+
+"""
+Column-wise binary storage of pandas DataFrames, using NumPy only.
+A frame is stored as a directory containing one .npy file per column (and index level) and a `frame.json` header.
+Numeric and datetime columns are stored as raw arrays, object columns are pickled by NumPy.
+Extension dtypes (categorical, timezone-aware datetimes, nullable/string dtypes) are restored exactly.
+Numeric columns, naive datetimes and categorical codes can be memory-mapped read-only,
+sharing their memory between all processes reading the same file.
+"""
+
+FORMAT_VERSION = 1
+HEADER_FILE = "frame.json"
+
+
+class UnsupportedFrameError(TypeError):
+    pass
+
+
+def write_frame(df: pd.DataFrame, path: PathLike):
+    """Writes a DataFrame to a directory. The directory is replaced atomically, readers never see partial frames."""
+    path = Path(path)
+    if isinstance(df.columns, pd.MultiIndex) or not all(isinstance(c, str) for c in df.columns):
+        raise UnsupportedFrameError("Only DataFrames with string column labels are supported.")
+
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.mkdir(parents=True)
+    try:
+        header = {
+            "version": FORMAT_VERSION,
+            "num_rows": len(df),
+            "columns_name": _json_label(df.columns.name),
+            "columns": [
+                {"name": col, **_write_column(df.iloc[:, i], tmp_path / f"c{i}")}
+                for i, col in enumerate(df.columns)
+            ],
+            "index": _write_index(df.index, tmp_path),
+        }
+        with open(tmp_path / HEADER_FILE, "w", encoding="utf8") as f:
+            json.dump(header, f)
+        if path.exists():
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def read_frame(
+    path: PathLike, columns: list[str] | None = None, mmap: bool = False
+) -> pd.DataFrame:
+    """Reads a DataFrame written by `write_frame`. When passing `columns`, only these columns are read.
+    With `mmap=True`, columns are memory-mapped where possible. These columns are read-only."""
+    path = Path(path)
+    header = _read_header(path)
+    index = _read_index(header["index"], path, mmap=mmap)
+    if columns is None:
+        positions = list(range(len(header["columns"])))
+    else:
+        names = [col["name"] for col in header["columns"]]
+        missing = set(columns).difference(names)
+        if missing:
+            raise KeyError(f"Columns not found: {sorted(missing)}")
+        positions = [names.index(name) for name in columns]
+    data = {i: _read_column(header["columns"][i], path / f"c{i}", mmap=mmap) for i in positions}
+    df = pd.DataFrame(data, copy=False) if data else pd.DataFrame(index=range(header["num_rows"]))
+    df.index = index
+    df.columns = pd.Index(
+        [header["columns"][i]["name"] for i in positions], name=header["columns_name"]
+    )
+    return df
+
+
+def frame_num_rows(path: PathLike) -> int:
+    """Number of rows of a stored DataFrame, without reading it"""
+    return _read_header(Path(path))["num_rows"]
+
+
+def is_frame(path: PathLike) -> bool:
+    return (Path(path) / HEADER_FILE).is_file()
+
+
+def _read_header(path: Path) -> dict[str, Any]:
+    with open(path / HEADER_FILE, "r", encoding="utf8") as f:
+        header = json.load(f)
+    if header["version"] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {header['version']}")
+    return header
+
+
+def write_arrays(arrays: dict[str, np.ndarray], path: PathLike):
+    """Writes named NumPy arrays to a directory, one .npy file per array."""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    for name, arr in arrays.items():
+        _save(path / name, np.asarray(arr))
+
+
+def read_arrays(path: PathLike, mmap: bool = False) -> dict[str, np.ndarray]:
+    """Reads arrays written by `write_arrays`. With `mmap=True`, arrays are memory-mapped read-only where possible."""
+    arrays = {}
+    for file in sorted(Path(path).glob("*.npy")):
+        try:
+            arrays[file.stem] = np.asarray(np.load(file, mmap_mode="r" if mmap else None))
+        except ValueError:
+            # Object arrays are pickled and cannot be memory-mapped
+            arrays[file.stem] = np.load(file, allow_pickle=True)
+    return arrays
+
+
+# ----- COLUMNS ------------------------------------------------------------------------------------------
+# region
+
+
+def _save(path: Path, arr: np.ndarray):
+    np.save(path.with_suffix(".npy"), arr, allow_pickle=arr.dtype == object)
+
+
+def _load(path: Path, dtype_kind: str | None = None, mmap: bool = False) -> np.ndarray:
+    if dtype_kind == "O":
+        # Pickled arrays cannot be memory-mapped
+        return np.load(path.with_suffix(".npy"), allow_pickle=True)
+    # Plain ndarray view of the read-only np.memmap
+    return np.asarray(np.load(path.with_suffix(".npy"), mmap_mode="r" if mmap else None))
+
+
+def _write_column(values: pd.Series, path: Path) -> dict[str, Any]:
+    """Saves a column to `<path>.npy` (plus additional arrays where needed), returns its header entry."""
+    dtype = values.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        _save(path, values.cat.codes.to_numpy())
+        _save(path.with_name(path.name + "_categories"), dtype.categories.to_numpy(dtype=object))
+        return {"kind": "categorical", "ordered": bool(dtype.ordered)}
+    if isinstance(dtype, pd.DatetimeTZDtype):
+        _save(path, values.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy())
+        return {"kind": "datetime_tz", "tz": str(dtype.tz)}
+    if isinstance(dtype, np.dtype):
+        arr = values.to_numpy()
+        _save(path, arr)
+        return {"kind": "numpy", "dtype": arr.dtype.kind}
+    # Other extension dtypes (nullable integers, strings, ...), restored via astype
+    _save(path, values.to_numpy(dtype=object))
+    return {"kind": "extension", "dtype": str(dtype)}
+
+
+def _read_column(
+    col: dict[str, Any], path: Path, mmap: bool = False
+) -> np.ndarray | pd.Series | pd.Categorical:
+    kind = col["kind"]
+    if kind == "categorical":
+        categories = _load(path.with_name(path.name + "_categories"), "O")
+        return pd.Categorical.from_codes(_load(path, mmap=mmap), categories, ordered=col["ordered"])
+    if kind == "datetime_tz":
+        # Localizing copies the data, timezone-aware columns are not memory-mapped
+        return pd.Series(_load(path), copy=False).dt.tz_localize("UTC").dt.tz_convert(col["tz"])
+    if kind == "numpy":
+        return _load(path, col["dtype"], mmap=mmap)
+    if kind == "extension":
+        return pd.Series(_load(path, "O"), dtype=object).astype(col["dtype"])
+    raise ValueError(f"Unknown column kind '{kind}'")
+
+
+# endregion
+
+# ----- INDEX ------------------------------------------------------------------------------------------
+# region
+
+
+def _write_index(index: pd.Index, path: Path) -> dict[str, Any]:
+    if isinstance(index, pd.RangeIndex):
+        return {
+            "kind": "range",
+            "name": _json_label(index.name),
+            "range": [index.start, index.stop, index.step],
+        }
+    return {
+        "kind": "levels",
+        "multi": isinstance(index, pd.MultiIndex),
+        "names": [_json_label(name) for name in index.names],
+        "levels": [
+            _write_column(index.get_level_values(i).to_series(), path / f"i{i}")
+            for i in range(index.nlevels)
+        ],
+    }
+
+
+def _read_index(header: dict[str, Any], path: Path, mmap: bool = False) -> pd.Index:
+    if header["kind"] == "range":
+        return pd.RangeIndex(*header["range"], name=header["name"])
+    levels = [
+        pd.Index(_read_column(level, path / f"i{i}", mmap=mmap), copy=False)
+        for i, level in enumerate(header["levels"])
+    ]
+    if header["multi"]:
+        return pd.MultiIndex.from_arrays(levels, names=header["names"])
+    return levels[0].rename(header["names"][0])
+
+
+def _json_label(label: Any) -> str | int | float | bool | None:
+    if label is None or isinstance(label, (str, int, float, bool)):
+        return label
+    raise UnsupportedFrameError(f"Unsupported axis name of type {type(label).__name__}.")
+
+
+# endregion
@@ -281,6 +281,20 @@ def reachability_multi_source(
         )
 
 
+def transitive_closure(adjacency: np.ndarray) -> np.ndarray:
+    """Computes the transitive closure of a directed graph, given as boolean adjacency matrix.
+    Uses repeated squaring, doubling the covered path length in each step (at most log2(n) matrix products).
+    Like nx.transitive_closure, a node has a self-loop if and only if it is part of a cycle.
+    """
+    closure = np.asarray(adjacency, dtype=bool)
+    while True:
+        weights = closure.astype(np.float32)
+        extended = closure | (weights @ weights > 0)
+        if (extended == closure).all():
+            return closure
+        closure = extended
+
+
 def multi_source_ego_graph(G, sources: Iterable[str], distance: int):
     """Returns a subgraph centered around a set of source nodes, induced by all nodes within the specified distance from one of the sources."""
     lengths, _ = nx.multi_source_dijkstra(G, sources, cutoff=distance)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import os
+import pickle
+import shutil
+import uuid
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock, RLock
+from typing import Any, Hashable
+
+import pandas as pd
+
+from api.config import config
+from api.logger import logger
+from util.artifacts import NOT_FOUND
+from util.columnar import UnsupportedFrameError, read_frame, write_frame
+
+"""
+Disk tier of the instance caches (see WeightedCache): entries evicted from memory are spilled to a local directory,
+and read back on their next access instead of being recomputed.
+DataFrames are stored in the columnar format of util.columnar, other values are pickled and compressed (gzip).
+Each process spills to its own directory below `DATA_DIR/cache/spill`. The files of a cache are removed
+when it is garbage-collected (i.e., with the session's OCEL or emission model) or at exit.
+Directories left behind by terminated processes are removed when a process starts spilling.
+All caches of a process share the disk budget `CACHE_SPILL_BYTES`.
+"""
+
+SPILL_COMPRESSION_LEVEL = 1
+"""gzip level of spilled pickles, favoring speed over size"""
+
+_process_directory: Path | None = None
+_process_directory_lock = Lock()
+
+_stores: weakref.WeakSet[SpillStore] = weakref.WeakSet()
+_lock = RLock()
+"""Guards the entries of all spill stores and their total size"""
+_total_size = 0
+
+_reserved: deque[tuple[SpillStore, Hashable, SpilledEntry]] = deque()
+"""Entries reserved under the lock of their cache, to be written by write_reserved"""
+
+
+def spilled_bytes() -> int:
+    """Disk usage of the spilled entries of all caches in bytes"""
+    return _total_size
+
+
+def process_spill_directory() -> Path:
+    """Spill directory of this process, created on first use"""
+    global _process_directory
+    with _process_directory_lock:
+        if _process_directory is None:
+            root = config.DATA_DIR / "cache" / "spill"
+            root.mkdir(parents=True, exist_ok=True)
+            for path in root.iterdir():
+                pid = path.name.split("-")[0]
+                if pid.isdigit() and not _is_running(int(pid)):
+                    shutil.rmtree(path, ignore_errors=True)
+            _process_directory = root / f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            _process_directory.mkdir()
+            atexit.register(shutil.rmtree, _process_directory, ignore_errors=True)
+        return _process_directory
+
+
+@dataclass(eq=False)
+class SpilledEntry:
+    cost: float  # computation time in seconds (see WeightedCache.record_cost)
+    # Value until written to disk (see SpillStore.reserve)
+    value: Any = NOT_FOUND
+    path: Path | None = None
+    size: int = 0  # bytes on disk
+    frame: bool = False  # stored in columnar format
+
+    @property
+    def written(self) -> bool:
+        return self.value is NOT_FOUND
+
+
+class SpillStore:
+    """Entries of a single cache spilled to disk. All stores share the budget `CACHE_SPILL_BYTES`.
+    When exceeded, the entries with the lowest computation time per byte over all stores are removed first.
+    Failing reads and writes are logged and treated as missing entries.
+    Entries of other stores may be removed at any time, so a contained entry might not be loaded anymore.
+
+    Caches reserve entries while holding their lock (see reserve), and write them after releasing it (see write_reserved),
+    such that no file I/O blocks other calls of the cache. Reserved entries are loaded from memory until written.
+    """
+
+    def __init__(self):
+        self.currsize = 0
+        self._entries: dict[Hashable, SpilledEntry] = {}
+        self._directory: Path | None = None
+        with _lock:
+            _stores.add(self)
+        weakref.finalize(self, _release_entries, self._entries)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} entries, currsize={self.currsize})"
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        with _lock:
+            return iter(list(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def size(self, key: Hashable) -> int:
+        """Size of a spilled entry on disk in bytes (0 if it has been removed)"""
+        entry = self._entries.get(key)
+        return entry.size if entry is not None else 0
+
+    @property
+    def directory(self) -> Path:
+        if self._directory is None:
+            self._directory = process_spill_directory() / uuid.uuid4().hex
+            self._directory.mkdir()
+            weakref.finalize(self, shutil.rmtree, self._directory, ignore_errors=True)
+        return self._directory
+
+    def reserve(self, key: Hashable, value: Any, cost: float = 0.0):
+        """Adds an entry, to be written to disk by the next call of write_reserved. Does not access any files."""
+        entry = self._add(key, value, cost)
+        if entry is not None:
+            _reserved.append((self, key, entry))
+
+    def save(self, key: Hashable, value: Any, cost: float = 0.0) -> bool:
+        """Writes an entry to disk immediately, returning False if it could not be stored or exceeds the size limit"""
+        entry = self._add(key, value, cost)
+        if entry is not None:
+            self._write(key, entry)
+        return key in self._entries
+
+    def _add(self, key: Hashable, value: Any, cost: float) -> SpilledEntry | None:
+        with _lock:
+            if key in self._entries:
+                return None  # Unchanged since its last reload
+            entry = self._entries[key] = SpilledEntry(cost=cost, value=value)
+            return entry
+
+    def _write(self, key: Hashable, entry: SpilledEntry):
+        """Writes a reserved entry to disk, making room by removing the entries with the lowest priority of all stores.
+        Entries that cannot be stored, exceed the size limit or have been removed in the meantime are discarded.
+        """
+        global _total_size
+        path = self.directory / uuid.uuid4().hex
+        size = None
+        try:
+            frame = False
+            if isinstance(entry.value, pd.DataFrame):
+                try:
+                    write_frame(entry.value, path)
+                    frame = True
+                except UnsupportedFrameError:
+                    pass
+            if not frame:
+                with gzip.open(path, "wb", compresslevel=SPILL_COMPRESSION_LEVEL) as f:
+                    pickle.dump(entry.value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = _disk_size(path)
+        except Exception as err:
+            logger.warning(f"Could not spill cache entry {key} ({type(err).__name__}: {err})")
+        removed = [path]
+        with _lock:
+            current = self._entries.get(key) is entry
+            if current and size is not None and size <= config.CACHE_SPILL_BYTES:
+                removed = _evict(config.CACHE_SPILL_BYTES - size)
+                entry.path, entry.size, entry.frame = path, size, frame
+                entry.value = NOT_FOUND
+                self.currsize += size
+                _total_size += size
+            elif current:
+                del self._entries[key]
+        for path in removed:
+            _remove(path)
+
+    def load(self, key: Hashable) -> tuple[Any, float]:
+        """Returns a spilled entry and its computation time, or (NOT_FOUND, 0.0). The entry stays on disk."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return NOT_FOUND, 0.0
+        value = entry.value
+        if value is not NOT_FOUND:
+            return value, entry.cost  # Not written yet
+        try:
+            if entry.frame:
+                return read_frame(entry.path), entry.cost
+            with gzip.open(entry.path, "rb") as f:
+                return pickle.load(f), entry.cost
+        except Exception as err:
+            with _lock:
+                if self._entries.get(key) is not entry:
+                    return NOT_FOUND, 0.0  # Removed while reading
+            logger.warning(
+                f"Discarding unreadable spilled entry {key} ({type(err).__name__}: {err})"
+            )
+            self._discard(key, entry)
+        return NOT_FOUND, 0.0
+
+    def __delitem__(self, key: Hashable):
+        self._discard(key, self._entries[key])
+
+    def _discard(self, key: Hashable, entry: SpilledEntry | None):
+        """Removes an entry, unless it has been replaced or removed concurrently"""
+        global _total_size
+        with _lock:
+            if entry is None or self._entries.get(key) is not entry:
+                return
+            del self._entries[key]
+            self.currsize -= entry.size
+            _total_size -= entry.size
+        if entry.path is not None:
+            _remove(entry.path)
+
+    def clear(self):
+        for key in list(self):
+            self._discard(key, self._entries.get(key))
+
+
+def _priority(entry: SpilledEntry) -> float:
+    return entry.cost / max(entry.size, 1)
+
+
+def _evict(maxsize: int) -> list[Path]:
+    """Removes the entries with the lowest priority over all stores until their total size fits into `maxsize`,
+    returning the files to delete. To be called holding `_lock`."""
+    global _total_size
+    if _total_size <= maxsize:
+        return []
+    candidates = sorted(
+        (
+            (store, key, entry)
+            for store in _stores
+            for key, entry in store._entries.items()
+            if entry.written
+        ),
+        key=lambda c: _priority(c[2]),
+    )
+    removed = []
+    for store, key, entry in candidates:
+        if _total_size <= maxsize:
+            break
+        del store._entries[key]
+        store.currsize -= entry.size
+        _total_size -= entry.size
+        removed.append(entry.path)
+    return removed
+
+
+def write_reserved():
+    """Writes all entries reserved by SpillStore.reserve to disk. Called by the caches after releasing their lock."""
+    while True:
+        try:
+            store, key, entry = _reserved.popleft()
+        except IndexError:
+            return
+        store._write(key, entry)
+
+
+def _release_entries(entries: dict[Hashable, SpilledEntry]):
+    """Subtracts the entries of a garbage-collected store from the total size (the files are removed with its directory)"""
+    global _total_size
+    with _lock:
+        _total_size -= sum(entry.size for entry in entries.values())
+        entries.clear()
+
+
+def _disk_size(path: Path) -> int:
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.iterdir())
+    return path.stat().st_size
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path, ignore_errors=True)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def _is_running(pid: int) -> bool:
+    if os.name == "nt":
+        return True  # os.kill would terminate the process
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True